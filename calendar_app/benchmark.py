@@ -0,0 +1,909 @@
+# calendar_app/benchmark.py
+#
+# 保存方式などの性能を計測するためのスクリプト（Tk 不要）。
+# 実データ（~/.calendar_app）には触れず、一時ディレクトリ上で計測します。
+#
+#   python benchmark.py storage --sizes 10000 100000 1000000
+#   python benchmark.py interval --size 100000
+#   python benchmark.py search --size 100000
+#   python benchmark.py memory --size 100000
+#   python benchmark.py stress --procs 4 --ops 200
+#   python benchmark.py ics --size 100000
+#   python benchmark.py binary --size 1000000
+#   python benchmark.py holidays [--online]
+#   python benchmark.py holiday-cache
+#   python benchmark.py http --requests 200
+#   python benchmark.py weather --areas 6 --latency 200
+#   python benchmark.py forecast
+#   python benchmark.py network [--modes ok timeout ...] [--nav 12]
+#   python benchmark.py record --dir fixtures   （実際の API から応答を記録。要ネットワーク）
+#   python benchmark.py month-model --size 100000 --nav 24 [--mode sharded]
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from services import event_manager
+from services import event_store_sqlite
+from services.event_index import IntervalIndex
+from services.search_index import SearchIndex
+from services.event_model import EventTable
+from services import ics
+from services import event_binary
+from services import holiday_calc
+from services import holiday_service
+from services import http_client
+from services import weather_service
+from services import weather_forecast
+from services import holiday_prefetch
+from services.theme_manager import ThemeManager
+from services.http_fixtures import FIXTURE_DIR, FAULT_MODES, Fault, StubServer, fixture_path
+
+
+# 各サービスの本来の URL（スタブサーバーの URL に置き換える前の値）
+_HOLIDAY_URL = holiday_service.HOLIDAY_API_URL
+_OVERVIEW_URL = weather_service.OVERVIEW_URL
+_FORECAST_URL = weather_forecast.FORECAST_URL
+
+
+def _generate_events(n: int, per_day: int = 5) -> dict:
+    """2000-01-01 から 1 日 per_day 件ずつ、合計 n 件のダミー予定を作ります。"""
+    events = {}
+    start = date(2000, 1, 1)
+    for i in range(n):
+        key = (start + timedelta(days=i // per_day)).isoformat()
+        events.setdefault(key, []).append({
+            "title":      f"予定{i}",
+            "start_time": f"{9 + i % per_day:02d}:00",
+            "end_time":   f"{10 + i % per_day:02d}:00",
+            "memo":       "ベンチマーク用のメモ" if i % 3 == 0 else ""
+        })
+    return events
+
+
+def _timed(func, *args):
+    """func(*args) を実行し、(戻り値, 経過ミリ秒) を返します。"""
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def _use_temp_store(mode: str) -> str:
+    """event_manager の保存先を一時ディレクトリに切り替え、そのパスを返します。"""
+    tmp_dir = tempfile.mkdtemp(prefix="calendar_bench_")
+    event_manager.EVENTS_FILE = os.path.join(tmp_dir, "events.json")
+    event_manager.STORAGE_MODE = mode
+    return tmp_dir
+
+
+def bench_storage(sizes: list[int]) -> None:
+    """json 方式と sqlite 方式の読み込み・編集時間を比較します。"""
+    print(f"{'events':>9} {'mode':>7} {'load ms':>10} {'month ms':>10} {'edit ms':>10}")
+    for n in sizes:
+        events = _generate_events(n)
+        last_day = max(events)
+        year, month = int(last_day[:4]), int(last_day[5:7])
+
+        for mode in ("json", "sqlite"):
+            tmp_dir = _use_temp_store(mode)
+            try:
+                event_manager.save_events(events)
+                _, load_ms = _timed(event_manager.load_events)
+                month_events, month_ms = _timed(
+                    event_manager.load_events_for_month, year, month)
+                _, edit_ms = _timed(
+                    event_manager.add_event, month_events, last_day, "追加", "12:00", "13:00")
+                print(f"{n:>9} {mode:>7} {load_ms:>10.1f} {month_ms:>10.1f} {edit_ms:>10.1f}")
+            finally:
+                event_store_sqlite.close(event_manager._sqlite_file())
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_interval(size: int, queries: int = 10_000) -> None:
+    """区間インデックスの構築時間と、各クエリの 1 回あたりの平均時間を計測します。"""
+    events = _generate_events(size)
+    index, build_ms = _timed(IntervalIndex, events)
+    keys = sorted(events)
+    rng = random.Random(0)
+    print(f"events={size} build={build_ms:.1f} ms")
+
+    def per_query(func) -> float:
+        t0 = time.perf_counter()
+        for _ in range(queries):
+            func()
+        return (time.perf_counter() - t0) * 1000 / queries
+
+    def q_overlapping():
+        index.overlapping(rng.choice(keys), "10:30", "11:30")
+
+    def q_events_at():
+        d = date.fromisoformat(rng.choice(keys))
+        index.events_at(datetime(d.year, d.month, d.day, rng.randrange(24), 15))
+
+    def q_events_between():
+        d = date.fromisoformat(rng.choice(keys))
+        start = datetime(d.year, d.month, d.day, 12, 0)
+        index.events_between(start, start + timedelta(days=7))
+
+    for name, func in (("overlapping", q_overlapping), ("events_at", q_events_at),
+                       ("events_between(7d)", q_events_between)):
+        print(f"  {name:<20} {per_query(func) * 1000:8.1f} us/query")
+
+
+def bench_search(size: int) -> None:
+    """全文検索インデックスの構築時間と、代表的な検索語ごとの応答時間を計測します。"""
+    events = _generate_events(size)
+    index, build_ms = _timed(SearchIndex, events)
+    print(f"events={size} build={build_ms:.1f} ms")
+    # ヒットの多い語・少ない語・1 文字・複数語・ヒットなし
+    for query in ("予定", "ベンチマーク", "予定1234", f"{size - 1}", "9", "予定 メモ", "存在しない"):
+        results, ms = _timed(index.search, query)
+        print(f"  {query!r:<16} hits={len(results):>3} {ms:7.2f} ms")
+
+
+def bench_memory(size: int) -> None:
+    """dict の events と EventTable について、1 件あたりのメモリ使用量を比較します。"""
+    def measure(build) -> tuple[object, float, float]:
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        obj = build()
+        elapsed = (time.perf_counter() - t0) * 1000
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        return obj, used / size, elapsed
+
+    events, dict_bytes, dict_ms = measure(lambda: _generate_events(size))
+    # タイトル・メモの文字列は両者で共有されるため、EventTable 側には含まれない
+    table, table_bytes, table_ms = measure(lambda: EventTable.from_dict(events))
+    print(f"events={size}")
+    print(f"  {'dict (文字列 4 キー)':<22} {dict_bytes:8.1f} bytes/event  build {dict_ms:8.1f} ms")
+    print(f"  {'EventTable (__slots__)':<22} {table_bytes:8.1f} bytes/event  build {table_ms:8.1f} ms")
+    assert table.to_dict() == events
+
+
+def _stress_worker(args: tuple) -> list[str]:
+    """
+    別プロセスで予定の追加・削除を繰り返し、最後まで残っているはずの自分の予定のタイトルを返します。
+    他のプロセスの変更は読み直さず、保存時のマージだけで取り込まれることを確かめます。
+    """
+    events_file, worker, ops, seed = args
+    event_manager.EVENTS_FILE = events_file
+    event_manager.STORAGE_MODE = "json"
+    event_manager.BACKGROUND_SAVE = False
+    rng = random.Random(seed)
+    events = event_manager.load_events()
+    alive = []
+    for i in range(ops):
+        if alive and rng.random() < 0.3:
+            date_str, title = alive.pop(rng.randrange(len(alive)))
+            index = next(j for j, ev in enumerate(events[date_str]) if ev["title"] == title)
+            event_manager.delete_event(events, date_str, index)
+        else:
+            # 日付を少数に絞り、同じ日付への同時変更を起こしやすくする
+            date_str = f"2025-01-{rng.randint(1, 5):02d}"
+            title = f"w{worker}-{i}"
+            event_manager.add_event(events, date_str, title, "10:00", "11:00")
+            alive.append((date_str, title))
+    return [title for _, title in alive]
+
+
+def _external_add_worker(events_file: str, mode: str, date_str: str, title: str) -> None:
+    """別プロセスとして date_str の月を読み、予定を 1 件追加して保存します（外部からの変更の再現用）。"""
+    event_manager.EVENTS_FILE = events_file
+    event_manager.STORAGE_MODE = mode
+    event_manager.BACKGROUND_SAVE = False
+    events = event_manager.load_events_for_month(int(date_str[:4]), int(date_str[5:7]))
+    event_manager.add_event(events, date_str, title)
+    event_manager.flush()
+
+
+def bench_stress(procs: int, ops: int) -> bool:
+    """
+    複数プロセスから同じ events.json に追加・削除を繰り返し、予定が失われないことを確かめます。
+    予定の消失・重複があるか、保存の世代番号が保存回数と合わなければ（上書きで保存が消えていれば）False を返します。
+    """
+    tmp_dir = _use_temp_store("json")
+    try:
+        tasks = [(event_manager.EVENTS_FILE, w, ops, w) for w in range(procs)]
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(procs, maxtasksperchild=1) as pool:
+            expected = sorted(t for titles in pool.map(_stress_worker, tasks) for t in titles)
+        elapsed = time.perf_counter() - t0
+
+        event_manager._merge_base.update(generation=None, events=None)
+        events, meta = event_manager._read_snapshot()
+        actual = sorted(ev["title"] for day in events.values() for ev in day)
+        print(f"procs={procs} ops/proc={ops} {elapsed:.2f} s "
+              f"({procs * ops / elapsed:.0f} ops/s) events={len(actual)}")
+        missing = sorted(set(expected) - set(actual))
+        extra = sorted(set(actual) - set(expected))
+        duplicated = sorted(t for t, n in Counter(actual).items() if n > 1)
+        checks = {
+            "予定の消失なし": not missing,
+            "消したはずの予定・重複なし": not extra and not duplicated,
+            # 保存は 1 回ごとに世代を 1 つ進めるので、取りこぼしがなければ保存回数と一致する
+            "世代番号が保存回数と一致": meta.get("generation") == procs * ops,
+        }
+        if missing or extra or duplicated:
+            print(f"  消失={missing[:10]} 余分={extra[:10]} 重複={duplicated[:10]}")
+        print(f"  世代番号 {meta.get('generation')} / 保存回数 {procs * ops}")
+        for name, ok in checks.items():
+            print(f"  {name}: {'OK' if ok else 'NG'}")
+        print(f"  結果: {'OK' if all(checks.values()) else 'NG'}")
+        return all(checks.values())
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_ics(size: int) -> None:
+    """.ics の書き出し・取り込み（1 プロセス / プロセスプール）・重複除外の処理速度を計測します。"""
+    events = _generate_events(size)
+    tmp_dir = _use_temp_store("json")
+    try:
+        path = os.path.join(tmp_dir, "bench.ics")
+        _, export_ms = _timed(ics.export_ics, path, events)
+        # 書き出し中に増えたメモリの最大値（ジェネレータなので件数によらずほぼ一定）
+        tracemalloc.start()
+        ics.export_ics(path, events)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        mb = os.path.getsize(path) / 1024 / 1024
+        print(f"events={size} file={mb:.1f} MB")
+        print(f"  {'export':<22} {export_ms:9.1f} ms  {size / export_ms * 1000:9.0f} events/s"
+              f"  peak +{peak / 1024:.0f} KiB")
+
+        for label, workers in (("import (1 process)", 1), ("import (process pool)", None)):
+            event_manager.save_events({})
+            event_manager._merge_base.update(generation=None, events=None)
+            result, ms = _timed(ics.import_ics, path, workers)
+            print(f"  {label:<22} {ms:9.1f} ms  {size / ms * 1000:9.0f} events/s"
+                  f"  imported={result['imported']}")
+
+        result, ms = _timed(ics.import_ics, path, None)
+        print(f"  {'re-import (dedupe)':<22} {ms:9.1f} ms  {size / ms * 1000:9.0f} events/s"
+              f"  duplicates={result['duplicates']}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_binary(size: int) -> None:
+    """json 形式とバイナリ形式のファイルサイズと、キャッシュのない状態からの読み込み時間を比べます。"""
+    events = _generate_events(size)
+    last_day = max(events)
+    year, month = int(last_day[:4]), int(last_day[5:7])
+    tmp_dir = _use_temp_store("json")
+    try:
+        event_manager.save_events(events)
+        bin_path = os.path.join(tmp_dir, "events.bin")
+        _, encode_ms = _timed(event_binary.write, bin_path, events)
+        json_mb = os.path.getsize(event_manager.EVENTS_FILE) / 1024 / 1024
+        bin_mb = os.path.getsize(bin_path) / 1024 / 1024
+        print(f"events={size} json={json_mb:.1f} MB binary={bin_mb:.1f} MB "
+              f"({json_mb / bin_mb:.1f}x) encode={encode_ms:.0f} ms")
+        del events
+
+        def cold_json():
+            # 解析結果のキャッシュを捨ててから読む（OS のページキャッシュは残る）
+            event_manager._snapshot_cache.update(sig=None)
+            return event_manager.load_events()
+
+        def cold_binary(load, *args):
+            event_binary.close(bin_path)
+            return load(bin_path, *args)[0]
+
+        for label, func, args in (
+            ("json load_events", cold_json, ()),
+            ("binary load_all", cold_binary, (event_binary.load_all,)),
+            ("binary load_month", cold_binary, (event_binary.load_month, year, month)),
+        ):
+            result, ms = _timed(func, *args)
+            count = sum(len(day) for day in result.values())
+            print(f"  {label:<20} {ms:10.1f} ms  events={count}")
+            del result
+        event_binary.close(bin_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _diff_holidays(label: str, expected: dict, computed: dict) -> int:
+    """祝日の日付・名前の違いを表示し、違いの件数を返します。"""
+    missing = sorted(expected.keys() - computed.keys())
+    extra = sorted(computed.keys() - expected.keys())
+    renamed = [d for d in sorted(expected.keys() & computed.keys()) if expected[d] != computed[d]]
+    status = "OK" if not missing and not extra and not renamed else "NG"
+    print(f"  {label:<8} {status}  {len(expected)} 日")
+    for d in missing:
+        print(f"    計算に無い: {d} {expected[d]}")
+    for d in extra:
+        print(f"    計算だけ  : {d} {computed[d]}")
+    for d in renamed:
+        print(f"    名前違い  : {d} {expected[d]} / {computed[d]}")
+    return len(missing) + len(extra) + len(renamed)
+
+
+def bench_holidays(online: bool, first: int, last: int) -> bool:
+    """
+    計算による祝日を、同梱の holidays.json（と --online なら祝日 API）と突き合わせます。
+    日付か名前が 1 つでも違えば False を返します。
+    """
+    _, ms = _timed(lambda: [holiday_calc.holidays_for_year(y) for y in
+                            range(holiday_calc.FIRST_YEAR, holiday_calc.LAST_YEAR + 1)])
+    print(f"計算: {holiday_calc.FIRST_YEAR}〜{holiday_calc.LAST_YEAR} 年 {ms:.1f} ms")
+
+    errors = 0
+    print("同梱データ:")
+    for year, expected in sorted(holiday_service.load_holiday_cache().items()):
+        errors += _diff_holidays(year, expected, holiday_calc.holidays_for_year(int(year)))
+    if online:
+        print(f"祝日 API（{first}〜{last} 年）:")
+        for year in range(first, last + 1):
+            expected = holiday_service.fetch_holidays_from_api(year)
+            if expected:
+                errors += _diff_holidays(str(year), expected, holiday_calc.holidays_for_year(year))
+    print("日付・名前の違い:", errors)
+    return errors == 0
+
+
+def bench_holiday_cache() -> bool:
+    """
+    ローカルのスタブサーバーを祝日 API に見立て、年ごとのキャッシュの
+    初回取得（200）と、条件付きリクエストによる再確認（304）を確かめます。
+    有効期限・メモからの判定・保存先の優先順位・取得失敗時の扱いも確かめ、どれかが違えば False を返します。
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="calendar_bench_")
+    with StubServer() as stub:
+        years = range(2020, 2030)
+        bodies = {y: holiday_calc.holidays_for_year(y) for y in years}
+        # 同梱データ・計算と区別できるよう、1 年だけ API にしかない祝日を足しておく
+        bodies[2025] = dict(bodies[2025], **{"2025-12-31": "確認用の休日"})
+        for y in years:
+            stub.add(_HOLIDAY_URL.format(year=y), json.dumps(bodies[y], ensure_ascii=False).encode("utf-8"))
+        _use_stub_network(stub, tmp_dir)
+        checks = {}
+        try:
+            statuses = {}
+            for label in ("初回（200）", "再確認（304）"):
+                del stub.requests[:]
+                fetched_at = {y: (holiday_service.load_year_entry(y) or {}).get("fetched_at") for y in years}
+                _, ms = _timed(lambda: [holiday_service.request_holidays(y) for y in years])
+                statuses[label] = sorted({status for _, status in stub.requests})
+                print(f"  {label:<12} {len(years)} 年 {ms:8.1f} ms  status={statuses[label]}")
+            checks["初回はすべて 200 で取得する"] = statuses["初回（200）"] == [200]
+            checks["再確認はすべて 304 で済む"] = statuses["再確認（304）"] == [304]
+            checks["304 では内容を保ったまま確認時刻だけ進める"] = all(
+                holiday_service.load_year_entry(y)["holidays"] == bodies[y]
+                and holiday_service.load_year_entry(y)["fetched_at"] > fetched_at[y] for y in years)
+            checks["年ごとのファイルに保存する"] = all(
+                os.path.exists(os.path.join(holiday_service.HOLIDAY_DIR, f"{y}.json")) for y in years)
+
+            # 有効期限内かどうかはメモで判定し、年ごとのファイルを開かない
+            loaded = []
+            load = holiday_service.load_year_entry
+            holiday_service.load_year_entry = lambda y: loaded.append(y) or load(y)
+            try:
+                fresh = all(holiday_service.is_fresh(y) for y in years)
+            finally:
+                holiday_service.load_year_entry = load
+            checks["取得した年は有効期限内"] = fresh
+            checks["有効期限の判定でファイルを開かない"] = not loaded
+            ttl = holiday_service.HOLIDAY_TTL_SEC
+            holiday_service.HOLIDAY_TTL_SEC = 0
+            try:
+                checks["有効期限を過ぎた年は確かめ直す対象になる"] = not any(holiday_service.is_fresh(y) for y in years)
+            finally:
+                holiday_service.HOLIDAY_TTL_SEC = ttl
+
+            # 保存した年は同梱データ・計算より優先し、取得に失敗しても保存済みの内容を使う
+            stub.set_fault(Fault(status=404))
+            failed = holiday_service.fetch_holidays_from_api(2025)
+            stub.set_fault(Fault())
+            with holiday_service._CACHE_LOCK:
+                holiday_service._year_cache.clear()
+                holiday_service._index.clear()
+                holiday_service._fetched_at.clear()
+            checks["取得に失敗しても保存済みの祝日を使う"] = (
+                failed == {} and holiday_service.get_holidays_for_year(2025) == bodies[2025])
+            checks["保存した年は同梱データより優先する"] = (
+                holiday_service.get_holidays_for_year(2025).get("2025-12-31") == "確認用の休日")
+
+            for name, ok in checks.items():
+                print(f"  {name}: {'OK' if ok else 'NG'}")
+            print(f"  結果: {'OK' if all(checks.values()) else 'NG'}")
+            return all(checks.values())
+        finally:
+            http_client.close()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_http(n: int):
+    """
+    gzip で返すローカルのスタブサーバーに対し、毎回接続する requests.get と
+    共有 Session（http_client）の応答時間を比べ、503 からの再試行も確かめます。
+    """
+    import requests
+
+    with StubServer() as stub:
+        url = stub.url_for(_HOLIDAY_URL.format(year=2025))
+        headers = {"Accept-Encoding": "gzip"}
+        try:
+            _, ms_plain = _timed(lambda: [requests.get(url, headers=headers, timeout=http_client.DEFAULT_TIMEOUT).json()
+                                          for _ in range(n)])
+            _, ms_pool = _timed(lambda: [http_client.get(url, name="bench").json() for _ in range(n)])
+            print(f"  毎回接続        {n} 回 {ms_plain:8.1f} ms  （1 回 {ms_plain / n:.2f} ms）")
+            print(f"  共有 Session    {n} 回 {ms_pool:8.1f} ms  （1 回 {ms_pool / n:.2f} ms）")
+
+            stub.set_fault(Fault(status=503, count=http_client.MAX_RETRIES))
+            res = http_client.get(url, name="retry", sleep=lambda _: None)
+            print(f"  503 x {http_client.MAX_RETRIES} の後: status={res.status_code} 祝日 {len(res.json())} 件")
+            for name, st in http_client.stats().items():
+                print(f"  {name:<6} 回数={st['requests']} 再試行={st['retries']} "
+                      f"p50={st['p50_ms']:.2f} ms p95={st['p95_ms']:.2f} ms 最大={st['max_ms']:.2f} ms")
+        finally:
+            http_client.close()
+
+
+# 地域コード → 概況JSONの対象地域（weather のスタブサーバー用）
+_STUB_AREAS = {
+    "016000": "石狩・空知・後志地方", "130000": "東京都", "140000": "神奈川県",
+    "230000": "愛知県", "270000": "大阪府", "400000": "福岡県", "471000": "沖縄本島地方",
+    "260000": "京都府",
+}
+
+
+def bench_weather(n_areas: int, latency_ms: int):
+    """
+    応答を latency_ms 遅らせるローカルのスタブサーバーから n_areas 地域の概況を取得し、
+    1 地域ずつ順に取得した場合と、同時に取得した場合（get_weather_for_areas）の待ち時間を比べます。
+    """
+    codes = list(_STUB_AREAS)[:n_areas]
+    day = datetime.now().day
+    tmp_dir = tempfile.mkdtemp(prefix="calendar_bench_")
+    with StubServer() as stub:
+        for code, area in _STUB_AREAS.items():
+            text = f"【{area}気象情報】高気圧に覆われています。\n\n　{area}は、晴れ時々曇りでしょう。\n\n　{day + 1}日は、雨でしょう。"
+            stub.add(_OVERVIEW_URL.format(area=code),
+                     json.dumps({"publishingOffice": "スタブ気象台", "targetArea": area, "text": text},
+                                ensure_ascii=False).encode("utf-8"))
+        stub.set_fault(Fault(latency_ms=latency_ms))
+        weather_service.WEATHER_DIR = tmp_dir
+        weather_service.OVERVIEW_URL = stub.url_for(_OVERVIEW_URL)
+        try:
+            weather_service._memo.clear()
+            _, ms_seq = _timed(lambda: [weather_service.get_weather_for_today(c) for c in codes])
+            for c in codes:
+                os.remove(os.path.join(tmp_dir, f"{c}.json"))
+            weather_service._memo.clear()
+            infos, ms_par = _timed(lambda: weather_service.get_weather_for_areas(codes))
+            _, ms_cached = _timed(lambda: weather_service.get_weather_for_areas(codes))
+            print(f"  順に取得       {len(codes)} 地域 {ms_seq:8.1f} ms")
+            print(f"  同時に取得     {len(codes)} 地域 {ms_par:8.1f} ms  （1 往復 {latency_ms} ms）")
+            print(f"  保存済み（TTL 内） {len(codes)} 地域 {ms_cached:8.1f} ms")
+            for info in infos:
+                print(f"    {info['area']:<12} {info['description']}  {info['icon']}")
+            ok = [info["area"] for info in infos] == [_STUB_AREAS[c] for c in codes]
+            print(f"  地域名の抽出: {'一致' if ok else '不一致'}")
+        finally:
+            http_client.close()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_forecast() -> bool:
+    """
+    記録した予報 JSON（fixtures/www.jma.go.jp/.../forecast/<地域コード>.json）を解析し、
+    期待する日ごとの表（fixtures/forecast_expected.json）と一致するか確かめ、解析とセル 1 つ分の参照の時間を計ります。
+    セルの記号・壊れた応答の扱い・取得した表の保存も確かめ、どれかが違えば False を返します。
+    """
+    with open(os.path.join(FIXTURE_DIR, "forecast_expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    checks = {}
+    payloads = {}
+    for area, want in expected.items():
+        with open(fixture_path(FIXTURE_DIR, _FORECAST_URL.format(area=area)), "rb") as f:
+            payloads[area] = f.read()
+        data = json.loads(payloads[area])
+        table, ms = _timed(lambda: weather_forecast.parse_forecast(data))
+        got = {day: list(fc) for day, fc in table.items()}
+        ok = checks[f"{area} の解析結果が期待どおり"] = got == want
+        print(f"  {area}: {len(table)} 日 解析 {ms:6.2f} ms  {'一致' if ok else '不一致'}")
+        if not ok:
+            for day in sorted(set(got) | set(want)):
+                if got.get(day) != want.get(day):
+                    print(f"    {day}: 期待 {want.get(day)} / 結果 {got.get(day)}")
+        for day, fc in table.items():
+            print(f"    {day} {fc.summary()}")
+
+    # 42 セル分の参照（予報のない日を含む）
+    keys = [f"2025-12-{d:02d}" for d in range(1, 32)] + [""] * 11
+    rounds = 10_000
+    _, ms = _timed(lambda: [table.get(k) for _ in range(rounds) for k in keys])
+    print(f"  セルの参照: 1 セル {ms * 1000 / (rounds * len(keys)):.3f} µs")
+
+    # 天気コードの百の位でセルの記号が決まり、分からないコードには何も描かない
+    checks["天気コードからセルの記号を選ぶ"] = (
+        [weather_forecast.weather_glyph(c) for c in (101, 202, 313, 400, 999)] == ["☀", "☁", "☂", "☃", ""])
+
+    # 壊れた応答は ValueError になること
+    accepted = []
+    for broken in ({}, [], [{"timeSeries": []}], [{"timeSeries": [{"areas": "x"}]}]):
+        try:
+            weather_forecast.parse_forecast(broken)
+            accepted.append(broken)
+        except ValueError:
+            pass
+    for broken in accepted:
+        print(f"  壊れた応答を受け付けてしまいました: {broken!r}")
+    checks["壊れた応答は ValueError にする"] = not accepted
+
+    # 取得した表は保存し、有効期限内は取得も解析もしない
+    area = next(iter(expected))
+    tmp_dir = tempfile.mkdtemp(prefix="calendar_bench_")
+    with StubServer() as stub:
+        stub.add(_FORECAST_URL.format(area=area), payloads[area])
+        _use_stub_network(stub, tmp_dir)
+        parse = weather_forecast.parse_forecast
+        parsed = []
+        weather_forecast.parse_forecast = lambda data: parsed.append(1) or parse(data)
+        try:
+            first = weather_forecast.get_forecast(area)
+            requests_before, parsed_before = len(stub.requests), len(parsed)
+            again = weather_forecast.get_forecast(area)
+            checks["取得した予報を解析して返す"] = (
+                first is not None and {d: list(fc) for d, fc in first.items()} == expected[area])
+            checks["有効期限内は取得も解析もしない"] = (
+                again == first and len(stub.requests) == requests_before and len(parsed) == parsed_before)
+            checks["保存した表から同じ予報を復元する"] = weather_forecast.get_cached_forecast(area) == first
+        finally:
+            weather_forecast.parse_forecast = parse
+            http_client.close()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for name, ok in checks.items():
+        print(f"  {name}: {'OK' if ok else 'NG'}")
+    print(f"  結果: {'OK' if all(checks.values()) else 'NG'}")
+    return all(checks.values())
+
+
+def _use_stub_network(stub: StubServer, tmp_dir: str) -> None:
+    """祝日・天気の保存先を一時ディレクトリに、取得先をスタブサーバーに切り替え、メモを捨てます。"""
+    holiday_service.HOLIDAY_DIR = os.path.join(tmp_dir, "holidays")
+    weather_service.WEATHER_DIR = os.path.join(tmp_dir, "weather")
+    os.makedirs(holiday_service.HOLIDAY_DIR)
+    os.makedirs(weather_service.WEATHER_DIR)
+    holiday_service.HOLIDAY_API_URL = stub.url_for(_HOLIDAY_URL)
+    weather_service.OVERVIEW_URL = stub.url_for(_OVERVIEW_URL)
+    weather_forecast.FORECAST_URL = stub.url_for(_FORECAST_URL)
+    with holiday_service._CACHE_LOCK:
+        holiday_service._year_cache.clear()
+        holiday_service._index.clear()
+        holiday_service._fetched_at.clear()
+    weather_service._memo.clear()
+    http_client.reset_stats()
+    http_client.close()
+
+
+def _wait_background(controller, limit_sec: float) -> bool:
+    """祝日の先読みと天気の取り直しが終わるまで待ちます（limit_sec を過ぎたら False）。"""
+    deadline = time.perf_counter() + limit_sec
+    while time.perf_counter() < deadline:
+        if not controller.holiday_prefetcher._running and not controller._weather_fetching:
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def bench_network(modes: list[str], nav: int, read_timeout: float):
+    """
+    記録済みの応答を返すスタブサーバーに障害（FAULT_MODES）を注入し、
+    CalendarController の起動・月移動の待ち時間と、裏での取得が落ち着くまでの時間を計ります。
+    起動と月移動は通信を待たないので、どの障害でも数 ms のままであるべきです。
+    タイムアウトが効いていないと「timeout」の行の取得時間が応答なしの時間（Fault.hang_sec）分だけ伸びます。
+    """
+    # 計測を短く済ませるため、読み込みタイムアウトと再試行の待ち時間を縮める
+    http_client.DEFAULT_TIMEOUT = (1.0, read_timeout)
+    http_client.BACKOFF_BASE_SEC = 0.01
+    holiday_prefetch.BACKOFF_BASE_SEC = 0.01
+    holiday_prefetch.BACKOFF_MAX_SEC = 0.05
+    print(f"  読み込みタイムアウト {read_timeout} s / 再試行 {http_client.MAX_RETRIES} 回 / 月移動 {nav} 回 x 2")
+    print(f"  {'mode':<11} {'起動 ms':>8} {'移動 平均':>9} {'移動 最大':>9} {'取得 ms':>9} "
+          f"{'要求':>5} {'失敗':>5} {'天気':>5} {'予報':>5}")
+    from controllers.calendar_controller import CalendarController
+
+    for mode in modes:
+        tmp_dir = _use_temp_store("json")
+        with StubServer() as stub:
+            try:
+                _use_stub_network(stub, tmp_dir)
+                # 月移動で先読みする年のうち記録にない年は、計算した祝日で補う
+                for year in range(date.today().year - 3, date.today().year + 4):
+                    if not os.path.exists(fixture_path(FIXTURE_DIR, _HOLIDAY_URL.format(year=year))):
+                        stub.add(_HOLIDAY_URL.format(year=year),
+                                 json.dumps(holiday_calc.holidays_for_year(year), ensure_ascii=False).encode("utf-8"))
+                stub.set_fault(FAULT_MODES[mode])
+                t0 = time.perf_counter()
+                controller = CalendarController()
+                startup_ms = (time.perf_counter() - t0) * 1000
+                nav_ms = []
+                for step in [controller.next_month] * nav + [controller.prev_month] * nav:
+                    _, ms = _timed(step)
+                    nav_ms.append(ms)
+                settled = _wait_background(controller, limit_sec=120)
+                settle_ms = (time.perf_counter() - t0) * 1000
+                controller.poll_holidays()
+                controller.poll_weather()
+                errors = sum(st["errors"] for st in http_client.stats().values())
+                print(f"  {mode:<11} {startup_ms:>8.1f} {sum(nav_ms) / len(nav_ms):>9.2f} {max(nav_ms):>9.2f} "
+                      f"{settle_ms:>9.0f}{'' if settled else '+'} {len(stub.requests):>5} {errors:>5} "
+                      f"{'あり' if controller.get_weather_info() else 'なし':>5} "
+                      f"{len(controller.get_display_forecast()):>4}日")
+            finally:
+                http_client.close()
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_month_model(size: int, nav: int, mode: str) -> bool:
+    """
+    月の描画内容（MonthModel）の組み立てとキャッシュの効果を計ります。
+    前後の月を先読みしない場合（月移動のたびに組み立て）と、画面の空き時間に先読みする場合とで
+    ＜ / ＞ 1 回の待ち時間を比べ、予定・テーマ・今日の日付の変更で必要な月だけが捨てられることを確かめます。
+    確かめた項目のどれかが違えば False を返します。
+    """
+    from controllers.calendar_controller import CalendarController
+
+    tmp_dir = _use_temp_store(mode)
+    with StubServer() as stub:
+        try:
+            # 天気・祝日の取得はスタブサーバーに向ける（計測中に外へ出ない）
+            _use_stub_network(stub, tmp_dir)
+            for year in range(1998, 2004):
+                stub.add(_HOLIDAY_URL.format(year=year),
+                         json.dumps(holiday_calc.holidays_for_year(year), ensure_ascii=False).encode("utf-8"))
+            event_manager.save_events(_generate_events(size))
+            event_manager.flush()
+            controller = CalendarController()
+            controller.go_to_date("2000-06-15")
+            _wait_background(controller, limit_sec=30)
+            print(f"  予定 {size} 件 / 保存方式 {mode} / 月移動 {nav} 回 x 2")
+
+            steps = [controller.next_month] * nav + [controller.prev_month] * nav
+
+            def navigate(prefetch: bool) -> list[float]:
+                controller.month_models.clear()
+                controller.get_month_model()
+                times = []
+                for step in steps:
+                    if prefetch:
+                        # MainWindow が after_idle で呼ぶのと同じ（移動の待ち時間には含めない）
+                        controller.prefetch_adjacent_months()
+                    else:
+                        controller.month_models.clear()
+                    t0 = time.perf_counter()
+                    step()
+                    controller.get_month_model()
+                    times.append((time.perf_counter() - t0) * 1000)
+                return times
+
+            for label, prefetch in (("先読みなし", False), ("先読みあり", True)):
+                controller.month_models.hits = controller.month_models.misses = 0
+                times = sorted(navigate(prefetch))
+                print(f"  {label}: 移動 平均 {sum(times) / len(times):7.3f} ms  "
+                      f"p95 {times[int(len(times) * 0.95)]:7.3f} ms  最大 {times[-1]:7.3f} ms  "
+                      f"（キャッシュ {controller.month_models.hits} 命中 / {controller.month_models.misses} 外れ）")
+
+            # キャッシュから返した内容は、組み立て直した内容と同じであること
+            checks = {}
+            cached = controller.get_month_model()
+            controller.month_models.clear()
+            checks["キャッシュと組み立て直しが一致"] = cached == controller.get_month_model()
+
+            # 表示中の月に予定を足すと、その月だけが捨てられ、前後の月は残る
+            controller.prefetch_adjacent_months()
+            year, month = controller.current_year, controller.current_month
+            key = f"{year}-{month:02d}-28"
+            event_manager.add_event(controller.events, key, "追加した予定", "12:00", "13:00", "")
+            checks["予定の追加で表示中の月だけ捨てる"] = (
+                (year, month) not in controller.month_models and len(controller.month_models) == 2)
+            cell = next(c for c in controller.get_month_model().cells if c.key == key)
+            checks["追加した予定がツールチップに出る"] = "追加した予定" in (cell.tooltip or "")
+
+            # 自分の保存で署名が変わっても、先読みした月はそのまま使える（外れに数えない）。
+            # 署名が保存先全体の sqlite / binary 方式では他の月の変化を確かめられないので、
+            # 予定を変更した月以外は組み立て直す
+            event_manager.flush()
+            misses = controller.month_models.misses
+            built = []
+            build = controller._build_month_model
+            controller._build_month_model = lambda *a: built.append(a) or build(*a)
+            controller.next_month()
+            controller.get_month_model()
+            controller.prev_month()
+            controller.prev_month()
+            controller.get_month_model()
+            del controller._build_month_model
+            nxt = (year + 1, 1) if month == 12 else (year, month + 1)
+            prv = (year - 1, 12) if month == 1 else (year, month - 1)
+            if event_manager.loads_all_months() or not event_manager.signature_covers_all_months():
+                checks["予定の追加後も先読みした前後の月を使う"] = (
+                    not built and controller.month_models.misses == misses)
+            else:
+                checks["予定の追加後は変更していない前後の月を組み立て直す"] = (
+                    sorted(a[:2] for a in built) == sorted([nxt, prv]))
+            controller.next_month()
+
+            # 他のプロセスが翌月を変えたあとで表示中の月を変更しても、翌月を古いまま使わない
+            controller.prefetch_adjacent_months()
+            other = multiprocessing.Process(
+                target=_external_add_worker,
+                args=(event_manager.EVENTS_FILE, mode, f"{nxt[0]}-{nxt[1]:02d}-10", "他のプロセスの予定"))
+            other.start()
+            other.join()
+            event_manager.add_event(controller.events, key, "もう一つの予定", "14:00", "15:00", "")
+            event_manager.flush()
+            controller.next_month()
+            checks["外部で変わった翌月を古いまま使わない"] = any(
+                "他のプロセスの予定" in (c.tooltip or "") for c in controller.get_month_model().cells)
+            controller.prev_month()
+
+            # 繰り返し予定は他の月にも現れるので、すべて捨てる
+            event_manager.add_event(controller.events, f"{year}-{month:02d}-01", "毎週", "", "", "",
+                                    {"freq": "weekly"})
+            checks["繰り返し予定の追加ですべて捨てる"] = len(controller.month_models) == 0
+            controller.prefetch_adjacent_months()
+            model = controller.month_models.get(*nxt)
+            checks["繰り返しの発生分が翌月にも出る"] = any("毎週" in (c.tooltip or "") for c in model.cells)
+
+            # テーマを切り替えると色を解決し直す
+            before = controller.get_month_model()
+            ThemeManager.toggle_theme()
+            controller.on_theme_changed()
+            after = controller.get_month_model()
+            ThemeManager.toggle_theme()
+            controller.on_theme_changed()
+            checks["テーマの切り替えで色を解決し直す"] = before.cells[0].bg != after.cells[0].bg
+
+            # 日付が変わると、昨日と今日を含む月だけ捨てる
+            controller.get_month_model()
+            controller.prefetch_adjacent_months()
+            controller._today = date(year, month, 15)
+            model = controller.get_month_model()
+            checks["日付が変わると今日の強調を外す"] = model.today == 0 and len(controller.month_models) == 3
+
+            for name, ok in checks.items():
+                print(f"  {name}: {'OK' if ok else 'NG'}")
+            print(f"  結果: {'OK' if all(checks.values()) else 'NG'}")
+            return all(checks.values())
+        finally:
+            event_manager.flush()
+            http_client.close()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_record(dest: str, years: list[int]):
+    """
+    実際の祝日 API・気象庁から応答を取得し、dest に fixtures と同じ並びで記録します（要ネットワーク）。
+    アプリの保存先（~/.calendar_app）には触れません。
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="calendar_bench_")
+    holiday_service.HOLIDAY_DIR = tmp_dir
+    weather_service.WEATHER_DIR = tmp_dir
+    http_client.RECORD_DIR = dest
+    try:
+        for year in years:
+            holiday_service.fetch_holidays_from_api(year)
+        for area in weather_service.AREA_CODES:
+            weather_service.get_weather_for_today(area)
+            weather_forecast.get_forecast(area)
+        for name, st in http_client.stats().items():
+            print(f"  {name:<9} 回数={st['requests']} 失敗={st['errors']}")
+        print(f"  記録先: {os.path.abspath(dest)}")
+    finally:
+        http_client.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Desktop Calendar のベンチマーク")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_storage = sub.add_parser("storage", help="json / sqlite の読み込み・編集時間")
+    p_storage.add_argument("--sizes", type=int, nargs="+",
+                           default=[10_000, 100_000, 1_000_000])
+
+    p_interval = sub.add_parser("interval", help="区間インデックスのクエリ時間")
+    p_interval.add_argument("--size", type=int, default=100_000)
+
+    p_search = sub.add_parser("search", help="全文検索の応答時間")
+    p_search.add_argument("--size", type=int, default=100_000)
+
+    p_memory = sub.add_parser("memory", help="予定 1 件あたりのメモリ使用量")
+    p_memory.add_argument("--size", type=int, default=100_000)
+
+    p_stress = sub.add_parser("stress", help="複数プロセスからの同時保存で予定が失われないか")
+    p_stress.add_argument("--procs", type=int, default=4)
+    p_stress.add_argument("--ops", type=int, default=200)
+
+    p_ics = sub.add_parser("ics", help=".ics の書き出し・取り込み速度")
+    p_ics.add_argument("--size", type=int, default=100_000)
+
+    p_binary = sub.add_parser("binary", help="バイナリ形式のサイズとコールドロード時間")
+    p_binary.add_argument("--size", type=int, default=1_000_000)
+
+    p_holidays = sub.add_parser("holidays", help="計算による祝日を同梱データ・祝日 API と突き合わせる")
+    p_holidays.add_argument("--online", action="store_true", help="祝日 API とも比べる")
+    p_holidays.add_argument("--first", type=int, default=1970)
+    p_holidays.add_argument("--last", type=int, default=date.today().year + 1)
+
+    sub.add_parser("holiday-cache", help="祝日の年ごとキャッシュと条件付きリクエストの確認（スタブサーバー）")
+
+    p_http = sub.add_parser("http", help="共有 Session の接続の使い回しと再試行の確認（スタブサーバー）")
+    p_http.add_argument("--requests", type=int, default=200)
+
+    p_weather = sub.add_parser("weather", help="複数地域の天気の同時取得と TTL キャッシュ（スタブサーバー）")
+    p_weather.add_argument("--areas", type=int, default=6, choices=range(1, len(_STUB_AREAS) + 1))
+    p_weather.add_argument("--latency", type=int, default=200, help="スタブの応答遅延（ミリ秒）")
+
+    sub.add_parser("forecast", help="記録した週間予報 JSON の解析結果の確認")
+
+    p_network = sub.add_parser("network", help="通信の障害ごとの起動・月移動の待ち時間（記録済みの応答で再生）")
+    p_network.add_argument("--modes", nargs="+", choices=list(FAULT_MODES), default=list(FAULT_MODES))
+    p_network.add_argument("--nav", type=int, default=12)
+    p_network.add_argument("--read-timeout", type=float, default=0.5, help="読み込みタイムアウト（秒）")
+
+    p_record = sub.add_parser("record", help="実際の API の応答を fixtures と同じ並びで記録する（要ネットワーク）")
+    p_record.add_argument("--dir", default=FIXTURE_DIR)
+    p_record.add_argument("--years", type=int, nargs="+",
+                          default=[date.today().year - 1, date.today().year, date.today().year + 1])
+
+    p_month = sub.add_parser("month-model", help="月の描画内容のキャッシュと先読みによる月移動の待ち時間")
+    p_month.add_argument("--size", type=int, default=100_000)
+    p_month.add_argument("--nav", type=int, default=24)
+    p_month.add_argument("--mode", default="sharded", choices=["json", "sqlite", "sharded", "journal", "binary"])
+
+    args = parser.parse_args()
+    # 結果を確かめるサブコマンドは、食い違いがあれば False を返す（終了コード 1）
+    ok = True
+    if args.command == "storage":
+        bench_storage(args.sizes)
+    elif args.command == "interval":
+        bench_interval(args.size)
+    elif args.command == "search":
+        bench_search(args.size)
+    elif args.command == "memory":
+        bench_memory(args.size)
+    elif args.command == "stress":
+        ok = bench_stress(args.procs, args.ops)
+    elif args.command == "ics":
+        bench_ics(args.size)
+    elif args.command == "binary":
+        bench_binary(args.size)
+    elif args.command == "holidays":
+        ok = bench_holidays(args.online, args.first, args.last)
+    elif args.command == "holiday-cache":
+        ok = bench_holiday_cache()
+    elif args.command == "http":
+        bench_http(args.requests)
+    elif args.command == "weather":
+        bench_weather(args.areas, args.latency)
+    elif args.command == "forecast":
+        ok = bench_forecast()
+    elif args.command == "network":
+        bench_network(args.modes, args.nav, args.read_timeout)
+    elif args.command == "record":
+        bench_record(args.dir, args.years)
+    elif args.command == "month-model":
+        ok = bench_month_model(args.size, args.nav, args.mode)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
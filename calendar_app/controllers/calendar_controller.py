@@ -1,70 +1,460 @@
-#controllers/calendar_controller.py
-
-from datetime import datetime 
-import calendar 
-from services.holiday_service import get_holidays_for_year 
-from services.event_manager import load_events 
-from services.event_manager import add_event 
-from services.weather_service import get_weather_for_today
-
-
-class CalendarController:
-    """カレンダーの状態（年月・祝日・イベント）を管理し、移動操作を提供する"""
-    def __init__(self):
-        today = datetime.today()
-        self.current_year = today.year
-        self.current_month = today.month
-        self.holidays = {} # 初期化
-        self.events = {}   # 初期化
-        self.weather_info = None
-        self.load_data()
-
-    def load_data(self):
-        """祝日とイベントデータをロードして属性にセット"""
-        self.holidays = get_holidays_for_year(self.current_year)
-        self.events = load_events()
-        self.weather_info = get_weather_for_today()
-
-    def prev_month(self):
-        """前月に移動してデータを再ロード"""
-        if self.current_month == 1:
-            self.current_month = 12
-            self.current_year -= 1
-        else:
-            self.current_month -= 1
-        self.load_data()
-
-    def next_month(self):
-        """次月に移動してデータを再ロード"""
-        if self.current_month == 12:
-            self.current_month = 1
-            self.current_year += 1
-        else:
-            self.current_month += 1
-        self.load_data()
-        
-    def go_to_today(self):
-        today = datetime.today()
-        self.current_year = today.year
-        self.current_month = today.month
-        self.load_data() # 日付変更後にデータを再ロード
-
-    def get_weather_info(self) -> dict | None:
-        """
-        コントローラが保持する最新の天気情報を取得します。
-        """
-        return self.weather_info
-
-    def get_events_for_date(self, date_str: str) -> list[dict]:
-        """
-        指定された日付のイベントリストを取得します。
-        このコントローラが保持するイベントデータを使用します。
-        """
-        return self.events.get(date_str, []) # self.eventsから取得
-    
-    def add_event_to_date(self, date_str: str, title: str,
-                          start_time: str = "", end_time: str = "", memo: str = "") -> None:
-        """
-        指定された日付に新しいイベントを追加し、保存します。
-        """
+#controllers/calendar_controller.py
+
+from datetime import datetime, date
+import calendar 
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from services.holiday_service import get_holidays_for_year, get_holiday_index
+from services.holiday_prefetch import HolidayPrefetcher
+from services.event_manager import load_events
+from services.event_manager import load_events_for_month 
+from services.event_manager import load_recurring_events
+from services.event_manager import add_event 
+from services.event_manager import update_event
+from services.event_manager import add_change_listener
+from services.event_manager import storage_signature, loads_all_months, signature_covers_all_months
+from services.event_manager import replace_day
+from services.event_manager import iter_events, EVENT_FIELDS
+from services.event_records import day_order
+from services.event_index import IntervalIndex
+from services.search_index import SearchIndex
+from services.recurrence import OccurrenceCache
+from services.event_model import EventTable
+from services import ics
+from services.weather_service import (
+    AREA_CODES, get_weather_for_areas, get_cached_weather_for_areas, is_weather_fresh_for_areas,
+)
+from services.weather_forecast import get_forecast, get_cached_forecast, is_forecast_fresh
+from services.month_model import MonthModel, MonthModelCache, build_month_model
+
+
+# 天気の取得に失敗したとき、次に試すまで空ける時間（秒）
+WEATHER_RETRY_SEC = 5 * 60
+
+
+class CalendarController:
+    """カレンダーの状態（年月・祝日・イベント）を管理し、移動操作を提供する"""
+    def __init__(self):
+        today = datetime.today()
+        self.current_year = today.year
+        self.current_month = today.month
+        self.holidays = {} # 初期化
+        # 読み込んだ年の祝日の索引（月の描画内容を組み立てるときに月ごとのバケットを引く）
+        self.holiday_index = get_holiday_index()
+        # 祝日 API からの取得は別スレッドで行い、表示は計算による祝日で先に済ませる
+        self.holiday_prefetcher = HolidayPrefetcher()
+        self.events = {}   # 初期化
+        # 天気は保存済みの概況から先に表示し、古ければ裏で取り直す（月の移動では取得しない）
+        # 地域ごとの天気（設定した地域コードの順）と、ステータスバーに出している地域の位置
+        self.weather_infos = get_cached_weather_for_areas()
+        self._weather_pos = 0
+        # 日付セルに描く日ごとの予報（先頭の地域の分。"YYYY-MM-DD" → DayForecast）
+        self.forecast = get_cached_forecast(AREA_CODES[0])
+        self._weather_results = queue.Queue()
+        self._weather_fetching = False
+        self._weather_failed_at = None
+        # 時間帯の重なり検索用インデックス（初回の検索時に構築し、予定の変更は日単位で差分更新）
+        self.interval_index = IntervalIndex()
+        self._index_stale = True
+        # 全文検索用インデックス（初回の検索時に全予定から構築）
+        self.search_index = None
+        # 繰り返し予定の月別展開キャッシュ（初回に保存先から元の予定だけを拾う）
+        self.occurrence_cache = None
+        # 外部での変更検知用に、最後に読み込んだときの保存ファイルの署名
+        self._storage_sig = None
+        # 月ごとの描画内容（MonthModel）のキャッシュと、組み立てたときの今日の日付
+        self.month_models = MonthModelCache()
+        self._today = date.today()
+        # 前回署名を確かめてから、このプロセスで予定を変更した (年, 月)
+        self._written_months: set[tuple[int, int]] = set()
+        add_change_listener(self._on_events_changed)
+        self.load_data()
+        self.refresh_weather()
+
+    def load_data(self):
+        """祝日とイベントデータをロードして属性にセット"""
+        self.holidays = get_holidays_for_year(self.current_year)
+        self._prefetch_holidays()
+        # 表示中の月の予定だけを取得（保存方式によっては全体が返る）
+        sig = storage_signature(self.current_year, self.current_month)
+        if self.events and loads_all_months():
+            # 全体を読む方式では、月を移っても読み直さない（ファイルが変わっていれば差分だけ取り込む）
+            if sig != self._storage_sig:
+                self.reload_if_changed()
+            return
+        old_sig = self._storage_sig
+        self.events = load_events_for_month(self.current_year, self.current_month)
+        self._storage_sig = sig
+        self._index_stale = True
+        if signature_covers_all_months():
+            self._storage_sig_changed(old_sig, sig, verified=False)
+
+    def _storage_sig_changed(self, old_sig, new_sig, verified: bool) -> None:
+        """
+        保存先の署名が old_sig から new_sig に変わったとき、キャッシュした月の描画内容の扱いを決めます。
+        署名の範囲を読み直して差分を取り込んだ（verified）なら、内容は変更通知で反映済みなので
+        すべての月の署名を付け替えます。そうでなければ、外部の変更がどの月に入ったか分からないので、
+        このプロセスが変更した月（内容は変更通知で反映済み）だけを付け替え、残りは作り直させます。
+        """
+        if old_sig is not None and old_sig != new_sig:
+            self.month_models.resign(old_sig, new_sig, None if verified else self._written_months)
+        self._written_months.clear()
+
+    def _weather_is_fresh(self) -> bool:
+        return is_weather_fresh_for_areas() and is_forecast_fresh(AREA_CODES[0])
+
+    def refresh_weather(self):
+        """天気・予報が WEATHER_TTL_SEC より古ければ、別スレッドで取り直します（取得中なら何もしない）。"""
+        if self._weather_fetching or self._weather_is_fresh():
+            return
+        failed_at = self._weather_failed_at
+        if failed_at is not None and time.monotonic() - failed_at < WEATHER_RETRY_SEC:
+            return
+        self._weather_fetching = True
+
+        def run():
+            try:
+                # 全地域の概況と予報を同時に取得し、取れなかったものがあれば間を空けてから試し直す
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    forecast = pool.submit(get_forecast, AREA_CODES[0])
+                    infos = get_weather_for_areas()
+                    forecast = forecast.result()
+                self._weather_failed_at = None if self._weather_is_fresh() else time.monotonic()
+                self._weather_results.put((infos, forecast))
+            finally:
+                self._weather_fetching = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def poll_weather(self) -> set[str]:
+        """
+        裏で取り直した天気を受け取ります（UI スレッドから呼びます）。
+        変わったものを {"weather"（概況）, "forecast"（日ごとの予報）} の部分集合で返します。
+        """
+        changed = set()
+        try:
+            infos, forecast = self._weather_results.get_nowait()
+        except queue.Empty:
+            return changed
+        # 取得に失敗したものは、保存済みの古い内容の表示を続ける
+        if infos:
+            self.weather_infos = infos
+            self._weather_pos %= len(infos)
+            changed.add("weather")
+        if forecast is not None and forecast != self.forecast:
+            # 予報が変わった日を含む月だけ描画内容を作り直す
+            old = self.forecast
+            self.month_models.invalidate_dates(
+                d for d in old.keys() | forecast.keys() if old.get(d) != forecast.get(d))
+            self.forecast = forecast
+            changed.add("forecast")
+        return changed
+
+    def rotate_weather(self) -> bool:
+        """ステータスバーに出す地域を次に進めます（地域が 1 つ以下なら False）。"""
+        if len(self.weather_infos) <= 1:
+            return False
+        self._weather_pos = (self._weather_pos + 1) % len(self.weather_infos)
+        return True
+
+    def _prefetch_holidays(self):
+        """表示中の年の前後 1 年（年末・年始の月ならもう 1 年先）の祝日を裏で取得させる"""
+        year = self.current_year
+        years = [year, year + 1, year - 1]
+        if self.current_month == 12:
+            years.append(year + 2)
+        elif self.current_month == 1:
+            years.append(year - 2)
+        self.holiday_prefetcher.request(years)
+
+    def poll_holidays(self) -> bool:
+        """
+        裏で取得した祝日を受け取り、表示中の年の祝日が変わったら self.holidays を
+        差し替えて True を返します（UI スレッドから定期的に呼びます）。
+        """
+        years = self.holiday_prefetcher.poll()
+        for year in years:
+            self.month_models.invalidate_year(year)
+        if self.current_year not in years:
+            return False
+        self.holidays = get_holidays_for_year(self.current_year)
+        return True
+
+    def prev_month(self):
+        """前月に移動してデータを再ロード"""
+        if self.current_month == 1:
+            self.current_month = 12
+            self.current_year -= 1
+        else:
+            self.current_month -= 1
+        self.load_data()
+
+    def next_month(self):
+        """次月に移動してデータを再ロード"""
+        if self.current_month == 12:
+            self.current_month = 1
+            self.current_year += 1
+        else:
+            self.current_month += 1
+        self.load_data()
+        
+    def go_to_date(self, date_str: str):
+        """"YYYY-MM-DD" の日付を含む月に移動してデータを再ロード"""
+        self.current_year = int(date_str[:4])
+        self.current_month = int(date_str[5:7])
+        self.load_data()
+
+    def go_to_today(self):
+        today = datetime.today()
+        self.current_year = today.year
+        self.current_month = today.month
+        self.load_data() # 日付変更後にデータを再ロード
+
+    def reload_if_changed(self) -> list[str]:
+        """
+        他のプロセスや同期ツールが保存ファイルを書き換えていたら読み直し、
+        内容が変わった日付だけを self.events に反映して、その日付のリストを返します。
+        ファイルの署名が前回と同じなら何も読みません。
+        """
+        sig = storage_signature(self.current_year, self.current_month)
+        if sig == self._storage_sig:
+            return []
+        latest = load_events_for_month(self.current_year, self.current_month)
+        old_sig, self._storage_sig = self._storage_sig, sig
+        # 全体を読む方式や月ごとのファイルなら、この差分で署名の範囲の変更をすべて取り込める
+        self._storage_sig_changed(old_sig, sig,
+                                  verified=loads_all_months() or not signature_covers_all_months())
+        changed = sorted(
+            d for d in self.events.keys() | latest.keys()
+            if self.events.get(d) != latest.get(d)
+        )
+        for date_str in changed:
+            # 日付単位で差し替え、インデックス類にも差分として通知する
+            replace_day(self.events, date_str, latest.get(date_str, []))
+        self._written_months.clear()
+        return changed
+
+    def _on_events_changed(self, events: dict, record: dict, old) -> None:
+        """
+        保持している events が変更されたら、その日のインデックスだけを作り直す。
+        描画内容はその日を含む月だけ捨てる（繰り返し予定は他の月にも現れるのですべて捨てる）。
+        """
+        self._written_months.add((int(record["date"][:4]), int(record["date"][5:7])))
+        if events is self.events and not self._index_stale:
+            self.interval_index.reindex_date(record["date"], events.get(record["date"]))
+        new = record.get("event") or {}
+        if new.get("recurrence") or (old is not None and old.get("recurrence")):
+            self.month_models.clear()
+        else:
+            self.month_models.invalidate_dates([record["date"]])
+
+    def get_interval_index(self) -> IntervalIndex:
+        """現在の events に対する時間帯インデックスを返す（必要なら構築する）"""
+        if self._index_stale:
+            self.interval_index.rebuild(self.events)
+            self._index_stale = False
+        return self.interval_index
+
+    def find_conflicts(self, date_str: str, start_time: str, end_time: str,
+                       exclude: dict | None = None) -> list[dict]:
+        """
+        指定した日・時間帯と重なる予定を返します（exclude は編集中の予定）。
+        """
+        return self.get_interval_index().overlapping(date_str, start_time, end_time, exclude=exclude)
+
+    def search_events(self, query: str, limit: int = 50) -> list[tuple[str, dict]]:
+        """
+        タイトル・メモに query を含む予定を (日付, 予定) の日付順で返します。
+        初回だけ全予定を読んで索引を作り、以降は予定の変更に合わせて差分更新します。
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex(load_events())
+            add_change_listener(self.search_index.on_change)
+        return self.search_index.search(query, limit)
+
+    def _get_occurrence_cache(self) -> OccurrenceCache:
+        """繰り返し予定のキャッシュを返す（初回だけ保存先から繰り返し予定を集めて構築）"""
+        if self.occurrence_cache is None:
+            self.occurrence_cache = OccurrenceCache(load_recurring_events())
+            add_change_listener(self.occurrence_cache.on_change)
+        return self.occurrence_cache
+
+    def get_occurrences_for_date(self, date_str: str) -> list[dict]:
+        """
+        指定した日に現れる繰り返し予定（元の日付以外の発生分）を返します。
+        各予定には元の日付を示す "occurrence_of" キーが付きます。
+        """
+        year, month = int(date_str[:4]), int(date_str[5:7])
+        return self._get_occurrence_cache().month(year, month).get(date_str, [])
+
+    def _month_range(self, year: int | None = None, month: int | None = None) -> tuple[str, str]:
+        """year 年 month 月（省略時は表示中の月）の初日と末日（"YYYY-MM-DD"）"""
+        year = self.current_year if year is None else year
+        month = self.current_month if month is None else month
+        last_day = calendar.monthrange(year, month)[1]
+        prefix = f"{year}-{month:02d}"
+        return f"{prefix}-01", f"{prefix}-{last_day:02d}"
+
+    def _iter_occurrences(self, start: str, end: str):
+        """start〜end に現れる繰り返し予定の発生分を (日付, 予定) で日付・開始時刻順に返す"""
+        cache = self._get_occurrence_cache()
+        year, month = int(start[:4]), int(start[5:7])
+        while (year, month) <= (int(end[:4]), int(end[5:7])):
+            occurrences = cache.month(year, month)
+            for date_str in sorted(occurrences):
+                if start <= date_str <= end:
+                    for ev in sorted(occurrences[date_str], key=day_order):
+                        yield date_str, ev
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def iter_events(self, start_date, end_date, *, fields=None, occurrences: bool = True):
+        """
+        start_date〜end_date（両端を含む。"YYYY-MM-DD" か date）の予定を
+        (日付, 予定) の形で日付・開始時刻順に返すジェネレータです。
+        表示中の月に収まる範囲は手元の self.events から、それ以外は保存先から順に読みます。
+        occurrences が True なら繰り返し予定の発生分（"occurrence_of" 付き）も同じ順序で混ぜます。
+        fields の意味は event_manager.iter_events と同じです。
+        """
+        start = start_date.isoformat() if isinstance(start_date, date) else start_date
+        end = end_date.isoformat() if isinstance(end_date, date) else end_date
+        first, last = self._month_range()
+        source = self.events if first <= start and end <= last else None
+        items = iter_events(start, end, events=source)
+        if occurrences:
+            items = heapq.merge(items, self._iter_occurrences(start, end),
+                                key=lambda item: (item[0], day_order(item[1])))
+        if fields is None:
+            yield from items
+            return
+        unknown = set(fields) - EVENT_FIELDS.keys()
+        if unknown:
+            raise ValueError(f"iter_events: 不明な項目です: {sorted(unknown)}")
+        for date_str, ev in items:
+            yield date_str, {f: ev.get(f, EVENT_FIELDS[f]) for f in fields}
+
+    def get_display_events(self, year: int | None = None, month: int | None = None) -> EventTable:
+        """
+        year 年 month 月（省略時は表示中の月）について、保存された予定に繰り返し予定の発生分を
+        合わせた EventTable を返します。
+        描画内容の組み立て用で、保存や編集には self.events を使います。
+        """
+        table = EventTable()
+        month_range = self._month_range(year, month)
+        for date_str, day in groupby(self.iter_events(*month_range), key=lambda item: item[0]):
+            table.set_day(date_str, [ev for _, ev in day])
+        return table
+
+    def skip_occurrence(self, date_str: str, occurrence: dict) -> None:
+        """繰り返し予定を date_str の回だけ取りやめる（元の予定の除外日に加える）"""
+        master_date = occurrence["occurrence_of"]
+        events = self.events
+        if master_date not in events:
+            # 保存方式によっては元の予定が表示中の月の外にあるので、その月を読む
+            events = load_events_for_month(int(master_date[:4]), int(master_date[5:7]))
+        master = {k: v for k, v in occurrence.items() if k != "occurrence_of"}
+        for index, ev in enumerate(events.get(master_date, [])):
+            if ev == master:
+                rule = dict(ev["recurrence"])
+                rule["exdates"] = sorted(set(rule.get("exdates") or []) | {date_str})
+                update_event(events, master_date, index, ev["title"], ev["start_time"],
+                             ev["end_time"], ev.get("memo", ""), rule)
+                return
+
+    def import_ics(self, path: str) -> dict:
+        """
+        .ics ファイルの予定を取り込み、表示中の月とインデックスを読み直します。
+        戻り値は {"imported": 件数, "duplicates": 件数}。
+        """
+        result = ics.import_ics(path)
+        if result["imported"]:
+            # まとめて保存したので、差分更新ではなく作り直す
+            if self.search_index is not None:
+                self.search_index.rebuild(load_events())
+            if self.occurrence_cache is not None:
+                self.occurrence_cache.rebuild(load_recurring_events())
+            self.month_models.clear()
+            self.load_data()
+        return result
+
+    def export_ics(self, path: str) -> int:
+        """保存されているすべての予定を .ics ファイルに書き出し、件数を返します。"""
+        return ics.export_ics(path)
+
+    def get_display_forecast(self) -> dict:
+        """日付セルに描く日ごとの予報 {"YYYY-MM-DD": DayForecast} を返します。"""
+        return self.forecast
+
+    def _check_today(self) -> None:
+        """日付が変わっていたら、昨日と今日を含む月の描画内容を捨てる（今日の強調が移るため）"""
+        today = date.today()
+        if today != self._today:
+            self.month_models.invalidate(self._today.year, self._today.month)
+            self.month_models.invalidate(today.year, today.month)
+            self._today = today
+
+    def _build_month_model(self, year: int, month: int, sig: tuple) -> MonthModel:
+        get_holidays_for_year(year)
+        model = build_month_model(
+            year, month, self.holiday_index.holidays_in_month(year, month),
+            self.get_display_events(year, month), self.forecast, self._today, sig)
+        self.month_models.put(model)
+        return model
+
+    def get_month_model(self) -> MonthModel:
+        """
+        表示中の月の描画内容を返します（CalendarView はこれをそのまま描きます）。
+        キャッシュにあり、組み立てたときから外部で保存ファイルが変わっていなければ組み立て直しません
+        （このプロセスでの変更は、変更通知で該当する月だけを捨てています）。
+        """
+        self._check_today()
+        model = self.month_models.get(self.current_year, self.current_month, self._storage_sig)
+        if model is not None:
+            return model
+        return self._build_month_model(self.current_year, self.current_month, self._storage_sig)
+
+    def prefetch_adjacent_months(self) -> int:
+        """
+        表示中の月の前後の月の描画内容を、まだなければ組み立てておきます（UI の空き時間に呼びます）。
+        組み立てた月の数を返します。
+        """
+        self._check_today()
+        year, month = self.current_year, self.current_month
+        built = 0
+        for y, m in ((year - 1, 12) if month == 1 else (year, month - 1),
+                     (year + 1, 1) if month == 12 else (year, month + 1)):
+            if (y, m) in self.month_models:
+                continue
+            self._build_month_model(y, m, storage_signature(y, m))
+            built += 1
+        return built
+
+    def on_theme_changed(self) -> None:
+        """テーマが切り替わったら、色を解決済みの描画内容をすべて捨てます。"""
+        self.month_models.clear()
+
+    def get_weather_info(self) -> dict | None:
+        """
+        コントローラが保持する最新の天気情報を取得します。
+        複数の地域があるときは、いまステータスバーに出している地域の分を返します。
+        """
+        if not self.weather_infos:
+            return None
+        return self.weather_infos[self._weather_pos]
+
+    def get_events_for_date(self, date_str: str) -> list[dict]:
+        """
+        指定された日付のイベントリストを取得します。
+        このコントローラが保持するイベントデータを使用します。
+        """
+        return self.events.get(date_str, []) # self.eventsから取得
+    
+    def add_event_to_date(self, date_str: str, title: str,
+                          start_time: str = "", end_time: str = "", memo: str = "") -> None:
+        """
+        指定された日付に新しいイベントを追加し、保存します。
+        """
         add_event(self.events, date_str, title, start_time, end_time, memo)
\ No newline at end of file
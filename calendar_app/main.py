@@ -1,9 +1,13 @@
-from ui.main_window import MainWindow
-
-def main():
-    """アプリケーションを起動します。"""
-    app = MainWindow()
-    app.run()
-
-if __name__ == "__main__":
-    main()
+import multiprocessing
+
+from ui.main_window import MainWindow
+
+def main():
+    """アプリケーションを起動します。"""
+    app = MainWindow()
+    app.run()
+
+if __name__ == "__main__":
+    # PyInstaller で固めた exe から .ics 取り込みのプロセスプールを使えるようにする
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,64 @@
+# calendar_app/maintenance.py
+#
+# 予定ファイル（events.json）の点検・整理をコマンドラインで行うスクリプト（Tk 不要）。
+# アプリを終了した状態で実行してください。
+#
+#   python maintenance.py                       # 検査・重複削除・並べ替え・空キー削除
+#   python maintenance.py --dry-run             # 書き込まずに結果だけ表示
+#   python maintenance.py --archive-before 2020 # 2019 年以前の予定を events.archive.json へ退避
+#   python maintenance.py --file path/to/events.json --salvage
+#
+# 終了コード: 0 = 成功、1 = JSON として読めない箇所があり書き込まなかった、2 = 対象外の保存方式
+
+import argparse
+import os
+import sys
+
+from services import event_manager
+from services import event_maintenance
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="events.json の点検と整理")
+    parser.add_argument("--file", help="対象のファイル（省略時はアプリの events.json）")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに結果だけを表示する")
+    parser.add_argument("--archive-before", type=int, metavar="YEAR",
+                        help="この年より前の予定を退避ファイルへ移す")
+    parser.add_argument("--archive-file", help="退避先（省略時は events.archive.json）")
+    parser.add_argument("--salvage", action="store_true",
+                        help="JSON として読めない箇所があっても、そこまでに読めた分で書き直す")
+    args = parser.parse_args(argv)
+
+    path = args.file
+    if path is None:
+        if event_manager.STORAGE_MODE not in ("json", "journal"):
+            print(f"保存方式 {event_manager.STORAGE_MODE} は対象外です（events.json を使う json / journal 方式のみ）",
+                  file=sys.stderr)
+            return 2
+        path = event_manager.EVENTS_FILE
+        if event_manager.STORAGE_MODE == "journal" and not args.dry_run:
+            # ジャーナルの未反映分は予定の位置（index）で記録されているので、並べ替える前に畳み込む
+            event_manager.save_events(event_manager.load_events())
+    if not os.path.exists(path):
+        print(f"ファイルがありません: {path}", file=sys.stderr)
+        return 1
+
+    try:
+        report = event_maintenance.compact(
+            path,
+            archive_before=args.archive_before,
+            archive_file=args.archive_file,
+            dry_run=args.dry_run,
+            salvage=args.salvage,
+        )
+    except event_maintenance.StoreSyntaxError as e:
+        print(f"JSON として読めません: {path}\n  {e}\n"
+              "  --salvage を付けると、読めた分だけで書き直します（元のファイルは .bak に残ります）",
+              file=sys.stderr)
+        return 1
+    print(event_maintenance.format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
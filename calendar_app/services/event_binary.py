@@ -0,0 +1,335 @@
+# calendar_app/services/event_binary.py
+#
+# 予定のバイナリ保存形式（events.bin）の読み書き。
+# JSON より小さく、mmap したまま必要な月の分だけを復元できるようにします。
+#
+# ファイルの構成（整数はすべてリトルエンディアン）:
+#   ヘッダ        : マジック "CALB"、形式バージョン、反映済みのジャーナル連番、
+#                   日付数、予定数、各表の開始位置
+#   日付索引      : 日付ごとに (日付の序数, 最初の予定の番号, 件数) の固定長 12 バイト。序数の昇順
+#   予定表        : 予定ごとに (開始分, 終了分, タイトル・メモ・追加情報の位置と長さ) の固定長 28 バイト
+#   文字列ヒープ  : UTF-8 の文字列を並べた領域。同じ文字列は 1 回だけ格納する
+#
+# 時刻は 0 時からの分（未設定は -1）で持ちます。"HH:MM" 以外の書き方の時刻や
+# 繰り返し規則などの 4 項目以外の情報は、追加情報（JSON）としてヒープに入れるので、
+# JSON 形式との間で内容を失わずに相互変換できます。
+#
+# 繰り返し予定のある年月は、書き出すたびに別ファイル（events.bin.recurring）に
+# events.bin の署名と一緒に記録し、繰り返し予定を集めるときに全体を復元せずに済ませます。
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from datetime import date
+from itertools import islice
+from threading import RLock
+
+from utils.calendar_utils import time_to_minutes
+from utils.resource import file_signature
+
+MAGIC = b"CALB"
+VERSION = 1
+
+# magic, version, flags, journal_seq, 日付数, 予定数, 日付索引・予定表・ヒープの開始位置
+_HEADER = struct.Struct("<4sHHqIIQQQ")
+_INDEX = struct.Struct("<III")
+_RECORD = struct.Struct("<hhIIIIII")
+
+_STANDARD_KEYS = ("title", "start_time", "end_time", "memo")
+
+# パスごとの読み込み用オブジェクト（ファイルの署名が変わったら開き直す）。
+# 復元中に別スレッドの書き込みで mmap を閉じないよう、復元と置き換えは同じロックで直列化する
+_readers: dict[str, tuple[tuple, "BinaryReader"]] = {}
+_READER_LOCK = RLock()
+
+
+def _encode_time(text: str) -> int | None:
+    """"HH:MM" を分にする。空なら -1、分に直すと元の文字列に戻らないものは None"""
+    if not text:
+        return -1
+    minutes = time_to_minutes(text)
+    if minutes is None or f"{minutes // 60:02d}:{minutes % 60:02d}" != text:
+        return None
+    return minutes
+
+
+# 分 + 1 → "HH:MM"（-1 は時刻なしの空文字）。復元のたびに書式化しないよう表にしておく
+_TIME_TEXT = [""] + [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60 + 1)]
+
+
+def encode(events: dict, journal_seq: int = 0) -> bytes:
+    """events（"YYYY-MM-DD" → 予定のリスト）をバイナリ形式にします。"""
+    heap = bytearray()
+    offsets: dict[str, tuple[int, int]] = {}
+
+    def put(text: str) -> tuple[int, int]:
+        # 同じ文字列はヒープ上の同じ位置を指す
+        ref = offsets.get(text)
+        if ref is None:
+            data = text.encode("utf-8")
+            ref = offsets[text] = (len(heap), len(data))
+            heap.extend(data)
+        return ref
+
+    index = bytearray()
+    records = bytearray()
+    count = 0
+    for date_str in sorted(events):
+        day = events[date_str]
+        if not day:
+            continue
+        index += _INDEX.pack(date.fromisoformat(date_str).toordinal(), count, len(day))
+        for ev in day:
+            extra = {k: v for k, v in ev.items() if k not in _STANDARD_KEYS}
+            start = _encode_time(ev.get("start_time", ""))
+            end = _encode_time(ev.get("end_time", ""))
+            if start is None:
+                start, extra["start_time"] = -1, ev["start_time"]
+            if end is None:
+                end, extra["end_time"] = -1, ev["end_time"]
+            extra_text = json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else ""
+            records += _RECORD.pack(start, end, *put(ev.get("title", "")),
+                                    *put(ev.get("memo", "")), *put(extra_text))
+            count += 1
+
+    index_off = _HEADER.size
+    records_off = index_off + len(index)
+    heap_off = records_off + len(records)
+    header = _HEADER.pack(MAGIC, VERSION, 0, journal_seq, len(index) // _INDEX.size, count,
+                          index_off, records_off, heap_off)
+    return b"".join((header, bytes(index), bytes(records), bytes(heap)))
+
+
+def write(path: str, events: dict, journal_seq: int = 0) -> None:
+    """一時ファイルに書いて fsync してから置き換えます。"""
+    data = encode(events, journal_seq)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    # 置き換えても更新日時・サイズ・inode は変わらないので、置き換え前に署名を取っておく
+    sig = file_signature(tmp_path)
+    with _READER_LOCK:
+        # Windows では開いたままのファイルを置き換えられないので先に閉じる
+        cached = _readers.pop(path, None)
+        if cached is not None:
+            cached[1].close()
+        os.replace(tmp_path, path)
+    _write_recurring_index(path, sig, _recurring_months_of(events))
+
+
+def _recurring_index_path(path: str) -> str:
+    return path + ".recurring"
+
+
+def _recurring_months_of(events: dict) -> list[str]:
+    """繰り返し規則のある予定を含む年月（"YYYY-MM"）を昇順で返します。"""
+    return sorted({d[:7] for d, evs in events.items()
+                   if any(ev.get("recurrence") for ev in evs)})
+
+
+def _write_recurring_index(path: str, sig: tuple, months: list[str]) -> None:
+    """
+    繰り返し予定のある年月を、その内容のときの path の署名と一緒に記録します。
+    署名が食い違えば recurring_months が作り直すので、fsync はしません。
+    """
+    index_path = _recurring_index_path(path)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"sig": list(sig), "months": months}, f)
+    os.replace(index_path + ".tmp", index_path)
+
+
+class BinaryReader:
+    """events.bin を mmap し、日付索引を二分探索して必要な日の予定だけを復元します。"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空ファイルは mmap できない
+            self._file.close()
+            raise ValueError(f"バイナリ形式のヘッダがありません: {path}")
+        (magic, version, _flags, self.journal_seq, self.date_count, self.event_count,
+         self._index_off, self._records_off, self._heap_off) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version > VERSION:
+            self.close()
+            raise ValueError(f"未対応のバイナリ形式です: {path}（version={version}）")
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def _ordinal_at(self, i: int) -> int:
+        return _INDEX.unpack_from(self._mm, self._index_off + i * _INDEX.size)[0]
+
+    def _lower_bound(self, ordinal: int) -> int:
+        """序数が ordinal 以上になる最初の日付索引の番号"""
+        return bisect_left(range(self.date_count), ordinal, key=self._ordinal_at)
+
+    def iter_days(self, start: date | None = None, end: date | None = None):
+        """start〜end（両端を含む）の日を (日付, 予定のリスト) で日付順に返します。"""
+        lo = self._lower_bound(start.toordinal()) if start else 0
+        hi = self._lower_bound(end.toordinal() + 1) if end else self.date_count
+        if lo >= hi:
+            return
+        mm = self._mm
+        heap = self._heap_off
+        strings: dict[int, str] = {}
+        times = _TIME_TEXT
+
+        # 範囲内の日付索引と予定表をまとめて切り出し、先頭から順に復元する
+        index = _INDEX.iter_unpack(mm[self._index_off + lo * _INDEX.size:
+                                      self._index_off + hi * _INDEX.size])
+        _, first, _ = _INDEX.unpack_from(mm, self._index_off + lo * _INDEX.size)
+        _, last_first, last_count = _INDEX.unpack_from(mm, self._index_off + (hi - 1) * _INDEX.size)
+        records = _RECORD.iter_unpack(mm[self._records_off + first * _RECORD.size:
+                                         self._records_off + (last_first + last_count) * _RECORD.size])
+
+        def text(off: int, length: int) -> str:
+            value = strings[off] = mm[heap + off:heap + off + length].decode("utf-8")
+            return value
+
+        # 同じ位置の文字列は 1 回だけ復元して共有する（件数が多いので関数呼び出しを避けて辞書を直接引く）。
+        # 空文字は長さ 0 で次の文字列と同じ位置を指すので、辞書を引く前に除く
+        get = strings.get
+        for ordinal, _, count in index:
+            day = []
+            for s, e, t_off, t_len, m_off, m_len, x_off, x_len in islice(records, count):
+                ev = {
+                    "title":      (get(t_off) or text(t_off, t_len)) if t_len else "",
+                    "start_time": times[s + 1],
+                    "end_time":   times[e + 1],
+                    "memo":       (get(m_off) or text(m_off, m_len)) if m_len else ""
+                }
+                if x_len:
+                    ev.update(json.loads(get(x_off) or text(x_off, x_len)))
+                day.append(ev)
+            yield date.fromordinal(ordinal).isoformat(), day
+
+    def month(self, year: int, month: int) -> dict:
+        """その月の予定だけを復元します（他の月の部分は読みません）。"""
+        first = date(year, month, 1)
+        last = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return dict(self.iter_days(first, date.fromordinal(last.toordinal() - 1)))
+
+    def all(self) -> dict:
+        return dict(self.iter_days())
+
+    def months(self) -> list[str]:
+        """予定のある年月（"YYYY-MM"）を昇順で返します。"""
+        result = []
+        for i in range(self.date_count):
+            ym = date.fromordinal(self._ordinal_at(i)).isoformat()[:7]
+            if not result or result[-1] != ym:
+                result.append(ym)
+        return result
+
+
+def _open_reader(path: str) -> BinaryReader | None:
+    """
+    path の読み込み用オブジェクトを返します（ファイルがなければ None）。
+    前回開いたときからファイルが変わっていなければ、同じ mmap を使い回します。
+    _READER_LOCK を保持して呼び、戻り値はロックを保持している間だけ使います。
+    """
+    sig = file_signature(path)
+    cached = _readers.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    if cached is not None:
+        cached[1].close()
+        del _readers[path]
+    if sig is None:
+        return None
+    reader = BinaryReader(path)
+    _readers[path] = (sig, reader)
+    return reader
+
+
+def load_month(path: str, year: int, month: int) -> tuple[dict, int]:
+    """その月の予定と、ファイルに反映済みのジャーナル連番を返します。"""
+    with _READER_LOCK:
+        reader = _open_reader(path)
+        if reader is None:
+            return {}, 0
+        return reader.month(year, month), reader.journal_seq
+
+
+def load_all(path: str) -> tuple[dict, int]:
+    """すべての予定と、ファイルに反映済みのジャーナル連番を返します。"""
+    with _READER_LOCK:
+        reader = _open_reader(path)
+        if reader is None:
+            return {}, 0
+        return reader.all(), reader.journal_seq
+
+
+def list_months(path: str) -> list[str]:
+    """予定のある年月（"YYYY-MM"）を昇順で返します。"""
+    with _READER_LOCK:
+        reader = _open_reader(path)
+        return reader.months() if reader is not None else []
+
+
+def recurring_months(path: str) -> list[str]:
+    """
+    ファイルに繰り返し予定を含む年月（"YYYY-MM"）を昇順で返します。
+    記録した署名がファイルと一致すれば記録を返し、他のプロセスが書き換えた場合などは
+    一度だけ全体を復元して記録し直します（ジャーナルの分は含みません）。
+    """
+    try:
+        with open(_recurring_index_path(path), encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = None
+    sig = file_signature(path)
+    if sig is None:
+        return []
+    if isinstance(index, dict) and index.get("sig") == list(sig):
+        return index.get("months", [])
+    with _READER_LOCK:
+        reader = _open_reader(path)
+        if reader is None:
+            return []
+        sig = _readers[path][0]   # 開いた時点の署名（その後に置き換わっても食い違いで気づける）
+        months = _recurring_months_of(reader.all())
+    _write_recurring_index(path, sig, months)
+    return months
+
+
+def close(path: str) -> None:
+    """開いている mmap を閉じます。"""
+    with _READER_LOCK:
+        cached = _readers.pop(path, None)
+        if cached is not None:
+            cached[1].close()
+
+
+def json_to_binary(json_path: str, bin_path: str) -> int:
+    """events.json をバイナリ形式に変換し、変換した予定の件数を返します。"""
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    events = {k: v for k, v in data.items() if isinstance(v, list) and not k.startswith("_")}
+    write(bin_path, events)
+    return sum(len(v) for v in events.values())
+
+
+def binary_to_json(bin_path: str, json_path: str) -> int:
+    """バイナリ形式を events.json と同じ形式の JSON に書き出し、予定の件数を返します。"""
+    events, _ = load_all(bin_path)
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(events, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, json_path)
+    return sum(len(v) for v in events.values())
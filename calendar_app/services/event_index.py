@@ -0,0 +1,149 @@
+# calendar_app/services/event_index.py
+#
+# 予定の時間帯（日付 + 0 時からの分数）を引くための区間インデックス。
+# 日付ごとに開始時刻でソートした配列と「そこまでの終了時刻の最大値」を持ち、
+# 重なり検索を二分探索＋必要な範囲だけの走査で行います。
+# 開始時刻のない予定（終日扱いのメモなど）は対象外です。
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+from utils.calendar_utils import time_to_minutes
+
+_DAY_MINUTES = 24 * 60
+
+
+def _interval(ev: dict) -> tuple[int, int] | None:
+    """予定の [開始分, 終了分) を返します。終了がない・開始以前なら 1 分間として扱います。"""
+    start = time_to_minutes(ev.get("start_time", ""))
+    if start is None:
+        return None
+    end = time_to_minutes(ev.get("end_time", ""))
+    if end is None or end <= start:
+        end = min(start + 1, _DAY_MINUTES)
+    return start, end
+
+
+class _DayIntervals:
+    """1 日分の区間。starts は昇順、max_ends[i] は ends[0..i] の最大値。"""
+
+    __slots__ = ("starts", "ends", "max_ends", "events")
+
+    def __init__(self, day_events: list[dict]):
+        items = sorted(
+            ((iv, ev) for ev in day_events if (iv := _interval(ev)) is not None),
+            key=lambda item: item[0]
+        )
+        self.starts = [iv[0] for iv, _ in items]
+        self.ends = [iv[1] for iv, _ in items]
+        self.events = [ev for _, ev in items]
+        self.max_ends = []
+        running = 0
+        for end in self.ends:
+            running = max(running, end)
+            self.max_ends.append(running)
+
+    def overlapping(self, start: int, end: int) -> list[int]:
+        """[start, end) と重なる区間の添字を開始時刻順で返します。"""
+        hits = []
+        i = bisect_left(self.starts, end) - 1
+        # max_ends が start 以下になった時点で、それより前に重なる区間はない
+        while i >= 0 and self.max_ends[i] > start:
+            if self.ends[i] > start:
+                hits.append(i)
+            i -= 1
+        hits.reverse()
+        return hits
+
+
+class IntervalIndex:
+    """
+    events（"YYYY-MM-DD" → 予定リスト）に対する時間帯インデックス。
+    予定が変わった日だけ reindex_date() で作り直します。
+    """
+
+    def __init__(self, events: dict | None = None):
+        self._days: dict[int, _DayIntervals] = {}
+        self._ordinals: list[int] = []   # 予定のある日の序数（昇順）
+        if events:
+            self.rebuild(events)
+
+    def rebuild(self, events: dict) -> None:
+        """events 全体からインデックスを作り直します。"""
+        self._days.clear()
+        for date_str, day_events in events.items():
+            self._set_day(date_str, day_events)
+        self._ordinals = sorted(self._days)
+
+    def _set_day(self, date_str: str, day_events: list[dict]) -> bool:
+        """その日の区間を登録し、区間が 1 つでもあれば True を返します。"""
+        try:
+            ordinal = date.fromisoformat(date_str).toordinal()
+        except ValueError:
+            return False
+        day = _DayIntervals(day_events or [])
+        if day.starts:
+            self._days[ordinal] = day
+            return True
+        self._days.pop(ordinal, None)
+        return False
+
+    def reindex_date(self, date_str: str, day_events: list[dict] | None) -> None:
+        """1 日分だけ作り直します（追加・更新・削除のあとに呼びます）。"""
+        try:
+            ordinal = date.fromisoformat(date_str).toordinal()
+        except ValueError:
+            return
+        had = ordinal in self._days
+        has = self._set_day(date_str, day_events)
+        if has and not had:
+            insort(self._ordinals, ordinal)
+        elif had and not has:
+            del self._ordinals[bisect_left(self._ordinals, ordinal)]
+
+    def overlapping(self, date_str: str, start, end, exclude: dict | None = None) -> list[dict]:
+        """
+        date_str の [start, end) と時間帯が重なる予定を返します。
+        start / end は "HH:MM" か分数。end を省略（空）すると start の 1 分間として扱います。
+        exclude に渡した予定（編集中のもの）は結果から除きます。
+        """
+        day = self._days.get(date.fromisoformat(date_str).toordinal())
+        if day is None:
+            return []
+        q_start = start if isinstance(start, int) else time_to_minutes(start)
+        q_end = end if isinstance(end, int) else time_to_minutes(end)
+        if q_start is None:
+            return []
+        if q_end is None or q_end <= q_start:
+            q_end = q_start + 1
+        return [
+            day.events[i] for i in day.overlapping(q_start, q_end)
+            if day.events[i] is not exclude
+        ]
+
+    def events_at(self, moment: datetime) -> list[dict]:
+        """指定した日時に行われている予定を返します。"""
+        minute = moment.hour * 60 + moment.minute
+        day = self._days.get(moment.toordinal())
+        if day is None:
+            return []
+        return [day.events[i] for i in day.overlapping(minute, minute + 1)]
+
+    def events_between(self, start_dt: datetime, end_dt: datetime) -> list[tuple[str, dict]]:
+        """
+        [start_dt, end_dt) と重なる予定を (日付キー, 予定) の時系列順で返します。
+        日をまたぐ範囲でも、予定のある日だけを二分探索で辿ります。
+        """
+        first, last = start_dt.toordinal(), end_dt.toordinal()
+        results = []
+        lo = bisect_left(self._ordinals, first)
+        hi = bisect_right(self._ordinals, last)
+        for ordinal in self._ordinals[lo:hi]:
+            day = self._days[ordinal]
+            q_start = start_dt.hour * 60 + start_dt.minute if ordinal == first else 0
+            q_end = end_dt.hour * 60 + end_dt.minute if ordinal == last else _DAY_MINUTES
+            if q_end <= q_start:
+                continue
+            date_str = date.fromordinal(ordinal).isoformat()
+            results.extend((date_str, day.events[i]) for i in day.overlapping(q_start, q_end))
+        return results
@@ -0,0 +1,79 @@
+# calendar_app/services/event_journal.py
+#
+# 追記専用ジャーナル（1 行 1 レコードのコンパクトな JSON）の読み書き。
+# 各レコードには連番 "seq" を付与し、スナップショット側に記録した
+# journal_seq より新しいレコードだけを再生することで二重適用を防ぎます。
+
+import json
+import os
+import sys
+
+
+def append_records(path: str, records: list[dict]) -> None:
+    """レコードをジャーナル末尾に追記し、ディスクまで書き出します。"""
+    lines = "".join(
+        json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for rec in records
+    )
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_records(path: str) -> list[dict]:
+    """
+    ジャーナルを先頭から読み込みます。
+    途中で壊れた行（書き込み途中で落ちた末尾レコードなど）があれば、
+    その手前までを有効とし、ファイルも正常な位置まで切り詰めます。
+    """
+    records = []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return records
+
+    good_end = 0
+    torn = False
+    with f:
+        for raw in f:
+            # 改行で終わらない行は書き込み途中とみなす
+            if not raw.endswith(b"\n"):
+                torn = True
+                break
+            try:
+                rec = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                torn = True
+                break
+            if not isinstance(rec, dict) or "seq" not in rec:
+                torn = True
+                break
+            records.append(rec)
+            good_end += len(raw)
+
+    if torn:
+        print(f"[warning] ジャーナル末尾の壊れたレコードを破棄しました: {path}", file=sys.stderr)
+        with open(path, "r+b") as f:
+            f.truncate(good_end)
+    return records
+
+
+def rewrite_after(path: str, seq: int) -> None:
+    """seq 以下のレコードを取り除いてジャーナルを書き直します（コンパクション後）。"""
+    remaining = [rec for rec in read_records(path) if rec["seq"] > seq]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for rec in remaining:
+            f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def journal_size(path: str) -> int:
+    """ジャーナルのバイト数（存在しなければ 0）を返します。"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,376 @@
+# calendar_app/services/event_maintenance.py
+#
+# events.json の点検と整理（オフラインで実行するメンテナンス用。Tk 不要）。
+#
+#   - 検査   : ファイルを少しずつ読みながら、日付キー・予定の形式を 1 日ずつ確かめる
+#              （json.load と違い、重複した日付キーも後勝ちで消さずに見つけられる）
+#   - 整理   : 同じ内容の予定の重複を除き、1 日の中を開始時刻順に並べ、空の日付キーを除く
+#   - 退避   : 指定した年より前の予定を別ファイル（コールドファイル）へ移す
+#
+# 形式の壊れた日付・予定は捨てずに退避ファイル（*.rejected.json）へ書き出します。
+
+import json
+import os
+import shutil
+import time
+from datetime import date
+from json.decoder import scanstring
+
+from services.event_records import META_KEY, day_order
+from services.file_lock import interprocess_lock
+from utils.calendar_utils import time_to_minutes
+
+# 一度に読み込む文字数
+CHUNK_CHARS = 1 << 20
+
+_STANDARD_KEYS = ("title", "start_time", "end_time", "memo")
+_WHITESPACE = " \t\r\n"
+
+
+class StoreSyntaxError(ValueError):
+    """JSON として読めない位置があったことを表します（line は 1 始まり）。"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"{line} 行目: {message}")
+        self.line = line
+
+
+def iter_json_object(path: str, chunk_chars: int = CHUNK_CHARS):
+    """
+    最上位が {...} の JSON ファイルを先頭から少しずつ読み、(キー, 値, 行番号) を順に返します。
+    ファイル全体を 1 つの dict にしないので、メモリに載るのは常に 1 日分程度です。
+    最上位が空の配列（初回作成時の "[]"）なら空として扱います。
+    読めない位置があれば、それまでの項目を返したあとで StoreSyntaxError を送出します。
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        line = 1
+        eof = False
+
+        def fill() -> bool:
+            # 読み終えた部分（pos より前）を捨てて続きを足す。足せなければ何も変えずに False
+            nonlocal buf, pos, line, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                eof = True
+                return False
+            line += buf.count("\n", 0, pos)
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_ws() -> str:
+            # 空白を読み飛ばして次の 1 文字を返す（ファイル末尾なら空文字）
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return buf[pos:pos + 1]
+
+        def error(message: str) -> StoreSyntaxError:
+            return StoreSyntaxError(message, line + buf.count("\n", 0, pos))
+
+        def read_value(what: str):
+            # pos から値を 1 つ読む。読み込みの切れ目で途切れた値（数値など）を確定させないよう、
+            # 後ろに文字が続くかファイル末尾に達するまで読み足してから返す
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if fill():
+                        continue
+                    raise error(f"{what}が読めません（{e.msg}）")
+                if end < len(buf) or not fill():
+                    pos = end
+                    return value
+
+        first = skip_ws()
+        if first == "":
+            return
+        if first == "[":
+            if read_value("最上位の値"):
+                raise error("最上位が配列です")
+            return
+        if first != "{":
+            raise error("最上位が { で始まっていません")
+        pos += 1
+        if skip_ws() == "}":
+            return
+        while True:
+            if skip_ws() != '"':
+                raise error("日付キーの文字列がありません")
+            while True:
+                try:
+                    key, pos = scanstring(buf, pos + 1)
+                    break
+                except ValueError:
+                    if not fill():
+                        raise error("日付キーが閉じていません")
+            if skip_ws() != ":":
+                raise error(f"{key!r} の後に : がありません")
+            pos += 1
+            skip_ws()
+            item_line = line + buf.count("\n", 0, pos)
+            yield key, read_value(f"{key!r} の値"), item_line
+            sep = skip_ws()
+            if sep == ",":
+                pos += 1
+                continue
+            if sep == "}":
+                return
+            raise error(f"{key!r} の後に , または }} がありません")
+
+
+def _valid_date(key: str) -> bool:
+    if len(key) != 10:
+        return False
+    try:
+        date.fromisoformat(key)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_time(text) -> bool:
+    return text == "" or (isinstance(text, str) and time_to_minutes(text) is not None)
+
+
+def _check_event(ev) -> str | None:
+    """予定 1 件を確かめ、保存形式として使えなければ理由を返します。"""
+    if not isinstance(ev, dict):
+        return f"予定が dict ではありません（{type(ev).__name__}）"
+    for key in _STANDARD_KEYS:
+        if not isinstance(ev.get(key, ""), str):
+            return f"{key} が文字列ではありません"
+    return None
+
+
+def _content_key(ev: dict) -> str:
+    """重複の判定に使う、予定の内容そのもの（項目の順序によらない）"""
+    return json.dumps(ev, ensure_ascii=False, sort_keys=True)
+
+
+def _archivable(ev: dict, cutoff: str) -> bool:
+    """
+    cutoff（"YYYY-MM-DD"）より前の日付にある予定を退避してよいか。
+    繰り返し予定は元の日付にしか保存されていないので、cutoff 以降にも発生し得るものは残す。
+    """
+    rule = ev.get("recurrence")
+    if not rule:
+        return True
+    until = rule.get("until") if isinstance(rule, dict) else None
+    return bool(until) and until < cutoff
+
+
+def _new_report() -> dict:
+    return {
+        "days": 0, "events": 0, "empty_days": 0, "duplicate_keys": 0,
+        "duplicates": 0, "reordered_days": 0, "rejected": 0, "bad_times": 0,
+        "archived_days": 0, "archived_events": 0, "issues": [],
+    }
+
+
+def scan(path: str, archive_before: int | None = None, salvage: bool = False):
+    """
+    path を検査・整理し、(残す予定, 退避する予定, 退避ファイルへ送るもの, meta, レポート) を返します。
+    archive_before を渡すと、その年より前の予定を退避する予定として分けます。
+    JSON として読めない箇所があれば StoreSyntaxError を送出します
+    （salvage=True ならそこまでに読めた分で続けます）。
+    """
+    report = _new_report()
+    issues = report["issues"]
+    cutoff = f"{archive_before:04d}-01-01" if archive_before else None
+    events: dict[str, list] = {}
+    rejected: dict[str, list] = {}
+    meta = {}
+    seen: dict[str, set] = {}
+
+    def reject(key: str, value, reason: str, line: int) -> None:
+        rejected.setdefault(key, []).append(value)
+        report["rejected"] += 1
+        issues.append(f"{line} 行目 {key}: {reason}（退避します）")
+
+    try:
+        for key, value, line in iter_json_object(path):
+            if key == META_KEY:
+                meta = value if isinstance(value, dict) else {}
+                continue
+            if not _valid_date(key):
+                reject(key, value, "日付キーが YYYY-MM-DD ではありません", line)
+                continue
+            if not isinstance(value, list):
+                reject(key, value, "値が予定のリストではありません", line)
+                continue
+            if key in events:
+                # json.load なら後の値だけが残るところを、両方の予定を合わせて残す
+                report["duplicate_keys"] += 1
+                issues.append(f"{line} 行目 {key}: 同じ日付キーが重複しています（予定をまとめます）")
+            elif not value:
+                report["empty_days"] += 1
+            day = events.setdefault(key, [])
+            keys = seen.setdefault(key, set())
+            for ev in value:
+                reason = _check_event(ev)
+                if reason:
+                    reject(key, ev, reason, line)
+                    continue
+                if not (_valid_time(ev.get("start_time", "")) and _valid_time(ev.get("end_time", ""))):
+                    report["bad_times"] += 1
+                    issues.append(f"{line} 行目 {key}: 時刻が HH:MM ではありません: "
+                                  f"{ev.get('start_time', '')!r}〜{ev.get('end_time', '')!r}")
+                ck = _content_key(ev)
+                if ck in keys:
+                    report["duplicates"] += 1
+                    continue
+                keys.add(ck)
+                day.append(ev)
+    except StoreSyntaxError as e:
+        if not salvage:
+            raise
+        issues.append(f"{e}（ここから後は読み込めませんでした）")
+
+    kept: dict[str, list] = {}
+    archived: dict[str, list] = {}
+    for key in sorted(events):
+        day = events[key]
+        if not day:
+            continue
+        ordered = sorted(day, key=day_order)
+        if ordered != day:
+            report["reordered_days"] += 1
+        if cutoff and key < cutoff:
+            old = [ev for ev in ordered if _archivable(ev, cutoff)]
+            ordered = [ev for ev in ordered if not _archivable(ev, cutoff)]
+            if old:
+                archived[key] = old
+                report["archived_days"] += 1
+                report["archived_events"] += len(old)
+            if not ordered:
+                continue
+        kept[key] = ordered
+        report["days"] += 1
+        report["events"] += len(ordered)
+    return kept, archived, rejected, meta, report
+
+
+def _merge_into(path: str, days: dict) -> dict:
+    """既存の JSON ファイル（あれば）に days を重複なく足した内容を返します。"""
+    merged: dict[str, list] = {}
+    if os.path.exists(path):
+        for key, value, _ in iter_json_object(path):
+            if isinstance(value, list):
+                merged.setdefault(key, []).extend(value)
+    for key, day in days.items():
+        target = merged.setdefault(key, [])
+        have = {_content_key(ev) for ev in target}
+        target.extend(ev for ev in day if _content_key(ev) not in have)
+    return {k: merged[k] for k in sorted(merged)}
+
+
+def _write_json(path: str, data, indent: int | None = 2) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def parse_time(path: str, repeat: int = 3) -> float | None:
+    """path を json.load するのにかかる時間（repeat 回のうち最短、秒）。読めなければ None"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            with open(path, encoding="utf-8") as f:
+                json.load(f)
+        except ValueError:
+            return None
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def archive_path(path: str) -> str:
+    """退避先（コールドファイル）の既定のパス"""
+    return os.path.splitext(path)[0] + ".archive.json"
+
+
+def rejected_path(path: str) -> str:
+    """形式の壊れた項目の退避先のパス"""
+    return os.path.splitext(path)[0] + ".rejected.json"
+
+
+def compact(path: str, archive_before: int | None = None, archive_file: str | None = None,
+            dry_run: bool = False, salvage: bool = False) -> dict:
+    """
+    path（events.json）を整理して書き直し、レポートを返します。
+    元のファイルは *.bak に残します。書き込み中のアプリと競合しないよう、
+    アプリの保存と同じファイルロックを取り、世代番号を進めて書きます
+    （起動中のアプリは次の保存でこちらの内容とマージします）。
+    dry_run=True なら何も書かずにレポートだけを返します。
+    """
+    archive_file = archive_file or archive_path(path)
+    before_size = os.path.getsize(path)
+
+    with interprocess_lock(path):
+        kept, archived, rejected, meta, report = scan(path, archive_before, salvage)
+        before_parse = parse_time(path)
+        report.update(file=path, before_size=before_size, before_parse=before_parse,
+                      dry_run=dry_run)
+        if dry_run:
+            return report
+
+        if archived:
+            # 退避先を先に書き切ってから本体を書き直す（途中で落ちても予定を失わない）
+            _write_json(archive_file, _merge_into(archive_file, archived))
+            report["archive_file"] = archive_file
+        if rejected:
+            _write_json(rejected_path(path), _merge_into(rejected_path(path), rejected))
+            report["rejected_file"] = rejected_path(path)
+
+        shutil.copy2(path, path + ".bak")
+        data = dict(kept)
+        data[META_KEY] = dict(meta, generation=meta.get("generation", 0) + 1)
+        _write_json(path, data)
+
+    report["after_size"] = os.path.getsize(path)
+    report["after_parse"] = parse_time(path)
+    return report
+
+
+def format_report(report: dict) -> str:
+    """レポートを人が読む形の複数行の文字列にします。"""
+    lines = [f"対象: {report['file']}" + ("（確認のみ・書き込みなし）" if report["dry_run"] else "")]
+    lines += report["issues"][:50]
+    if len(report["issues"]) > 50:
+        lines.append(f"…ほか {len(report['issues']) - 50} 件")
+    lines += [
+        f"残す予定      : {report['events']:,} 件 / {report['days']:,} 日",
+        f"重複した予定  : {report['duplicates']:,} 件を削除",
+        f"重複日付キー  : {report['duplicate_keys']:,} 件をまとめた",
+        f"空の日付キー  : {report['empty_days']:,} 件を削除",
+        f"並べ替えた日  : {report['reordered_days']:,} 日",
+        f"時刻の形式違い: {report['bad_times']:,} 件（そのまま残す）",
+        f"壊れた項目    : {report['rejected']:,} 件を退避",
+    ]
+    if report["archived_events"]:
+        lines.append(f"退避した予定  : {report['archived_events']:,} 件 / {report['archived_days']:,} 日"
+                     + (f" → {report['archive_file']}" if "archive_file" in report else ""))
+    if "after_size" in report:
+        saved = report["before_size"] - report["after_size"]
+        lines.append(f"ファイルサイズ: {report['before_size']:,} → {report['after_size']:,} バイト"
+                     + (f"（{saved:,} バイト削減）" if saved >= 0 else f"（{-saved:,} バイト増加）"))
+        if report["before_parse"] is not None:
+            lines.append(f"解析時間      : {report['before_parse'] * 1000:.2f} → "
+                         f"{report['after_parse'] * 1000:.2f} ms")
+    else:
+        lines.append(f"ファイルサイズ: {report['before_size']:,} バイト")
+        if report["before_parse"] is not None:
+            lines.append(f"解析時間      : {report['before_parse'] * 1000:.2f} ms")
+    return "\n".join(lines)
@@ -1,114 +1,630 @@
-# calendar_app/services/event_manager.py
-
-import json
-import os
-import sys
-from threading import Lock
-from utils.resource import resource_path
-
-# 書き込み対応のファイルパス
-EVENTS_FILE = resource_path("data/events.json", writable=True)
-
-# 複数スレッドから同時に書き込むのを防ぐためロックを用意
-_FILE_LOCK = Lock()
-
-
-def load_events() -> dict:
-    """
-    イベントデータを JSON ファイルから読み込んで返します。
-    ファイルがなければ空の dict、JSON が壊れていれば警告のうえ空の dict を返します。
-    """
-    try:
-        with open(EVENTS_FILE, encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict):
-                return data
-            # 形式が dict でない場合も空にフォールバック
-            return {}
-    except FileNotFoundError:
-        # ファイル未作成時は空データ
-        return {}
-    except json.JSONDecodeError:
-        # JSON 故障時の警告
-        print(f"[warning] イベントファイルの読み込みに失敗しました: {EVENTS_FILE}", file=sys.stderr)
-        return {}
-
-
-def save_events(events: dict) -> None:
-    """
-    イベントデータを JSON ファイルに書き込みます。
-    必要に応じてディレクトリを作成し、 thread-safe に動作します。
-    """
-    os.makedirs(os.path.dirname(EVENTS_FILE), exist_ok=True)
-    with _FILE_LOCK:
-        with open(EVENTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(events, f, ensure_ascii=False, indent=2)
-
-
-def add_event(events: dict,
-              date_str: str,
-              title: str,
-              start_time: str = "",
-              end_time: str = "",
-              memo: str = "") -> None:
-    """
-    新しい予定を events に追加して保存します。
-
-    - date_str: "YYYY-MM-DD" 形式の日付キー
-    - title: イベントタイトル
-    - start_time, end_time: "HH:MM" 形式
-    - memo: 任意のメモ文字列
-    """
-    # 同じキーのリストに追加
-    events.setdefault(date_str, []).append({
-        "title":       title,
-        "start_time":  start_time,
-        "end_time":    end_time,
-        "memo":        memo
-    })
-    save_events(events)
-
-
-def delete_event(events: dict, date_str: str, index: int) -> None:
-    """
-    指定の日(date_str)のイベントリストから index 番目を削除し、空になればキーごと削除して保存します。
-    """
-    if date_str in events and 0 <= index < len(events[date_str]):
-        events[date_str].pop(index)
-        if not events[date_str]:
-            del events[date_str]
-        save_events(events)
-
-        
-# calendar_app/services/event_manager.py (抜粋 - 追加する可能性のある関数)
-# ...既存の import と関数...
-
-def update_event(events: dict,
-                 date_str: str,
-                 index: int,
-                 title: str,
-                 start_time: str = "",
-                 end_time: str = "",
-                 memo: str = "") -> None:
-    """
-    既存のイベントを更新し、保存します。
-
-    - events: 現在のイベントデータ辞書
-    - date_str: "YYYY-MM-DD" 形式の日付キー
-    - index: その日付のイベントリスト内でのインデックス
-    - title: 新しいイベントタイトル
-    - start_time, end_time: "HH:MM" 形式
-    - memo: 任意のメモ文字列
-    """
-    if date_str in events and 0 <= index < len(events[date_str]):
-        # イベントデータを更新
-        events[date_str][index] = {
-            "title":      title,
-            "start_time": start_time,
-            "end_time":   end_time,
-            "memo":       memo
-        }
-        save_events(events)
-    else:
-        # 存在しないイベントを更新しようとした場合の処理（エラーログなど）
-        print(f"[warning] イベントの更新に失敗しました: 日付 {date_str}, インデックス {index} が見つかりません。", file=sys.stderr)
+# calendar_app/services/event_manager.py
+
+import json
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import groupby
+from threading import Lock, RLock
+from utils.resource import resource_path, file_signature
+from services import event_journal
+from services import event_store_sqlite
+from services import event_shards
+from services import event_binary
+from services.file_lock import interprocess_lock
+from services.event_writer import CoalescingWriter
+from services.event_records import (
+    META_KEY, make_event, add_record, update_record, delete_record,
+    apply_record, strip_meta, copy_events, merge_events, day_order,
+)
+
+# 書き込み対応のファイルパス
+EVENTS_FILE = resource_path("data/events.json", writable=True)
+
+# 複数スレッドから同時に書き込むのを防ぐためロックを用意
+# （保存中に同じスレッドからスナップショットを読み直すため再入可能にしておく）
+_FILE_LOCK = RLock()
+
+# 保存方式
+#   "json"    : 変更のたびに events.json 全体を書き直す（従来どおり）
+#   "journal" : 変更 1 件ごとにジャーナルへ追記し、一定サイズで
+#               バックグラウンドにスナップショット（events.json）へ畳み込む
+#   "sqlite"  : events.db に 1 予定 1 行で保存し、月単位で読み出す
+#   "sharded" : events/YYYY-MM.json に月ごとに分けて保存し、必要な月だけ読み書きする
+#   "binary"  : events.bin（固定長の索引と文字列ヒープのバイナリ形式）を mmap して
+#               表示する月だけを復元する。変更は journal 方式と同じくジャーナルに追記し、
+#               一定サイズでバックグラウンドに events.bin へ畳み込む
+STORAGE_MODE = os.environ.get("CALENDAR_APP_STORAGE", "json")
+
+# json 方式で保存を別スレッドに任せるか（連続した保存は 1 回の書き込みにまとめる）
+BACKGROUND_SAVE = os.environ.get("CALENDAR_APP_BACKGROUND_SAVE", "0") == "1"
+
+# まとめ書きの待ち時間（秒）
+SAVE_DEBOUNCE_SEC = 0.5
+
+# ジャーナルがこのサイズを超えたらコンパクションを開始する
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+# ジャーナルの状態（最後に振った連番、スナップショットに反映済みの連番、コンパクション実行中フラグ）
+_journal_state = {"seq": 0, "snapshot_seq": 0, "compacting": False}
+
+# スナップショットの書き出しを直列化するロック（ジャーナル追記はブロックしない）
+_SNAPSHOT_LOCK = Lock()
+
+# スナップショット（events.json）を最後に読んだ／書いたときの stat 署名と内容。
+# 署名が変わっていなければ、月を移動するたびに JSON を解析し直さずに済ませる
+_snapshot_cache = {"sig": None, "events": {}, "meta": {}}
+
+# json 方式で最後に保存したときの世代番号と自分の内容（三者マージの基準）。
+# 世代番号は保存のたびに 1 増やして _meta に記録し、ファイル側の世代が
+# これと違えば他のプロセスが書き込んだとみなしてマージする
+_merge_base = {"generation": None, "events": None}
+
+# BACKGROUND_SAVE 時の書き込みスレッド（初回保存時に生成）
+_writer = None
+
+# 予定の変更を通知するリスナー（インデックスなどの差分更新用）
+_listeners = []
+
+
+def add_change_listener(listener) -> None:
+    """
+    予定が追加・更新・削除されたときに呼ばれる関数を登録します。
+    listener(events, record, old) の形で呼ばれ、old は更新・削除前の予定（追加時は None）です。
+    """
+    _listeners.append(listener)
+
+
+def remove_change_listener(listener) -> None:
+    """add_change_listener で登録した関数を解除します。"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _apply_and_persist(events: dict, record: dict) -> None:
+    """レコードを events に適用して保存し、リスナーに通知します。"""
+    old = apply_record(events, record)
+    _persist(events, record)
+    for listener in list(_listeners):
+        listener(events, record, old)
+
+
+def _journal_file() -> str:
+    """events.json と同じ場所に置くジャーナルファイルのパス"""
+    return os.path.splitext(EVENTS_FILE)[0] + ".journal"
+
+
+def _sqlite_file() -> str:
+    """events.json と同じ場所に置く SQLite データベースのパス"""
+    return os.path.splitext(EVENTS_FILE)[0] + ".db"
+
+
+def _shard_dir() -> str:
+    """月ごとのイベントファイルを置くディレクトリ"""
+    return os.path.join(os.path.dirname(EVENTS_FILE), "events")
+
+
+def _open_shards() -> str:
+    """初回利用時に events.json を月ごとに分割したうえで、ディレクトリのパスを返します。"""
+    shard_dir = _shard_dir()
+    if not os.path.isdir(shard_dir):
+        event_shards.migrate_from_json(EVENTS_FILE, shard_dir)
+    return shard_dir
+
+
+def _binary_file() -> str:
+    """events.json と同じ場所に置くバイナリ形式のファイルのパス"""
+    return os.path.splitext(EVENTS_FILE)[0] + ".bin"
+
+
+def _open_binary() -> str:
+    """初回利用時に events.json をバイナリ形式に変換したうえで、ファイルのパスを返します。"""
+    bin_path = _binary_file()
+    if not os.path.exists(bin_path):
+        event_binary.json_to_binary(EVENTS_FILE, bin_path)
+    return bin_path
+
+
+def migrate_json_to_sqlite() -> int:
+    """
+    既存の events.json を SQLite に一度だけ移行し、移行した件数を返します。
+    データベース側に予定が既にあれば何もしません。
+    """
+    return event_store_sqlite.migrate_from_json(EVENTS_FILE, _sqlite_file())
+
+
+def _open_sqlite() -> str:
+    """初回利用時に events.json から移行したうえで、データベースのパスを返します。"""
+    db_path = _sqlite_file()
+    if not os.path.exists(db_path):
+        migrate_json_to_sqlite()
+    return db_path
+
+
+def _read_snapshot() -> tuple[dict, dict]:
+    """
+    スナップショット（events.json）を読み込み、(events, meta) を返します。
+    前回読み書きしたときから stat 署名が変わっていなければ、ファイルを解析せずに複製を返します。
+    """
+    sig = file_signature(EVENTS_FILE)
+    with _FILE_LOCK:
+        if sig is not None and sig == _snapshot_cache["sig"]:
+            return copy_events(_snapshot_cache["events"]), dict(_snapshot_cache["meta"])
+    try:
+        with open(EVENTS_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        # ファイル未作成時は空データ。他のプロセスが先に作っても上書きしないよう、
+        # 空の内容を世代 0 としてマージの基準にする
+        with _FILE_LOCK:
+            if _merge_base["events"] is None and STORAGE_MODE == "json":
+                _merge_base.update(generation=0, events={})
+        return {}, {}
+    except json.JSONDecodeError:
+        # JSON 故障時の警告
+        print(f"[warning] イベントファイルの読み込みに失敗しました: {EVENTS_FILE}", file=sys.stderr)
+        return {}, {}
+    if not isinstance(data, dict):
+        # 形式が dict でない場合も空にフォールバック
+        return {}, {}
+    events, meta = strip_meta(data)
+    with _FILE_LOCK:
+        _snapshot_cache.update(sig=sig, events=copy_events(events), meta=dict(meta))
+        if _merge_base["events"] is None and STORAGE_MODE == "json":
+            # 最初に読んだ内容を、以降の保存でのマージの基準にする
+            _merge_base.update(generation=meta.get("generation", 0), events=copy_events(events))
+    return events, meta
+
+
+def load_events() -> dict:
+    """
+    イベントデータを JSON ファイルから読み込んで返します。
+    ファイルがなければ空の dict、JSON が壊れていれば警告のうえ空の dict を返します。
+    ジャーナル方式ではスナップショットにジャーナルの未反映分を再生して返します。
+    """
+    # 書き込み待ちの変更があれば先に反映してから読む
+    flush()
+    if STORAGE_MODE == "sqlite":
+        return event_store_sqlite.load_all(_open_sqlite())
+    if STORAGE_MODE == "sharded":
+        return event_shards.load_all(_open_shards())
+
+    if STORAGE_MODE == "binary":
+        events, base_seq = event_binary.load_all(_open_binary())
+        _replay_journal(events, base_seq)
+        return events
+
+    events, meta = _read_snapshot()
+    if STORAGE_MODE != "journal":
+        return events
+    _replay_journal(events, meta.get("journal_seq", 0))
+    return events
+
+
+def _replay_journal(events: dict, base_seq: int, prefix: str = "",
+                    upto: int | None = None) -> None:
+    """
+    ジャーナルのうち base_seq より新しいレコードを events に再生します。
+    prefix を渡すと日付がそれで始まるレコードだけを、upto を渡すとその連番までを再生します。
+    upto を省略したときは、ジャーナルの連番の状態も読み込んだ内容に合わせます。
+    """
+    last_seq = base_seq
+    with _FILE_LOCK:
+        for rec in event_journal.read_records(_journal_file()):
+            if (base_seq < rec["seq"] and (upto is None or rec["seq"] <= upto)
+                    and rec["date"].startswith(prefix)):
+                apply_record(events, rec)
+            last_seq = max(last_seq, rec["seq"])
+        if upto is None:
+            _journal_state["seq"] = last_seq
+            _journal_state["snapshot_seq"] = base_seq
+
+
+def load_events_for_month(year: int, month: int) -> dict:
+    """
+    表示中の月（year, month）の予定を少なくとも含む events を返します。
+    sqlite 方式ではその月の行だけを、sharded 方式ではその月のファイルだけを読み出します
+    （前回から変わっていない月のファイルは読み直しません）。
+    binary 方式は mmap したファイルからその月の分だけを復元し、ジャーナルのその月の分を再生します。
+    json / journal 方式はファイル全体を読むしかないため load_events() と同じです。
+    返した dict は add_event などにそのまま渡せます。
+    """
+    if STORAGE_MODE == "sqlite":
+        return event_store_sqlite.load_month(_open_sqlite(), year, month)
+    if STORAGE_MODE == "sharded":
+        return event_shards.load_month(_open_shards(), f"{year}-{month:02d}")
+    if STORAGE_MODE == "binary":
+        events, base_seq = event_binary.load_month(_open_binary(), year, month)
+        _replay_journal(events, base_seq, prefix=f"{year}-{month:02d}-")
+        return events
+    return load_events()
+
+
+def load_recurring_events() -> dict:
+    """
+    繰り返し規則のある予定（初回の日付に保存されたもの）だけを events 形式で返します。
+    sqlite 方式は部分インデックスでその行だけを、sharded / binary 方式は繰り返し予定のある
+    月の索引を引いてその月だけを読むため、保存されているすべての予定は読みません。
+    json / journal 方式はファイル全体を読むしかないため、load_events() から取り出します。
+    """
+    flush()
+    if STORAGE_MODE == "sqlite":
+        return event_store_sqlite.load_recurring(_open_sqlite())
+    if STORAGE_MODE == "sharded":
+        shard_dir = _open_shards()
+        events = {}
+        for ym in event_shards.recurring_months(shard_dir):
+            events.update(event_shards.load_month(shard_dir, ym))
+    elif STORAGE_MODE == "binary":
+        # ファイル側の索引に、ジャーナルで繰り返し予定を追加・変更した月を足す
+        months = set(event_binary.recurring_months(_open_binary()))
+        with _FILE_LOCK:
+            months.update(rec["date"][:7] for rec in event_journal.read_records(_journal_file())
+                          if (rec.get("event") or {}).get("recurrence"))
+        events = {}
+        for ym in months:
+            events.update(load_events_for_month(int(ym[:4]), int(ym[5:7])))
+    else:
+        events = load_events()
+    recurring = {}
+    for date_str, day in events.items():
+        masters = [ev for ev in day if ev.get("recurrence")]
+        if masters:
+            recurring[date_str] = masters
+    return recurring
+
+
+def loads_all_months() -> bool:
+    """
+    load_events_for_month が月に関わらず全体を返す保存方式（json / journal）か。
+    その場合、storage_signature が変わっていなければ前回読んだ events を別の月でもそのまま使えます。
+    """
+    return STORAGE_MODE in ("json", "journal")
+
+
+def signature_covers_all_months() -> bool:
+    """storage_signature が月に関わらず保存先全体の署名になる方式（sharded 以外）か"""
+    return STORAGE_MODE != "sharded"
+
+
+# iter_events の fields に指定できる項目と、予定に項目がないときの値
+EVENT_FIELDS = {"title": "", "start_time": "", "end_time": "", "memo": "", "recurrence": None}
+
+
+def _iter_dict_days(events: dict, start: str | None, end: str | None):
+    """
+    events から start〜end の日を (日付, 予定のリスト) で日付順に返します。
+    期間が短ければ 1 日ずつ辞書を引き、長ければ日付キーを並べて二分探索で先頭へ飛びます。
+    """
+    if start and end:
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+        days = (last - first).days + 1
+        if days <= len(events):
+            for i in range(max(days, 0)):
+                date_str = (first + timedelta(days=i)).isoformat()
+                if events.get(date_str):
+                    yield date_str, events[date_str]
+            return
+    keys = sorted(events)
+    lo = bisect_left(keys, start) if start else 0
+    hi = bisect_right(keys, end) if end else len(keys)
+    for date_str in keys[lo:hi]:
+        if events[date_str]:
+            yield date_str, events[date_str]
+
+
+def _iter_stored_days(start: str | None, end: str | None):
+    """保存先から start〜end の日を (日付, 予定のリスト) で日付順に返します。"""
+    if STORAGE_MODE == "sqlite":
+        rows = event_store_sqlite.iter_range(_open_sqlite(), start, end)
+        for date_str, day in groupby(rows, key=lambda row: row[0]):
+            yield date_str, [ev for _, ev in day]
+        return
+    if STORAGE_MODE == "sharded":
+        shard_dir = _open_shards()
+        for ym in event_shards.list_months(shard_dir):
+            if (start and ym < start[:7]) or (end and ym > end[:7]):
+                continue
+            yield from _iter_dict_days(event_shards.load_month(shard_dir, ym), start, end)
+        return
+    if STORAGE_MODE == "binary":
+        # バイナリ側に予定のある月と、ジャーナルにだけ予定のある月を順に復元する
+        with _FILE_LOCK:
+            months = {rec["date"][:7] for rec in event_journal.read_records(_journal_file())}
+        months.update(event_binary.list_months(_open_binary()))
+        for ym in sorted(months):
+            if (start and ym < start[:7]) or (end and ym > end[:7]):
+                continue
+            month_events = load_events_for_month(int(ym[:4]), int(ym[5:7]))
+            yield from _iter_dict_days(month_events, start, end)
+        return
+    # json / journal 方式はファイル全体を読むしかないので、読み込んだ後に範囲の先頭へ飛ぶ
+    yield from _iter_dict_days(load_events(), start, end)
+
+
+def iter_events(start_date=None, end_date=None, *, fields=None, events: dict | None = None):
+    """
+    start_date〜end_date（両端を含む。"YYYY-MM-DD" か date、None なら端なし）の予定を
+    (日付, 予定) の形で日付・開始時刻順に返すジェネレータです。
+
+    - fields: 予定の項目名（EVENT_FIELDS）を並べると、その項目だけの dict を返します
+    - events: 渡すとその dict を読みます（省略時は保存先から読みます）
+
+    sqlite 方式は日付インデックスで範囲の先頭から少しずつ読み、sharded 方式は範囲内の
+    月のファイルだけを読むため、保存されているすべての予定を一度にメモリへ載せません。
+    """
+    start = start_date.isoformat() if isinstance(start_date, date) else start_date
+    end = end_date.isoformat() if isinstance(end_date, date) else end_date
+    if fields is not None:
+        unknown = set(fields) - EVENT_FIELDS.keys()
+        if unknown:
+            raise ValueError(f"iter_events: 不明な項目です: {sorted(unknown)}")
+    days = _iter_stored_days(start, end) if events is None else _iter_dict_days(events, start, end)
+    for date_str, day in days:
+        for ev in sorted(day, key=day_order):
+            if fields is None:
+                yield date_str, ev
+            else:
+                yield date_str, {f: ev.get(f, EVENT_FIELDS[f]) for f in fields}
+
+
+def storage_signature(year: int, month: int) -> tuple:
+    """
+    表示中の月（year, month）の予定が入っている保存ファイルの stat 署名をまとめて返します。
+    他のプロセスや同期ツールによる変更の検知に使います（前回の値と比べるだけで読み込みはしません）。
+    """
+    if STORAGE_MODE == "sqlite":
+        db_path = _sqlite_file()
+        return (file_signature(db_path), file_signature(db_path + "-wal"))
+    if STORAGE_MODE == "sharded":
+        return (file_signature(event_shards.shard_path(_shard_dir(), f"{year}-{month:02d}")),)
+    if STORAGE_MODE == "journal":
+        return (file_signature(EVENTS_FILE), file_signature(_journal_file()))
+    if STORAGE_MODE == "binary":
+        return (file_signature(_binary_file()), file_signature(_journal_file()))
+    return (file_signature(EVENTS_FILE),)
+
+
+def replace_day(events: dict, date_str: str, day: list[dict]) -> None:
+    """
+    保存ファイル側で変わった 1 日分を events に反映し、リスナーに通知します（保存はしません）。
+    リスナーには、古い予定の削除と新しい予定の追加として通知します。
+    """
+    old_day = events.get(date_str, [])
+    if day:
+        events[date_str] = list(day)
+    else:
+        events.pop(date_str, None)
+    records = [(delete_record(date_str, i), ev) for i, ev in reversed(list(enumerate(old_day)))]
+    records += [(add_record(date_str, ev), None) for ev in day]
+    for record, old in records:
+        for listener in list(_listeners):
+            listener(events, record, old)
+
+
+def _dump_snapshot(events: dict, generation: int, journal_seq: int | None) -> tuple[str, dict]:
+    """保存する JSON 文字列と、そこに含めた管理情報を返します。"""
+    meta = {"generation": generation}
+    if journal_seq is not None:
+        meta["journal_seq"] = journal_seq
+    data = dict(events)
+    data[META_KEY] = meta
+    return json.dumps(data, ensure_ascii=False, indent=2), meta
+
+
+def _write_snapshot(events: dict, journal_seq: int | None = None) -> None:
+    """
+    一時ファイルに書いて fsync してから置き換えることで、途中で落ちても壊れないように保存します。
+    保存は世代番号による compare-and-swap です。ファイル側の世代が前回自分が保存したときと
+    違えば（他のプロセスが書き込んでいれば）、json 方式では日付単位でマージしてから書きます。
+    シリアライズはロックの外で行い、マージが必要になったときだけロック内でやり直します。
+    """
+    with _FILE_LOCK:
+        base_gen, base_events = _merge_base["generation"], _merge_base["events"]
+    text = meta = None
+    if base_gen is not None:
+        text, meta = _dump_snapshot(events, base_gen + 1, journal_seq)
+
+    os.makedirs(os.path.dirname(EVENTS_FILE), exist_ok=True)
+    tmp_path = EVENTS_FILE + ".tmp"
+    with _FILE_LOCK, interprocess_lock(EVENTS_FILE):
+        # ファイル側の現在の世代（前回読み書きしたときのままなら解析しない）
+        if file_signature(EVENTS_FILE) == _snapshot_cache["sig"]:
+            disk_events, disk_meta = _snapshot_cache["events"], _snapshot_cache["meta"]
+        else:
+            disk_events, disk_meta = _read_snapshot()
+        disk_gen = disk_meta.get("generation", 0)
+
+        data = events
+        merged = base_events is not None and disk_gen != base_gen
+        if merged:
+            data = merge_events(base_events, events, disk_events)
+        if text is None or disk_gen != base_gen:
+            text, meta = _dump_snapshot(data, disk_gen + 1, journal_seq)
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, EVENTS_FILE)
+        # 自分で書いた内容は次回の読み込みで解析し直さない
+        _snapshot_cache.update(sig=file_signature(EVENTS_FILE), events=copy_events(data), meta=meta)
+        # マージの基準はこちらの内容。マージ結果がこちらの内容と違う（他のプロセスの変更を
+        # まだ取り込んでいない）間は世代を None にして、次回も必ず差分を取り直す。
+        # journal 方式はジャーナル側で変更を持つのでマージしない
+        in_sync = not merged or data == events
+        _merge_base.update(generation=disk_gen + 1 if in_sync else None,
+                           events=copy_events(events) if STORAGE_MODE == "json" else None)
+
+
+def save_events(events: dict) -> None:
+    """
+    イベントデータを JSON ファイルに書き込みます。
+    必要に応じてディレクトリを作成し、 thread-safe に動作します。
+    ジャーナル方式では全体をスナップショットとして書き出し、ジャーナルを空にします。
+    BACKGROUND_SAVE が有効な json 方式では、書き込みスレッドに預けてすぐに戻ります。
+    """
+    global _writer
+    if STORAGE_MODE == "sqlite":
+        event_store_sqlite.replace_all(_sqlite_file(), events)
+        return
+    if STORAGE_MODE == "sharded":
+        # 内容の変わった月のファイルだけを書き直す
+        event_shards.write_changed(_open_shards(), events)
+        return
+
+    if STORAGE_MODE in ("journal", "binary"):
+        with _SNAPSHOT_LOCK:
+            with _FILE_LOCK:
+                seq = _journal_state["seq"]
+            if STORAGE_MODE == "binary":
+                event_binary.write(_binary_file(), events, seq)
+            else:
+                _write_snapshot(events, seq)
+            _journal_state["snapshot_seq"] = seq
+        with _FILE_LOCK:
+            event_journal.rewrite_after(_journal_file(), seq)
+        return
+
+    if BACKGROUND_SAVE:
+        if _writer is None:
+            _writer = CoalescingWriter(_write_snapshot, SAVE_DEBOUNCE_SEC)
+        _writer.submit(events)
+        return
+    _write_snapshot(events)
+
+
+def flush() -> None:
+    """書き込みスレッドに預けた保存をすべてディスクに反映します（終了時に呼びます）。"""
+    if _writer is not None:
+        _writer.flush()
+
+
+def writer_stats() -> dict | None:
+    """まとめ書きの統計（合流した保存回数・書き込みレイテンシ）を返します。未使用なら None。"""
+    return _writer.stats() if _writer is not None else None
+
+
+def _compact_in_background(snapshot: dict | None, seq: int) -> None:
+    """
+    コピー済みのスナップショットを書き出し、反映済みのジャーナルを取り除きます。
+    binary 方式では手元に全体がないので、ファイルとジャーナル（seq まで）から組み立てます。
+    """
+    try:
+        with _SNAPSHOT_LOCK:
+            # 明示的な save_events がより新しい状態を書いていれば何もしない
+            if _journal_state["snapshot_seq"] >= seq:
+                return
+            if snapshot is None:
+                snapshot, base_seq = event_binary.load_all(_binary_file())
+                _replay_journal(snapshot, base_seq, upto=seq)
+                event_binary.write(_binary_file(), snapshot, seq)
+            else:
+                _write_snapshot(snapshot, seq)
+            _journal_state["snapshot_seq"] = seq
+        with _FILE_LOCK:
+            event_journal.rewrite_after(_journal_file(), seq)
+    except OSError as e:
+        print(f"[warning] ジャーナルのコンパクションに失敗しました: {e}", file=sys.stderr)
+    finally:
+        _journal_state["compacting"] = False
+
+
+def _persist(events: dict, record: dict) -> None:
+    """
+    適用済みの変更 1 件を保存します。
+    json 方式では全体を書き直し、journal / binary 方式ではレコードを 1 行追記します。
+    sqlite 方式では該当する 1 行だけを、sharded 方式では該当する月のファイルだけを
+    更新するため、events は表示中の月だけでも構いません（binary 方式も同様です）。
+    """
+    if STORAGE_MODE == "sqlite":
+        event_store_sqlite.apply(_open_sqlite(), record)
+        return
+    if STORAGE_MODE == "sharded":
+        ym = record["date"][:7]
+        event_shards.write_month(
+            _open_shards(), ym, {d: evs for d, evs in events.items() if d[:7] == ym})
+        return
+    if STORAGE_MODE not in ("journal", "binary"):
+        save_events(events)
+        return
+
+    os.makedirs(os.path.dirname(EVENTS_FILE), exist_ok=True)
+    journal = _journal_file()
+    with _FILE_LOCK:
+        _journal_state["seq"] += 1
+        event_journal.append_records(journal, [dict(record, seq=_journal_state["seq"])])
+        if (_journal_state["compacting"]
+                or event_journal.journal_size(journal) < JOURNAL_COMPACT_BYTES):
+            return
+        # 以降の変更で書き換わらないよう、ロック内で日付ごとのリストを複製しておく
+        _journal_state["compacting"] = True
+        snapshot = None
+        if STORAGE_MODE == "journal":
+            snapshot = {d: [dict(ev) for ev in evs] for d, evs in events.items()}
+        seq = _journal_state["seq"]
+
+    threading.Thread(
+        target=_compact_in_background, args=(snapshot, seq), daemon=True
+    ).start()
+
+
+def add_event(events: dict,
+              date_str: str,
+              title: str,
+              start_time: str = "",
+              end_time: str = "",
+              memo: str = "",
+              recurrence: dict | None = None) -> None:
+    """
+    新しい予定を events に追加して保存します。
+
+    - date_str: "YYYY-MM-DD" 形式の日付キー（繰り返し予定では初回の日付）
+    - title: イベントタイトル
+    - start_time, end_time: "HH:MM" 形式
+    - memo: 任意のメモ文字列
+    - recurrence: 繰り返し規則（services/recurrence.py 参照）。なければ None
+    """
+    # 同じキーのリストに追加
+    record = add_record(date_str, make_event(title, start_time, end_time, memo, recurrence))
+    _apply_and_persist(events, record)
+
+
+def delete_event(events: dict, date_str: str, index: int) -> None:
+    """
+    指定の日(date_str)のイベントリストから index 番目を削除し、空になればキーごと削除して保存します。
+    """
+    if date_str in events and 0 <= index < len(events[date_str]):
+        record = delete_record(date_str, index)
+        _apply_and_persist(events, record)
+
+
+def update_event(events: dict,
+                 date_str: str,
+                 index: int,
+                 title: str,
+                 start_time: str = "",
+                 end_time: str = "",
+                 memo: str = "",
+                 recurrence: dict | None = None) -> None:
+    """
+    既存のイベントを更新し、保存します。
+
+    - events: 現在のイベントデータ辞書
+    - date_str: "YYYY-MM-DD" 形式の日付キー
+    - index: その日付のイベントリスト内でのインデックス
+    - title: 新しいイベントタイトル
+    - start_time, end_time: "HH:MM" 形式
+    - memo: 任意のメモ文字列
+    - recurrence: 繰り返し規則（繰り返しをやめるときは None）
+    """
+    if date_str in events and 0 <= index < len(events[date_str]):
+        # イベントデータを更新
+        record = update_record(
+            date_str, index, make_event(title, start_time, end_time, memo, recurrence))
+        _apply_and_persist(events, record)
+    else:
+        # 存在しないイベントを更新しようとした場合の処理（エラーログなど）
+        print(f"[warning] イベントの更新に失敗しました: 日付 {date_str}, インデックス {index} が見つかりません。", file=sys.stderr)
@@ -0,0 +1,165 @@
+# calendar_app/services/event_model.py
+#
+# 予定を表す軽量な型 Event と、日付ごとにまとめたコンテナ EventTable。
+# 保存形式（"YYYY-MM-DD" → 4 キーの dict のリスト）はそのままに、
+# 描画などの頻繁に通る処理では日付を序数、時刻を分の整数で扱えるようにします。
+
+from collections.abc import Mapping
+from datetime import date
+
+from utils.calendar_utils import time_to_minutes
+
+NO_TIME = -1  # 時刻未設定を表す値
+
+
+def _minutes_text(minutes: int) -> str:
+    """分の整数を "HH:MM" に戻す（未設定なら空文字）"""
+    if minutes == NO_TIME:
+        return ""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Event:
+    """
+    予定 1 件。__slots__ で属性を固定し、dict よりも小さく保ちます。
+
+    - ordinal: 日付の序数（date.toordinal()）
+    - start, end: 0 時からの分（未設定は NO_TIME）
+    - start_time, end_time: 保存されていたとおりの時刻の文字列（"9:00" や解釈できない値もそのまま戻す）
+    - recurrence: 繰り返し規則（なければ None）
+    - occurrence_of: 繰り返しの発生分なら元の日付（保存された予定は None）
+    """
+
+    __slots__ = ("ordinal", "start", "end", "title", "memo", "recurrence", "occurrence_of",
+                 "start_time", "end_time")
+
+    def __init__(self, ordinal: int, start: int, end: int, title: str, memo: str = "",
+                 recurrence: dict | None = None, occurrence_of: str | None = None,
+                 start_time: str | None = None, end_time: str | None = None):
+        self.ordinal = ordinal
+        self.start = start
+        self.end = end
+        self.title = title
+        self.memo = memo
+        self.recurrence = recurrence
+        self.occurrence_of = occurrence_of
+        # 文字列が渡されなければ分から作る
+        self.start_time = _minutes_text(start) if start_time is None else start_time
+        self.end_time = _minutes_text(end) if end_time is None else end_time
+
+    @classmethod
+    def from_dict(cls, date_str: str, ev: dict) -> "Event":
+        """保存形式の dict から作ります。時刻は読み込み時に一度だけ分へ変換します。"""
+        start_time = ev.get("start_time", "")
+        end_time = ev.get("end_time", "")
+        start = time_to_minutes(start_time)
+        end = time_to_minutes(end_time)
+        return cls(
+            date.fromisoformat(date_str).toordinal(),
+            NO_TIME if start is None else start,
+            NO_TIME if end is None else end,
+            ev.get("title", ""),
+            ev.get("memo", ""),
+            ev.get("recurrence"),
+            ev.get("occurrence_of"),
+            start_time,
+            end_time,
+        )
+
+    def to_dict(self) -> dict:
+        """保存形式の dict に戻します（時刻は読み込んだときの文字列のまま。発生分の印は保存しません）。"""
+        ev = {
+            "title":      self.title,
+            "start_time": self.start_time,
+            "end_time":   self.end_time,
+            "memo":       self.memo
+        }
+        if self.recurrence:
+            ev["recurrence"] = self.recurrence
+        return ev
+
+    @property
+    def date_str(self) -> str:
+        return date.fromordinal(self.ordinal).isoformat()
+
+    @property
+    def start_text(self) -> str:
+        return self.start_time
+
+    @property
+    def end_text(self) -> str:
+        return self.end_time
+
+    def time_range_text(self, sep: str = "〜") -> str:
+        """「10:00〜11:00」形式の時間帯"""
+        return f"{self.start_text}{sep}{self.end_text}"
+
+    def __repr__(self) -> str:
+        return f"Event({self.date_str} {self.time_range_text()} {self.title!r})"
+
+
+def _ordinal(key) -> int | None:
+    """"YYYY-MM-DD" または序数を序数に揃える"""
+    if isinstance(key, int):
+        return key
+    try:
+        return date.fromisoformat(key).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class EventTable(Mapping):
+    """
+    日付ごとの Event リスト。キーは "YYYY-MM-DD" でも序数でも引けます。
+    from_dict() / to_dict() で現在の JSON 形式と相互変換します。
+    """
+
+    def __init__(self):
+        self._days: dict[int, list[Event]] = {}
+
+    @classmethod
+    def from_dict(cls, events: dict, year: int | None = None, month: int | None = None) -> "EventTable":
+        """
+        保存形式の events から作ります。year / month を渡すとその月の分だけを変換します。
+        """
+        table = cls()
+        prefix = f"{year}-{month:02d}-" if year is not None and month is not None else ""
+        for date_str, day in events.items():
+            if prefix and not date_str.startswith(prefix):
+                continue
+            table.set_day(date_str, day)
+        return table
+
+    def to_dict(self) -> dict:
+        """保存形式（"YYYY-MM-DD" → dict のリスト）に戻します。発生分は含めません。"""
+        result = {}
+        for ordinal in sorted(self._days):
+            day = [ev.to_dict() for ev in self._days[ordinal] if ev.occurrence_of is None]
+            if day:
+                result[date.fromordinal(ordinal).isoformat()] = day
+        return result
+
+    def set_day(self, date_str: str, day: list[dict] | None) -> None:
+        """1 日分を保存形式の dict から置き換えます（空なら取り除く）。"""
+        ordinal = _ordinal(date_str)
+        if ordinal is None:
+            return
+        if day:
+            self._days[ordinal] = [Event.from_dict(date_str, ev) for ev in day]
+        else:
+            self._days.pop(ordinal, None)
+
+    def __getitem__(self, key) -> list[Event]:
+        ordinal = _ordinal(key)
+        if ordinal is None or ordinal not in self._days:
+            raise KeyError(key)
+        return self._days[ordinal]
+
+    def __contains__(self, key) -> bool:
+        return _ordinal(key) in self._days
+
+    def __iter__(self):
+        return (date.fromordinal(o).isoformat() for o in sorted(self._days))
+
+    def __len__(self) -> int:
+        return len(self._days)
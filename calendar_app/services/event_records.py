@@ -0,0 +1,115 @@
+# calendar_app/services/event_records.py
+#
+# イベントの変更操作（追加・更新・削除）を 1 件の「レコード」として表現し、
+# 任意の events 辞書に適用するためのヘルパー群。
+# ジャーナル保存や各種ストレージで共通の変更単位として使います。
+
+from utils.calendar_utils import time_to_minutes
+
+META_KEY = "_meta"  # 保存ファイル内の管理情報キー（日付キーとは衝突しない）
+
+
+def make_event(title: str, start_time: str = "", end_time: str = "", memo: str = "",
+               recurrence: dict | None = None) -> dict:
+    """
+    保存形式（4 キーの dict）のイベントを生成します。
+    繰り返し予定のときだけ "recurrence" キー（services/recurrence.py の規則）を加えます。
+    """
+    event = {
+        "title":      title,
+        "start_time": start_time,
+        "end_time":   end_time,
+        "memo":       memo
+    }
+    if recurrence:
+        event["recurrence"] = recurrence
+    return event
+
+
+def day_order(ev: dict) -> int:
+    """1 日の中での並び順（開始時刻順。時刻のない予定はその日の最後）"""
+    minutes = time_to_minutes(ev.get("start_time", ""))
+    return 1440 if minutes is None else minutes
+
+
+def add_record(date_str: str, event: dict) -> dict:
+    """追加操作のレコードを生成します。"""
+    return {"op": "add", "date": date_str, "event": event}
+
+
+def update_record(date_str: str, index: int, event: dict) -> dict:
+    """更新操作のレコードを生成します。"""
+    return {"op": "update", "date": date_str, "index": index, "event": event}
+
+
+def delete_record(date_str: str, index: int) -> dict:
+    """削除操作のレコードを生成します。"""
+    return {"op": "delete", "date": date_str, "index": index}
+
+
+def apply_record(events: dict, record: dict) -> dict | None:
+    """
+    レコードを events に適用します。
+    更新・削除では置き換え前のイベントを返し、適用できなければ None を返します。
+    """
+    op = record.get("op")
+    date_str = record.get("date")
+    if op == "add":
+        events.setdefault(date_str, []).append(record["event"])
+        return None
+
+    day = events.get(date_str)
+    index = record.get("index", -1)
+    if not day or not 0 <= index < len(day):
+        return None
+
+    if op == "update":
+        old = day[index]
+        day[index] = record["event"]
+        return old
+    if op == "delete":
+        old = day.pop(index)
+        if not day:
+            del events[date_str]
+        return old
+    return None
+
+
+def copy_events(events: dict) -> dict:
+    """events の複製（日付ごとのリストだけを複製し、予定の dict は共有します）。"""
+    return {d: list(evs) for d, evs in events.items()}
+
+
+def _subtract(day: list[dict], other: list[dict]) -> list[dict]:
+    """day から other にある予定を 1 件ずつ取り除いた残り（同じ内容の予定が複数あっても数を合わせる）"""
+    rest = list(day)
+    for ev in other:
+        if ev in rest:
+            rest.remove(ev)
+    return rest
+
+
+def merge_events(base: dict, ours: dict, theirs: dict) -> dict:
+    """
+    日付単位の三者マージ。base（前回保存したときの自分の内容）からの自分の変更を、
+    他のプロセスが保存した theirs に重ねた結果を返します。
+    同じ日付を両方が変更していれば、その日の中で自分が足した予定・消した予定だけを反映します。
+    """
+    merged = {}
+    for date_str in sorted(base.keys() | ours.keys() | theirs.keys()):
+        b, o, t = base.get(date_str, []), ours.get(date_str, []), theirs.get(date_str, [])
+        if o == b:
+            day = t
+        elif t == b or t == o:
+            day = o
+        else:
+            day = _subtract(t, _subtract(b, o)) + _subtract(o, b)
+        if day:
+            merged[date_str] = list(day)
+    return merged
+
+
+def strip_meta(data: dict) -> tuple[dict, dict]:
+    """読み込んだ dict から管理情報を取り除き、(events, meta) を返します。"""
+    meta = data.pop(META_KEY, None)
+    return data, meta if isinstance(meta, dict) else {}
@@ -0,0 +1,192 @@
+# calendar_app/services/event_shards.py
+#
+# 年月ごとに分割したイベントファイル（events/YYYY-MM.json）の読み書き。
+# 表示する月のファイルだけを読み、変更のあった月のファイルだけを書き直します。
+# 一度読んだファイルは stat 署名（更新日時・サイズ・inode）が変わらない限り読み直しません。
+# 繰り返し予定のある月は索引（events/recurring.json）に署名と一緒に記録しておき、
+# 繰り返し予定を集めるときに全部の月のファイルを開かずに済ませます。
+
+import json
+import os
+import sys
+from threading import Lock
+from utils.resource import file_signature
+from services.event_records import copy_events
+
+# 年月 → (ファイルの stat 署名, その月の events)
+_cache: dict[str, tuple[tuple, dict]] = {}
+_SHARD_LOCK = Lock()
+
+# 繰り返し予定のある月の索引のファイル名（"YYYY-MM" → [シャードの署名, 繰り返し予定があるか]）
+MASTERS_INDEX = "recurring.json"
+
+
+def shard_path(shard_dir: str, ym: str) -> str:
+    """"YYYY-MM" のシャードファイルのパス"""
+    return os.path.join(shard_dir, f"{ym}.json")
+
+
+def load_month(shard_dir: str, ym: str) -> dict:
+    """1 か月分のシャードを読みます。前回読んだときから変わっていなければ読み直しません。"""
+    path = shard_path(shard_dir, ym)
+    sig = file_signature(path)
+    with _SHARD_LOCK:
+        cached = _cache.get(ym)
+        if cached and cached[0] == sig:
+            return copy_events(cached[1])
+    if sig is None:
+        month_events = {}
+    else:
+        try:
+            with open(path, encoding="utf-8") as f:
+                month_events = json.load(f)
+        except json.JSONDecodeError:
+            print(f"[warning] イベントファイルの読み込みに失敗しました: {path}", file=sys.stderr)
+            month_events = {}
+        if not isinstance(month_events, dict):
+            month_events = {}
+    with _SHARD_LOCK:
+        _cache[ym] = (sig, month_events)
+    return copy_events(month_events)
+
+
+def list_months(shard_dir: str) -> list[str]:
+    """保存済みの年月（"YYYY-MM"）を昇順で返します。"""
+    try:
+        names = os.listdir(shard_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(n[:-5] for n in names if n.endswith(".json") and len(n) == 12)
+
+
+def load_all(shard_dir: str) -> dict:
+    """すべてのシャードをまとめて返します。"""
+    events = {}
+    for ym in list_months(shard_dir):
+        events.update(load_month(shard_dir, ym))
+    return events
+
+
+def write_month(shard_dir: str, ym: str, month_events: dict) -> None:
+    """
+    1 か月分を一時ファイル経由で書き直します。予定がなくなった月はファイルを削除します。
+    """
+    path = shard_path(shard_dir, ym)
+    month_events = {d: evs for d, evs in sorted(month_events.items()) if evs}
+    os.makedirs(shard_dir, exist_ok=True)
+    with _SHARD_LOCK:
+        if not month_events:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        else:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(month_events, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        sig = file_signature(path)
+        _cache[ym] = (sig, copy_events(month_events))
+        index = _read_masters_index(shard_dir)
+        if month_events:
+            index[ym] = [list(sig), _has_recurring(month_events)]
+        else:
+            index.pop(ym, None)
+        _write_masters_index(shard_dir, index)
+
+
+def _has_recurring(month_events: dict) -> bool:
+    """繰り返し規則のある予定を含むか"""
+    return any(ev.get("recurrence") for evs in month_events.values() for ev in evs)
+
+
+def _read_masters_index(shard_dir: str) -> dict:
+    """繰り返し予定のある月の索引を読みます。なければ空の dict を返します。"""
+    try:
+        with open(os.path.join(shard_dir, MASTERS_INDEX), encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def _write_masters_index(shard_dir: str, index: dict) -> None:
+    """
+    索引を一時ファイル経由で書き直します。
+    署名と食い違えば recurring_months が作り直すので、fsync はしません。
+    """
+    path = os.path.join(shard_dir, MASTERS_INDEX)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def recurring_months(shard_dir: str) -> list[str]:
+    """
+    繰り返し予定を含む年月（"YYYY-MM"）を昇順で返します。
+    索引の署名とシャードの stat 署名が一致する月はファイルを開かず、索引にない月や
+    他のプロセス・同期ツールが書き換えた月だけを読み直して索引を更新します。
+    """
+    with _SHARD_LOCK:
+        index = _read_masters_index(shard_dir)
+    months = list_months(shard_dir)
+    changed = set(index) - set(months)
+    for ym in months:
+        sig = file_signature(shard_path(shard_dir, ym))
+        entry = index.get(ym)
+        if sig is None or (entry and entry[0] == list(sig)):
+            continue
+        index[ym] = [list(sig), _has_recurring(load_month(shard_dir, ym))]
+        changed.add(ym)
+    if changed:
+        with _SHARD_LOCK:
+            for ym in set(index) - set(months):
+                del index[ym]
+            _write_masters_index(shard_dir, index)
+    return [ym for ym in months if ym in index and index[ym][1]]
+
+
+def split_by_month(events: dict) -> dict[str, dict]:
+    """events を年月ごとに分けます。"""
+    months = {}
+    for date_str, day in events.items():
+        months.setdefault(date_str[:7], {})[date_str] = day
+    return months
+
+
+def write_changed(shard_dir: str, events: dict) -> int:
+    """
+    events 全体を保存します。読み込み済みの内容と同じ月は書き込まず、
+    events に含まれない月のシャードは削除します。書き込んだ月の数を返します。
+    """
+    months = split_by_month(events)
+    written = 0
+    for ym in set(months) | set(list_months(shard_dir)):
+        month_events = {d: evs for d, evs in months.get(ym, {}).items() if evs}
+        with _SHARD_LOCK:
+            cached = _cache.get(ym)
+        if cached and cached[0] == file_signature(shard_path(shard_dir, ym)) \
+                and cached[1] == month_events:
+            continue
+        write_month(shard_dir, ym, month_events)
+        written += 1
+    return written
+
+
+def migrate_from_json(json_path: str, shard_dir: str) -> int:
+    """既存の events.json を月ごとのファイルに分割し、移行した件数を返します。"""
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    events = {k: v for k, v in data.items() if isinstance(v, list) and not k.startswith("_")}
+    for ym, month_events in split_by_month(events).items():
+        write_month(shard_dir, ym, month_events)
+    os.makedirs(shard_dir, exist_ok=True)
+    return sum(len(v) for v in events.values())
@@ -0,0 +1,227 @@
+# calendar_app/services/event_store_sqlite.py
+#
+# SQLite を使ったイベント保存先。
+# event_manager から呼ばれ、変更 1 件（レコード）を 1 行単位の SQL に変換します。
+# 日付・年月・開始時刻にインデックスを張り、表示中の月だけを取り出せるようにします。
+
+import json
+import os
+import sqlite3
+from threading import Lock
+
+from services.event_records import make_event
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id         INTEGER PRIMARY KEY,
+    date       TEXT    NOT NULL,
+    ym         TEXT    NOT NULL,
+    pos        INTEGER NOT NULL,
+    title      TEXT    NOT NULL DEFAULT '',
+    start_time TEXT    NOT NULL DEFAULT '',
+    end_time   TEXT    NOT NULL DEFAULT '',
+    memo       TEXT    NOT NULL DEFAULT '',
+    recurrence TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_events_date  ON events(date, pos);
+CREATE INDEX IF NOT EXISTS idx_events_ym    ON events(ym);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events(start_time);
+"""
+
+_COLUMNS = "date, pos, title, start_time, end_time, memo, recurrence"
+
+# パスごとの接続を使い回す（Tk のメインスレッドと保存スレッドの双方から使うためロック付き）
+_connections: dict[str, sqlite3.Connection] = {}
+_DB_LOCK = Lock()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """接続を開き、初回はスキーマを作成します。"""
+    conn = _connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        # 繰り返し予定に対応する前に作られたデータベースには列を足す
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        if "recurrence" not in columns:
+            conn.execute("ALTER TABLE events ADD COLUMN recurrence TEXT NOT NULL DEFAULT ''")
+        # 繰り返し予定の行だけを引く部分インデックス（列を足した後に張る）
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_recurring"
+                     " ON events(date, pos) WHERE recurrence != ''")
+        _connections[db_path] = conn
+    return conn
+
+
+def close(db_path: str) -> None:
+    """開いている接続を閉じます。"""
+    with _DB_LOCK:
+        conn = _connections.pop(db_path, None)
+        if conn is not None:
+            conn.close()
+
+
+def _rows_to_events(rows) -> dict:
+    """(date, pos, title, start_time, end_time, memo, recurrence) の行を events 形式にまとめます。"""
+    events = {}
+    for date_str, _pos, title, start_time, end_time, memo, recurrence in rows:
+        events.setdefault(date_str, []).append(
+            make_event(title, start_time, end_time, memo,
+                       json.loads(recurrence) if recurrence else None)
+        )
+    return events
+
+
+def _recurrence_text(ev: dict) -> str:
+    """繰り返し規則を列に保存する JSON 文字列（なければ空）"""
+    rule = ev.get("recurrence")
+    return json.dumps(rule, ensure_ascii=False) if rule else ""
+
+
+def load_all(db_path: str) -> dict:
+    """全イベントを events 形式で返します。"""
+    with _DB_LOCK:
+        rows = _connect(db_path).execute(
+            f"SELECT {_COLUMNS} FROM events ORDER BY date, pos"
+        ).fetchall()
+    return _rows_to_events(rows)
+
+
+def load_month(db_path: str, year: int, month: int) -> dict:
+    """指定した年月のイベントだけを年月インデックス経由で返します。"""
+    with _DB_LOCK:
+        rows = _connect(db_path).execute(
+            f"SELECT {_COLUMNS} FROM events WHERE ym = ? ORDER BY date, pos",
+            (f"{year}-{month:02d}",)
+        ).fetchall()
+    return _rows_to_events(rows)
+
+
+def load_recurring(db_path: str) -> dict:
+    """繰り返し規則のある予定（初回の日付の行）だけを部分インデックス経由で返します。"""
+    with _DB_LOCK:
+        rows = _connect(db_path).execute(
+            f"SELECT {_COLUMNS} FROM events WHERE recurrence != '' ORDER BY date, pos"
+        ).fetchall()
+    return _rows_to_events(rows)
+
+
+def iter_range(db_path: str, start: str | None, end: str | None, batch: int = 1000):
+    """
+    start〜end（両端を含む "YYYY-MM-DD"、None なら端なし）の予定を (日付, 予定) で
+    日付・登録順に返すジェネレータ。日付インデックスで範囲の先頭から読み、
+    batch 行ずつ取り出すので、全件をメモリに載せません。
+    ロックは各 batch の取得中だけ保持するため、途中で予定を変更しても構いません。
+    """
+    last = (start or "", -1)
+    while True:
+        sql = f"SELECT {_COLUMNS} FROM events WHERE (date, pos) > (?, ?)"
+        params = list(last)
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(end)
+        sql += " ORDER BY date, pos LIMIT ?"
+        params.append(batch)
+        with _DB_LOCK:
+            rows = _connect(db_path).execute(sql, params).fetchall()
+        for date_str, _pos, title, start_time, end_time, memo, recurrence in rows:
+            yield date_str, make_event(title, start_time, end_time, memo,
+                                       json.loads(recurrence) if recurrence else None)
+        if len(rows) < batch:
+            return
+        last = (rows[-1][0], rows[-1][1])
+
+
+def _row_id_at(conn: sqlite3.Connection, date_str: str, index: int) -> int | None:
+    """その日の index 番目（pos 順）の行 id を返します。"""
+    row = conn.execute(
+        "SELECT id FROM events WHERE date = ? ORDER BY pos LIMIT 1 OFFSET ?",
+        (date_str, index)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def apply(db_path: str, record: dict) -> None:
+    """
+    変更レコード 1 件を行単位の SQL で反映します。
+    pos はその日の中の並び順で、削除しても詰め直さず順序だけを保ちます。
+    """
+    date_str = record["date"]
+    with _DB_LOCK:
+        conn = _connect(db_path)
+        with conn:
+            if record["op"] == "add":
+                ev = record["event"]
+                pos = conn.execute(
+                    "SELECT COALESCE(MAX(pos), -1) + 1 FROM events WHERE date = ?",
+                    (date_str,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO events"
+                    " (date, ym, pos, title, start_time, end_time, memo, recurrence)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (date_str, date_str[:7], pos, ev.get("title", ""),
+                     ev.get("start_time", ""), ev.get("end_time", ""), ev.get("memo", ""),
+                     _recurrence_text(ev))
+                )
+                return
+
+            row_id = _row_id_at(conn, date_str, record["index"])
+            if row_id is None:
+                return
+            if record["op"] == "update":
+                ev = record["event"]
+                conn.execute(
+                    "UPDATE events SET title = ?, start_time = ?, end_time = ?, memo = ?,"
+                    " recurrence = ? WHERE id = ?",
+                    (ev.get("title", ""), ev.get("start_time", ""),
+                     ev.get("end_time", ""), ev.get("memo", ""), _recurrence_text(ev), row_id)
+                )
+            elif record["op"] == "delete":
+                conn.execute("DELETE FROM events WHERE id = ?", (row_id,))
+
+
+def replace_all(db_path: str, events: dict) -> None:
+    """テーブルの中身を events で丸ごと置き換えます。"""
+    rows = [
+        (date_str, date_str[:7], pos, ev.get("title", ""), ev.get("start_time", ""),
+         ev.get("end_time", ""), ev.get("memo", ""), _recurrence_text(ev))
+        for date_str, day in events.items()
+        for pos, ev in enumerate(day)
+    ]
+    with _DB_LOCK:
+        conn = _connect(db_path)
+        with conn:
+            conn.execute("DELETE FROM events")
+            conn.executemany(
+                "INSERT INTO events"
+                " (date, ym, pos, title, start_time, end_time, memo, recurrence)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+
+def migrate_from_json(json_path: str, db_path: str) -> int:
+    """
+    既存の events.json を SQLite に一括移行し、移行した件数を返します。
+    移行済み（テーブルが空でない）なら何もせず 0 を返します。
+    """
+    with _DB_LOCK:
+        count = _connect(db_path).execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    if count:
+        return 0
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0
+    if not isinstance(data, dict):
+        return 0
+    events = {
+        k: v for k, v in data.items()
+        if isinstance(v, list) and not k.startswith("_")
+    }
+    replace_all(db_path, events)
+    return sum(len(v) for v in events.values())
@@ -0,0 +1,128 @@
+# calendar_app/services/event_writer.py
+#
+# events.json を別スレッドで書き出す「まとめ書き」ライター。
+# 短時間に続いた保存要求は最後の 1 回分だけを書き込み（デバウンス＋合流）、
+# Tk のメインスレッドで JSON のシリアライズやディスク書き込みを行わないようにします。
+
+import sys
+import threading
+import time
+
+
+class CoalescingWriter:
+    """
+    保存要求を受け付け、debounce 秒だけ待ってから最新のスナップショットを書き出すライター。
+
+    - write_func: スナップショット（dict）を受け取って実際に書き込む関数
+    - debounce: 最後の要求からこの秒数だけ新しい要求がなければ書き込む
+    """
+
+    def __init__(self, write_func, debounce: float = 0.5):
+        self.write_func = write_func
+        self.debounce = debounce
+        self._cond = threading.Condition()
+        self._pending = None       # 次に書くスナップショット
+        self._last_submit = 0.0    # 最後に要求を受けた時刻（monotonic）
+        self._writing = False      # 書き込み中フラグ
+        self._thread = None
+        self._error = None         # 書き込みで起きた想定外の例外（次の flush() で送出する）
+        # 統計情報（合流した要求数やレイテンシの報告用）
+        self.submitted = 0
+        self.written = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+
+    def submit(self, events: dict) -> None:
+        """
+        保存要求を登録します。呼び出し時点の内容をスナップショットとして預かるので、
+        以降 events を書き換えても書き込み内容には影響しません。
+        """
+        # 予定 dict は更新時に差し替えられるため、日付ごとのリストの複製で十分
+        snapshot = {d: list(evs) for d, evs in events.items()}
+        with self._cond:
+            self._pending = snapshot
+            self._last_submit = time.monotonic()
+            self.submitted += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """書き込みスレッド本体。保留中の要求がなくなったら終了します。"""
+        while True:
+            with self._cond:
+                while self._pending is not None:
+                    wait = self._last_submit + self.debounce - time.monotonic()
+                    if self._writing:
+                        # flush() が書き込み中なら終わるまで待つ（書き込みは常に 1 本）
+                        self._cond.wait()
+                    elif wait > 0:
+                        self._cond.wait(wait)
+                    else:
+                        break
+                if self._pending is None:
+                    self._thread = None
+                    return
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+            self._write(snapshot)
+
+    def _write(self, snapshot: dict) -> None:
+        """
+        スナップショットを書き込み、統計を更新して待機中の flush() を起こします。
+        OSError は警告だけ出して続けます。それ以外の例外は覚えておき、次の flush() で送出します
+        （どちらの場合も書き込み中フラグは必ず戻すので、flush() が待ち続けることはありません）。
+        """
+        t0 = time.perf_counter()
+        error = None
+        try:
+            self.write_func(snapshot)
+        except OSError as e:
+            print(f"[warning] イベントの保存に失敗しました: {e}", file=sys.stderr)
+        except Exception as e:
+            print(f"[ERROR] イベントの保存中に想定外のエラーが発生しました: {e!r}", file=sys.stderr)
+            error = e
+        finally:
+            latency = (time.perf_counter() - t0) * 1000
+            with self._cond:
+                self._writing = False
+                if error is not None:
+                    self._error = error
+                else:
+                    self.written += 1
+                self.last_latency_ms = latency
+                self.max_latency_ms = max(self.max_latency_ms, latency)
+                self.total_latency_ms += latency
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """
+        保留中の要求をすぐに書き込み、書き込み中のものも含めて完了を待ちます。
+        それまでの書き込みで想定外の例外が起きていれば、ここで送出します。
+        """
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            snapshot, self._pending = self._pending, None
+            if snapshot is not None:
+                self._writing = True
+        if snapshot is not None:
+            self._write(snapshot)
+        with self._cond:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def stats(self) -> dict:
+        """合流した要求数と書き込みレイテンシを返します。"""
+        with self._cond:
+            return {
+                "submitted":      self.submitted,
+                "written":        self.written,
+                "coalesced":      self.submitted - self.written - (1 if self._pending else 0),
+                "last_latency_ms": self.last_latency_ms,
+                "max_latency_ms":  self.max_latency_ms,
+                "avg_latency_ms":  self.total_latency_ms / self.written if self.written else 0.0,
+            }
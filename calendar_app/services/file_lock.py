@@ -0,0 +1,56 @@
+# calendar_app/services/file_lock.py
+#
+# 複数プロセス（アプリの多重起動や外部スクリプト）の間で保存ファイルへの書き込みを
+# 直列化するためのアドバイザリロック。
+# 本体は os.replace で置き換わるため、ロックは専用のファイル（<path>.lock）に掛けます。
+# POSIX では fcntl.flock、Windows では msvcrt.locking を使います。
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _lock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    # LK_LOCK は一定回数の再試行で諦めて OSError になるので、取れるまで繰り返す
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def interprocess_lock(path: str):
+    """
+    path に対する排他ロックを取得し、with ブロックを抜けると解放します。
+    同じプロセス内のスレッド間の排他には使わず、threading.Lock と併用します。
+    """
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _lock(fd)
+        try:
+            yield
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,156 @@
+# calendar_app/services/holiday_calc.py
+#
+# 日本の祝日を計算で求める（ネットワーク不要）。
+# 「国民の祝日に関する法律」（1948 年 7 月 20 日施行）以降の改正を年ごとの表で持ち、
+# 1948〜2150 年の祝日・振替休日・国民の休日を返します。
+#
+#   - 日付固定の祝日と、ハッピーマンデー（第 n 月曜日）の祝日
+#   - 春分の日・秋分の日（天文計算の近似式）
+#   - 振替休日（1973 年 4 月 12 日以降。2007 年からは「その後の最も近い平日」）
+#   - 国民の休日（祝日に挟まれた平日。1985 年 12 月 27 日以降）
+#   - 皇室の慶弔などによる一度きりの休日、東京五輪による 2020・2021 年の移動
+#
+# 名前は祝日 API（holidays-jp）に合わせ、振替休日は「元の祝日名 振替休日」とします
+# （API が別の名前で返す日は _API_NAMES で合わせます）。
+# 春分・秋分は官報で前年に公示される日なので、遠い将来の年は近似式による予測です。
+
+from datetime import date, timedelta
+
+FIRST_YEAR = 1948
+LAST_YEAR = 2150
+
+# 法律の施行日（これより前の日付は祝日にしない）
+_LAW_START = date(1948, 7, 20)
+# 振替休日の導入日と、「その後の最も近い平日」への変更年
+_SUBSTITUTE_START = date(1973, 4, 12)
+_SUBSTITUTE_NEXT_WEEKDAY_YEAR = 2007
+# 国民の休日の導入日
+_SANDWICH_START = date(1985, 12, 27)
+
+# (名前, 月, 日 または ("monday", 第 n), 最初の年, 最後の年)
+_RULES = [
+    ("元日",         1,  1,                1949, LAST_YEAR),
+    ("成人の日",     1,  15,               1949, 1999),
+    ("成人の日",     1,  ("monday", 2),    2000, LAST_YEAR),
+    ("建国記念の日", 2,  11,               1967, LAST_YEAR),
+    ("天皇誕生日",   2,  23,               2020, LAST_YEAR),
+    ("天皇誕生日",   4,  29,               1949, 1988),
+    ("みどりの日",   4,  29,               1989, 2006),
+    ("昭和の日",     4,  29,               2007, LAST_YEAR),
+    ("憲法記念日",   5,  3,                1949, LAST_YEAR),
+    ("みどりの日",   5,  4,                2007, LAST_YEAR),
+    ("こどもの日",   5,  5,                1949, LAST_YEAR),
+    ("海の日",       7,  20,               1996, 2002),
+    ("海の日",       7,  ("monday", 3),    2003, LAST_YEAR),
+    ("山の日",       8,  11,               2016, LAST_YEAR),
+    ("敬老の日",     9,  15,               1966, 2002),
+    ("敬老の日",     9,  ("monday", 3),    2003, LAST_YEAR),
+    ("体育の日",     10, 10,               1966, 1999),
+    ("体育の日",     10, ("monday", 2),    2000, 2019),
+    ("スポーツの日", 10, ("monday", 2),    2020, LAST_YEAR),
+    ("文化の日",     11, 3,                1948, LAST_YEAR),
+    ("勤労感謝の日", 11, 23,               1948, LAST_YEAR),
+    ("天皇誕生日",   12, 23,               1989, 2018),
+]
+
+# 特別措置法などで、その年だけ日付が移った祝日（年 → {名前: (月, 日)}）
+_MOVED = {
+    2020: {"海の日": (7, 23), "スポーツの日": (7, 24), "山の日": (8, 10)},
+    2021: {"海の日": (7, 22), "スポーツの日": (7, 23), "山の日": (8, 8)},
+}
+
+# 一度きりの休日
+_SPECIAL_DAYS = {
+    date(1959, 4, 10): "結婚の儀",
+    date(1989, 2, 24): "大喪の礼",
+    date(1990, 11, 12): "即位礼正殿の儀",
+    date(1993, 6, 9): "結婚の儀",
+    date(2019, 5, 1): "休日（祝日扱い）",
+    date(2019, 10, 22): "休日（祝日扱い）",
+}
+
+# 祝日 API が振替休日などを上の規則と違う名前で返す日（API の表記に合わせる）
+_API_NAMES = {
+    date(2024, 8, 12): "休日 山の日",
+}
+
+# 春分・秋分の近似式の係数（年の範囲 → (春分, 秋分) の定数, 補正の基準年）
+_EQUINOX = [
+    (1900, 1979, 20.8357, 23.2588, 1983),
+    (1980, 2099, 20.8431, 23.2488, 1980),
+    (2100, 2150, 21.8510, 24.2488, 1980),
+]
+
+
+def _equinox_days(year: int) -> tuple[int, int]:
+    """その年の (春分日, 秋分日)。Python の int() は 0 方向への切り捨てで、元の式と同じ"""
+    for first, last, spring, autumn, base in _EQUINOX:
+        if first <= year <= last:
+            drift = 0.242194 * (year - 1980) - int((year - base) / 4)
+            return int(spring + drift), int(autumn + drift)
+    raise ValueError(f"春分・秋分を計算できない年です: {year}")
+
+
+def _nth_monday(year: int, month: int, nth: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(7 - first.weekday()) % 7 + 7 * (nth - 1))
+
+
+def _national_holidays(year: int) -> dict[date, str]:
+    """振替休日・国民の休日を除いた「国民の祝日」"""
+    result = {}
+    moved = _MOVED.get(year, {})
+    for name, month, day, first, last in _RULES:
+        if not first <= year <= last:
+            continue
+        if name in moved:
+            d = date(year, *moved[name])
+        elif isinstance(day, tuple):
+            d = _nth_monday(year, month, day[1])
+        else:
+            d = date(year, month, day)
+        result[d] = name
+    spring, autumn = _equinox_days(year)
+    result[date(year, 3, spring)] = "春分の日"
+    result[date(year, 9, autumn)] = "秋分の日"
+    for d, name in _SPECIAL_DAYS.items():
+        if d.year == year:
+            result[d] = name
+    return {d: name for d, name in result.items() if d >= _LAW_START}
+
+
+def holidays_for_year(year: int) -> dict[str, str]:
+    """
+    year 年の祝日を {"YYYY-MM-DD": 名前} で日付順に返します（祝日 API と同じ形）。
+    FIRST_YEAR〜LAST_YEAR の範囲外は ValueError です。
+    """
+    if not FIRST_YEAR <= year <= LAST_YEAR:
+        raise ValueError(f"祝日を計算できるのは {FIRST_YEAR}〜{LAST_YEAR} 年です: {year}")
+    holidays = _national_holidays(year)
+    result = dict(holidays)
+
+    # 振替休日: 祝日が日曜日なら、その後の祝日でない日（2006 年までは翌日の月曜日だけ）
+    for d, name in sorted(holidays.items()):
+        if d.weekday() != 6 or d < _SUBSTITUTE_START:
+            continue
+        sub = d + timedelta(days=1)
+        if year >= _SUBSTITUTE_NEXT_WEEKDAY_YEAR:
+            while sub in holidays:
+                sub += timedelta(days=1)
+        elif sub in holidays:
+            continue
+        if sub.year == year:
+            result[sub] = f"{name} 振替休日"
+
+    # 国民の休日: 前日と翌日がともに祝日で、それ自身は祝日・振替休日・日曜日でない日
+    if year >= _SANDWICH_START.year:
+        for d in sorted(holidays):
+            between = d + timedelta(days=1)
+            if (between + timedelta(days=1) in holidays and between not in result and between.weekday() != 6
+                    and between >= _SANDWICH_START):
+                result[between] = "国民の休日"
+
+    for d, name in _API_NAMES.items():
+        if d in result:
+            result[d] = name
+    return {d.isoformat(): result[d] for d in sorted(result)}
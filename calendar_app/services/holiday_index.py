@@ -0,0 +1,102 @@
+# calendar_app/services/holiday_index.py
+#
+# 読み込んだ年の祝日から作る検索用の索引。
+# 描画のたびに祝日の dict を走査したり文字列キーを作って照合したりしないよう、
+# 年を読み込んだときに一度だけ次の 3 つを作ります。
+#
+#   - 月ごとのバケット : (年, 月) → [(日, 名前), ...]（日の昇順）
+#   - 序数の表         : date.toordinal() → 名前（と、範囲検索用の昇順リスト）
+#   - 年ごとのビットマップ : 1 月 1 日を 0 ビット目とする整数（is_holiday をビット演算 1 回で）
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+
+def _to_date(value) -> date:
+    """date・"YYYY-MM-DD"・序数のいずれかを date に揃える"""
+    if isinstance(value, date):
+        return value
+    if isinstance(value, int):
+        return date.fromordinal(value)
+    return date.fromisoformat(value)
+
+
+class HolidayIndex:
+    """複数年の祝日をまとめて引ける索引"""
+
+    def __init__(self):
+        self._names: dict[int, str] = {}                      # 序数 → 名前
+        self._ordinals: list[int] = []                        # 序数の昇順（範囲検索用）
+        self._months: dict[tuple[int, int], list[tuple[int, str]]] = {}
+        self._bitmaps: dict[int, int] = {}                    # 年 → 日ごとのビット
+        self._year_ordinals: dict[int, list[int]] = {}        # 年 → その年の序数（入れ替え用）
+
+    def set_year(self, year: int, holidays: dict) -> None:
+        """year 年の祝日（{"YYYY-MM-DD": 名前}）で索引を作り直します。"""
+        self._drop_year(year)
+        jan1 = date(year, 1, 1).toordinal()
+        bitmap = 0
+        ordinals = []
+        for key, name in holidays.items():
+            try:
+                d = date.fromisoformat(key)
+            except (TypeError, ValueError):
+                continue
+            if d.year != year:
+                continue
+            ordinal = d.toordinal()
+            self._names[ordinal] = name
+            ordinals.append(ordinal)
+            bitmap |= 1 << (ordinal - jan1)
+            self._months.setdefault((year, d.month), []).append((d.day, name))
+        for month in range(1, 13):
+            bucket = self._months.get((year, month))
+            if bucket:
+                bucket.sort()
+        self._bitmaps[year] = bitmap
+        self._year_ordinals[year] = ordinals
+        self._ordinals = sorted(self._names)
+
+    def _drop_year(self, year: int) -> None:
+        for ordinal in self._year_ordinals.pop(year, ()):
+            self._names.pop(ordinal, None)
+        for month in range(1, 13):
+            self._months.pop((year, month), None)
+        self._bitmaps.pop(year, None)
+
+    def remove_year(self, year: int) -> None:
+        """year 年を索引から外します。"""
+        self._drop_year(year)
+        self._ordinals = sorted(self._names)
+
+    def clear(self) -> None:
+        self._names.clear()
+        self._ordinals = []
+        self._months.clear()
+        self._bitmaps.clear()
+        self._year_ordinals.clear()
+
+    def has_year(self, year: int) -> bool:
+        return year in self._bitmaps
+
+    def is_holiday(self, value) -> bool:
+        """value（date・"YYYY-MM-DD"・序数）が祝日か（読み込んでいない年は False）"""
+        d = _to_date(value)
+        bitmap = self._bitmaps.get(d.year)
+        if not bitmap:
+            return False
+        return bool(bitmap >> (d.toordinal() - date(d.year, 1, 1).toordinal()) & 1)
+
+    def name(self, value) -> str | None:
+        """value の祝日名（祝日でなければ None）"""
+        return self._names.get(_to_date(value).toordinal())
+
+    def holidays_in_month(self, year: int, month: int) -> list[tuple[int, str]]:
+        """その月の祝日を (日, 名前) の日付順で返します。"""
+        return list(self._months.get((year, month), ()))
+
+    def holidays_between(self, start, end) -> list[tuple[str, str]]:
+        """start〜end（両端を含む）の祝日を ("YYYY-MM-DD", 名前) の日付順で返します。"""
+        lo = bisect_left(self._ordinals, _to_date(start).toordinal())
+        hi = bisect_right(self._ordinals, _to_date(end).toordinal())
+        return [(date.fromordinal(o).isoformat(), self._names[o]) for o in self._ordinals[lo:hi]]
@@ -0,0 +1,115 @@
+# calendar_app/services/holiday_prefetch.py
+#
+# 祝日 API からの取得を別スレッドで行う先読み役。
+# Tk のメインスレッドはネットワークを待たず、計算による祝日（または空）ですぐに描画し、
+# 取得が終わった年は poll() で受け取って描き直します。
+# Tk は別スレッドから触れないので、結果はキューに積み、UI 側が root.after で定期的に取り出します。
+
+import queue
+import random
+import sys
+import threading
+import time
+
+from services import holiday_service
+
+# 1 回の先読みで試す回数と、再試行までの待ち時間（秒。試すたびに倍にし、揺らぎを加える）
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 30.0
+
+# 取得をあきらめた年を、次に試すまで空ける時間（秒）
+RETRY_AFTER_SEC = 10 * 60
+
+
+def backoff_delay(attempt: int) -> float:
+    """attempt 回目（0 始まり）の失敗の後に待つ秒数（指数バックオフ＋揺らぎ）"""
+    delay = min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class HolidayPrefetcher:
+    """
+    祝日を取得したい年を request() で受け付け、1 本のスレッドで順に API から取得します。
+    取得・確認が新しい年（holiday_service.is_fresh。取得時刻はメモから見る）は取得しません。
+    取得した年は poll() でメモに入れ、表示中の内容が変わった年を返します。
+
+    - fetch: 年を受け取って祝日の dict を返す関数（年ごとのファイルへの保存も行う。失敗時は例外）
+    - store: (年, 祝日) をメモに入れ、内容が変わったら True を返す関数
+    """
+
+    def __init__(self, fetch=holiday_service.request_holidays, store=holiday_service.store_holidays,
+                 sleep=time.sleep):
+        self.fetch = fetch
+        self.store = store
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._queue = []              # 取得待ちの年（先に要求された順）
+        self._in_flight = None        # 取得中の年
+        self._failed_at = {}          # 年 → あきらめた時刻（monotonic）
+        self._results = queue.Queue() # 取得できた (年, 祝日)（UI スレッドが poll() で受け取る）
+        self._running = False         # 取得スレッドが動いているか（終了の判断はロック内で行う）
+        self.fetched = 0
+        self.failures = 0
+
+    def request(self, years) -> None:
+        """years の年を取得待ちに加えます（確認済みで新しい年・取得中・再試行待ちの年は除く）。"""
+        now = time.monotonic()
+        with self._lock:
+            for year in years:
+                failed_at = self._failed_at.get(year)
+                if (year in self._queue or year == self._in_flight
+                        or (failed_at is not None and now - failed_at < RETRY_AFTER_SEC)):
+                    continue
+                if holiday_service.is_fresh(year):
+                    continue
+                self._queue.append(year)
+            if self._queue and not self._running:
+                self._running = True
+                threading.Thread(target=self._run, daemon=True).start()
+
+    def poll(self) -> list[int]:
+        """
+        取得が終わった年をメモに入れ、内容が変わった年を返します（UI スレッドから呼びます）。
+        メモと索引は描画中に読まれるので、書き換えは取得スレッドではなくここで行います。
+        """
+        years = []
+        while True:
+            try:
+                year, data = self._results.get_nowait()
+            except queue.Empty:
+                return years
+            if self.store(year, data):
+                years.append(year)
+
+    def _run(self) -> None:
+        """取得スレッド本体。取得待ちがなくなったら終了します。"""
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._in_flight = None
+                    self._running = False
+                    return
+                year = self._in_flight = self._queue.pop(0)
+            data = self._fetch_with_backoff(year)
+            if data is None:
+                with self._lock:
+                    self._failed_at[year] = time.monotonic()
+                continue
+            self.fetched += 1
+            self._results.put((year, data))
+
+    def _fetch_with_backoff(self, year: int) -> dict | None:
+        """year の祝日を取得します。失敗したら待ち時間を延ばしながら再試行し、だめなら None"""
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return self.fetch(year)
+            except Exception as e:
+                self.failures += 1
+                # 404 などクライアント側の誤りは、待っても結果が変わらないので再試行しない
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if attempt + 1 == MAX_ATTEMPTS or (status is not None and 400 <= status < 500):
+                    print(f"[warning] 祝日の取得をあきらめました({year}): {e}", file=sys.stderr)
+                    return None
+                self.sleep(backoff_delay(attempt))
+        return None
@@ -1,61 +1,226 @@
-import json
-import os
-import requests
-from utils.resource import resource_path
-
-CACHE_FILE = resource_path("data/holidays.json")
-
-def fetch_holidays_from_api(year):
-    """祝日APIから取得"""
-    url = f"https://holidays-jp.github.io/api/v1/{year}/date.json"
-    try:
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
-        return data
-    except Exception as e:
-        print(f"API取得失敗({year}):", e)
-        return {}
-
-def load_holiday_cache():
-    """キャッシュファイル読み込み"""
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_holiday_cache(data):
-    """キャッシュファイル保存"""
-    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def get_holidays_for_year(year):
-    """
-    この関数をMainWindowで使うイメージ
-    - キャッシュを読み込む
-    - 欲しい年がなければAPIから取得
-    - キャッシュに保存
-    - その年のデータを返す
-    """
-    holidays_cache = load_holiday_cache()
-    
-    if str(year) in holidays_cache:
-        return holidays_cache[str(year)]
-    
-    print(f"キャッシュに{year}年がないのでAPIから取得します")
-    data = fetch_holidays_from_api(year)
-    if data:
-        holidays_cache[str(year)] = data
-        save_holiday_cache(holidays_cache)
-    return data
-
-#if __name__ == "__main__":
-    """API取得するための確認"""
-    target_year = 2025
-    holidays = fetch_holidays_from_api(target_year)
-    if holidays:
-        save_holiday_cache(holidays)
-        print(f"{target_year}年の祝日を保存しました")
-    else:
-        print("祝日データ取得に失敗しました")
\ No newline at end of file
+import json
+import os
+import threading
+import time
+from datetime import date
+from services import holiday_calc
+from services import http_client
+from services.holiday_index import HolidayIndex
+from utils.resource import resource_path, file_signature, user_data_dir
+
+# 同梱の祝日データ（読み取り専用。PyInstaller 版では一時展開先にあるので書き込まない）
+CACHE_FILE = resource_path("data/holidays.json")
+
+# API から取得した祝日の保存先（~/.calendar_app/holidays/YYYY.json）
+HOLIDAY_DIR = user_data_dir("holidays")
+
+# 取得した祝日を新しいとみなす期間（秒）。過ぎたら条件付きリクエストで確かめ直す
+HOLIDAY_TTL_SEC = 30 * 24 * 60 * 60
+
+# 祝日 API の URL（年を埋め込む）。動作確認用にローカルのスタブサーバーへ向けられる
+HOLIDAY_API_URL = os.environ.get(
+    "CALENDAR_APP_HOLIDAY_API", "https://holidays-jp.github.io/api/v1/{year}/date.json")
+
+# 最後に読んだときの同梱データの署名と内容（変わっていなければ読み直さない）
+_cache_state = {"sig": None, "data": {}}
+
+# 年 → 祝日のメモ（プロセス全体で共有）。月を移動するたびにファイルを開かずに済ませる
+_year_cache = {}
+
+# メモにある年の祝日の索引（月ごとのバケット・序数の表・年ごとのビットマップ）
+_index = HolidayIndex()
+
+# 年 → API から取得・確認した時刻（保存がなければ None）。先読みの要否の判断でファイルを開かないため
+_fetched_at = {}
+
+# 同梱データの署名を確かめ直す間隔（秒）。この間はメモだけを見てファイルに触れない
+SIG_CHECK_SEC = 5.0
+
+# メモの利用状況（hits: メモから返した回数、misses: ファイルや API を見に行った回数）
+_stats = {"hits": 0, "misses": 0, "checked_at": None}
+
+# キャッシュファイルとメモの更新を直列化するロック（先読みスレッドからも書き込むため）
+_CACHE_LOCK = threading.RLock()
+
+def _year_file(year):
+    """year 年の祝日の保存先"""
+    return os.path.join(HOLIDAY_DIR, f"{year}.json")
+
+def load_year_entry(year):
+    """
+    保存済みの year 年の祝日を返す（なければ None）。
+    形式: {"holidays": {...}, "fetched_at": 取得・確認した時刻, "etag": ..., "last_modified": ...}
+    """
+    try:
+        with open(_year_file(year), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("holidays"), dict):
+        return None
+    return entry
+
+def _save_year_entry(year, entry):
+    """一時ファイルに書いてから置き換える"""
+    path = _year_file(year)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def _remember_fetched_at(year, entry):
+    """year 年を取得・確認した時刻をメモする（_CACHE_LOCK を持って呼ぶ）"""
+    _fetched_at[int(year)] = None if entry is None else entry.get("fetched_at", 0)
+
+def is_fresh(year):
+    """
+    year 年の祝日を HOLIDAY_TTL_SEC 以内に API から取得・確認済みか。
+    取得時刻はメモから見るので、年ごとのファイルを開くのはその年を初めて調べるときだけです。
+    """
+    with _CACHE_LOCK:
+        if int(year) not in _fetched_at:
+            _remember_fetched_at(year, load_year_entry(year))
+        fetched_at = _fetched_at[int(year)]
+    return fetched_at is not None and time.time() - fetched_at < HOLIDAY_TTL_SEC
+
+def request_holidays(year):
+    """
+    祝日APIから取得し、年ごとのファイルに保存して返す（失敗したら例外を送出する）。
+    前回の ETag / Last-Modified があれば条件付きリクエストにし、
+    304（変更なし）なら本文を受け取らず、保存済みの内容の確認時刻だけを更新する。
+    """
+    entry = load_year_entry(year)
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    res = http_client.get(HOLIDAY_API_URL.format(year=year), name="holidays", headers=headers)
+    if res.status_code == 304 and entry is not None:
+        entry["fetched_at"] = time.time()
+    else:
+        res.raise_for_status()
+        entry = {
+            "holidays": res.json(),
+            "fetched_at": time.time(),
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+        }
+    with _CACHE_LOCK:
+        _save_year_entry(year, entry)
+        _remember_fetched_at(year, entry)
+    return entry["holidays"]
+
+def fetch_holidays_from_api(year):
+    """祝日APIから取得（失敗したら空の dict）"""
+    try:
+        return request_holidays(year)
+    except Exception as e:
+        print(f"API取得失敗({year}):", e)
+        return {}
+
+def load_holiday_cache():
+    """同梱データ読み込み（前回から変わっていなければ解析し直さない）"""
+    sig = file_signature(CACHE_FILE)
+    if sig is None:
+        return {}
+    with _CACHE_LOCK:
+        if sig != _cache_state["sig"]:
+            with open(CACHE_FILE, encoding="utf-8") as f:
+                _cache_state["data"] = json.load(f)
+            _cache_state["sig"] = sig
+        return dict(_cache_state["data"])
+
+def store_holidays(year, data):
+    """
+    API から取得した year 年の祝日をメモに入れます。
+    それまで返していた内容（同梱データや計算による代わりなど）から変わったら True を返します。
+    """
+    key = str(year)
+    with _CACHE_LOCK:
+        changed = _year_cache.get(key) != data
+        _remember(year, data)
+    return changed
+
+def _remember(year, data):
+    """year 年の祝日をメモに入れ、索引も作り直す"""
+    _year_cache[str(year)] = data
+    _index.set_year(int(year), data)
+
+def _validate_year_cache():
+    """
+    前回から SIG_CHECK_SEC 秒以上たっていれば、同梱データの署名を確かめ、
+    書き換えられていたら年ごとのメモを捨てる
+    """
+    now = time.monotonic()
+    checked_at = _stats["checked_at"]
+    if checked_at is not None and now - checked_at < SIG_CHECK_SEC:
+        return
+    _stats["checked_at"] = now
+    if file_signature(CACHE_FILE) != _cache_state["sig"]:
+        _year_cache.clear()
+        _index.clear()
+        _fetched_at.clear()
+
+def holiday_cache_stats():
+    """年ごとのメモの利用状況 {"hits", "misses", "years"} を返す"""
+    return {"hits": _stats["hits"], "misses": _stats["misses"], "years": len(_year_cache)}
+
+def get_holidays_for_year(year):
+    """
+    この関数をMainWindowで使うイメージ
+    - 一度返した年はメモから返す（ファイルは読まない）
+    - API から取得して保存した年ごとのファイル、次に同梱データを見る
+    - どちらにもなければ計算で求める（1948〜2150 年。ネットワークを待たない）
+    - それ以外の年は空の dict（API からの取得は HolidayPrefetcher が裏で行う）
+    - その年のデータを返す
+    取得・同梱したデータにある年はそれを正とし、計算は代わりに使います。
+    保存が古くなった年も、確かめ直すまではそのまま返します。
+    返す dict はメモと共有しているので、呼び出し側で書き換えないこと。
+    """
+    with _CACHE_LOCK:
+        _validate_year_cache()
+        key = str(year)
+        if key in _year_cache:
+            _stats["hits"] += 1
+            return _year_cache[key]
+        _stats["misses"] += 1
+
+        entry = load_year_entry(year)
+        _remember_fetched_at(year, entry)
+        holidays_cache = load_holiday_cache()
+
+        if entry is not None:
+            _remember(year, entry["holidays"])
+        elif key in holidays_cache:
+            _remember(year, holidays_cache[key])
+        elif holiday_calc.FIRST_YEAR <= year <= holiday_calc.LAST_YEAR:
+            _remember(year, holiday_calc.holidays_for_year(year))
+        else:
+            # 計算できない年はメモせず、取得できるまで空のままにする
+            return {}
+        return _year_cache[key]
+
+def get_holiday_index():
+    """メモにある年の祝日の索引を返す（年は get_holidays_for_year で読み込まれる）"""
+    return _index
+
+def holidays_in_month(year, month):
+    """その月の祝日を (日, 名前) の日付順で返す"""
+    get_holidays_for_year(year)
+    return _index.holidays_in_month(year, month)
+
+def is_holiday(d):
+    """d（date または "YYYY-MM-DD"）が祝日か"""
+    year = d.year if isinstance(d, date) else int(d[:4])
+    get_holidays_for_year(year)
+    return _index.is_holiday(d)
+
+def holidays_between(start, end):
+    """start〜end（両端を含む。date または "YYYY-MM-DD"）の祝日を ("YYYY-MM-DD", 名前) で返す"""
+    first = start.year if isinstance(start, date) else int(start[:4])
+    last = end.year if isinstance(end, date) else int(end[:4])
+    for year in range(first, last + 1):
+        get_holidays_for_year(year)
+    return _index.holidays_between(start, end)
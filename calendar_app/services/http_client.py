@@ -0,0 +1,149 @@
+# calendar_app/services/http_client.py
+#
+# 祝日・天気の取得で共有する HTTP クライアント。
+#
+#   - requests.Session を 1 つだけ作り、接続プール（keep-alive）を使い回す
+#   - 接続・読み込みのタイムアウトを必ず付ける
+#   - 接続エラー・タイムアウト・5xx・429 は、揺らぎを入れた指数バックオフで数回だけ再試行する
+#   - gzip で受け取る（requests が展開する）
+#   - リクエストごとのレイテンシを記録し、stats() で名前ごとに集計を返す
+#   - 環境変数 CALENDAR_APP_HTTP_RECORD にフォルダを指定すると、200 の応答を記録する（http_fixtures）
+
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services import http_fixtures
+
+# 接続・読み込みのタイムアウト（秒）
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# 再試行の回数（初回を含まない）と、待ち時間の基準・上限（秒）
+MAX_RETRIES = 2
+BACKOFF_BASE_SEC = 0.25
+BACKOFF_MAX_SEC = 4.0
+
+# 再試行するステータスコード（一時的な失敗）
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# 接続プールの大きさ（ホストごとの同時接続数）
+POOL_SIZE = 8
+
+# 名前ごとに覚えておくレイテンシの件数
+METRICS_WINDOW = 200
+
+# 応答を記録するフォルダ（未指定なら記録しない）
+RECORD_DIR = os.environ.get("CALENDAR_APP_HTTP_RECORD") or None
+
+_session = None
+_session_lock = threading.Lock()
+
+# 名前 → {"latencies": 直近のミリ秒, "requests", "errors", "retries"}
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """共有の Session を返します（初回だけ作成）。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update({
+                "Accept-Encoding": "gzip, deflate",
+                "User-Agent": "DesktopCalendar/1.0",
+            })
+            _session = s
+        return _session
+
+
+def close() -> None:
+    """共有の Session を閉じます（プールした接続を切る）。"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _backoff(attempt: int) -> float:
+    """attempt 回目（0 始まり）の再試行までの秒数（上限付き指数バックオフ、全体に揺らぎ）"""
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** attempt)))
+
+
+def _record(name: str, elapsed_ms: float, error: bool, retries: int) -> None:
+    with _metrics_lock:
+        m = _metrics.get(name)
+        if m is None:
+            m = _metrics[name] = {"latencies": deque(maxlen=METRICS_WINDOW),
+                                  "requests": 0, "errors": 0, "retries": 0}
+        m["latencies"].append(elapsed_ms)
+        m["requests"] += 1
+        m["errors"] += error
+        m["retries"] += retries
+
+
+def get(url: str, *, name: str | None = None, headers: dict | None = None,
+        timeout=None, retries: int | None = None, sleep=time.sleep) -> requests.Response:
+    """
+    url を GET して Response を返します。
+    一時的な失敗は retries 回まで再試行し、それでも失敗したら最後の例外を送出します
+    （5xx などが続いたときは最後の Response を返すので、呼び出し側で raise_for_status してください）。
+    name はレイテンシを集計する名前です（省略時はホスト名）。
+    timeout・retries を省略すると、そのときの DEFAULT_TIMEOUT・MAX_RETRIES を使います。
+    """
+    name = name or requests.utils.urlparse(url).hostname or url
+    timeout = timeout or DEFAULT_TIMEOUT
+    retries = MAX_RETRIES if retries is None else retries
+    t0 = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            res = session().get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                _record(name, (time.perf_counter() - t0) * 1000, True, attempt)
+                raise
+        else:
+            if res.status_code not in RETRY_STATUSES or attempt >= retries:
+                _record(name, (time.perf_counter() - t0) * 1000, res.status_code >= 400, attempt)
+                if RECORD_DIR and res.status_code == 200:
+                    http_fixtures.record_response(RECORD_DIR, url, res.content)
+                return res
+            res.close()
+        sleep(_backoff(attempt))
+        attempt += 1
+
+
+def reset_stats() -> None:
+    """レイテンシの集計を捨てます（ベンチマークで条件ごとに測り直すため）。"""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def stats() -> dict:
+    """名前ごとのレイテンシの集計 {名前: {"requests", "errors", "retries", "avg_ms", "p50_ms", "p95_ms", "max_ms"}}"""
+    result = {}
+    with _metrics_lock:
+        for name, m in _metrics.items():
+            latencies = sorted(m["latencies"])
+            if not latencies:
+                continue
+            result[name] = {
+                "requests": m["requests"],
+                "errors": m["errors"],
+                "retries": m["retries"],
+                "avg_ms": sum(latencies) / len(latencies),
+                "p50_ms": latencies[len(latencies) // 2],
+                "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "max_ms": latencies[-1],
+            }
+    return result
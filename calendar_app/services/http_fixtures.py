@@ -0,0 +1,209 @@
+# calendar_app/services/http_fixtures.py
+#
+# 祝日・天気の通信をネットワークなしで再現するための仕組み（ベンチマーク・動作確認用）。
+#
+#   - 記録: 環境変数 CALENDAR_APP_HTTP_RECORD にフォルダを指定して起動すると、
+#           http_client が受け取った 200 の応答本文を <フォルダ>/<ホスト>/<パス> に保存する
+#   - 再生: StubServer が同じ並びのフォルダから応答を返す。各サービスの URL を
+#           stub.url_for(元の URL) に差し替えると、記録した応答でそのまま動く
+#   - 障害: Fault で遅延・応答なし（タイムアウト）・5xx・壊れた JSON・切断を注入できる
+#
+# 記録した応答は calendar_app/fixtures/ に置いています（benchmark.py network で使用）。
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+# 同梱の記録済み応答の置き場所
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+def fixture_path(root: str, url: str) -> str:
+    """url の応答を保存する場所（<root>/<ホスト>/<パス>）"""
+    parts = urlsplit(url)
+    path = parts.path.lstrip("/") or "index"
+    return os.path.join(root, parts.hostname or "localhost", *path.split("/"))
+
+
+def record_response(root: str, url: str, body: bytes) -> str:
+    """url の応答本文を root の下に保存し、そのパスを返します（一時ファイルに書いてから置き換える）。"""
+    path = fixture_path(root, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Fault(NamedTuple):
+    """スタブサーバーが応答に加える障害（既定値は障害なし）"""
+    latency_ms: int = 0         # 応答を返すまでの遅延
+    hang_sec: float = 0         # ヘッダーを返さずに待つ秒数（読み込みタイムアウトを起こす）
+    status: int | None = None   # 本文の代わりに返すステータス（例: 503）
+    malformed: bool = False     # 本文を途中で切った JSON にする
+    disconnect: bool = False    # 何も返さずに接続を切る
+    count: int | None = None    # 先頭の何回だけ障害を起こすか（None は毎回）
+
+
+# 障害の種類 → Fault（benchmark.py network が順に試す）
+FAULT_MODES = {
+    "ok":         Fault(),
+    "latency":    Fault(latency_ms=300),
+    "timeout":    Fault(hang_sec=3.0),
+    "5xx":        Fault(status=503),
+    "malformed":  Fault(malformed=True),
+    "disconnect": Fault(disconnect=True),
+}
+
+
+class StubServer:
+    """
+    記録済みの応答を返すローカルの HTTP サーバー。
+    パスは /<ホスト>/<元のパス> で、fixtures と同じ並びです。
+
+    - ETag を本文から作り、If-None-Match が一致すれば 304 を返す
+    - Accept-Encoding に gzip があれば gzip で返す
+    - add() で記録にない応答を足せる（計算で作った祝日など）
+    - set_fault() でパスの先頭ごとに障害を注入できる
+    - requests に (パス, ステータス) を受け付けた順に記録する
+    """
+
+    def __init__(self, root: str = FIXTURE_DIR):
+        self.root = root
+        self.requests = []
+        self._bodies = {}
+        self._faults = {}       # パスの先頭 → [Fault, 残り回数]
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add(self, url: str, body: bytes) -> None:
+        """url（元の URL またはスタブのパス）に対して body を返すようにします。"""
+        self._bodies[self._stub_path(url)] = body
+
+    def set_fault(self, fault: Fault, prefix: str = "/") -> None:
+        """prefix（元の URL またはスタブのパスの先頭）で始まる要求に fault を加えます。"""
+        with self._lock:
+            self._faults[self._stub_path(prefix) if "://" in prefix else prefix] = [fault, fault.count]
+
+    def clear_faults(self) -> None:
+        with self._lock:
+            self._faults.clear()
+
+    def url_for(self, url: str) -> str:
+        """元の URL（{year} などの埋め込みを含んでよい）をスタブサーバーの URL に置き換えます。"""
+        return f"http://127.0.0.1:{self.port}{self._stub_path(url)}"
+
+    @property
+    def port(self) -> int:
+        return self._server.server_port
+
+    def start(self) -> "StubServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def _stub_path(url: str) -> str:
+        if "://" not in url:
+            return url
+        parts = urlsplit(url)
+        return f"/{parts.hostname}{parts.path}"
+
+    def _take_fault(self, path: str) -> Fault | None:
+        """path に当てはまる障害を 1 回分取り出す"""
+        with self._lock:
+            for prefix, slot in self._faults.items():
+                if not path.startswith(prefix):
+                    continue
+                fault, remaining = slot
+                if remaining is None:
+                    return fault
+                if remaining > 0:
+                    slot[1] = remaining - 1
+                    return fault
+            return None
+
+    def _body_for(self, path: str) -> bytes | None:
+        body = self._bodies.get(path)
+        if body is not None:
+            return body
+        file_path = os.path.join(self.root, *path.lstrip("/").split("/"))
+        try:
+            with open(file_path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # ヘッダーと本文を別々に書くので、keep-alive で遅延 ACK を待たない
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                fault = stub._take_fault(path) or Fault()
+                if fault.hang_sec:
+                    time.sleep(fault.hang_sec)
+                if fault.latency_ms:
+                    time.sleep(fault.latency_ms / 1000)
+                if fault.disconnect:
+                    self.close_connection = True
+                    stub.requests.append((path, None))
+                    return
+                if fault.status is not None:
+                    self._send(fault.status, b"", path)
+                    return
+                body = stub._body_for(path)
+                if body is None:
+                    self._send(404, b"", path)
+                    return
+                if fault.malformed:
+                    body = body[: len(body) // 2]
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", path, {"ETag": etag})
+                    return
+                headers = {"Content-Type": "application/json; charset=utf-8", "ETag": etag}
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body)
+                    headers["Content-Encoding"] = "gzip"
+                self._send(200, body, path, headers)
+
+            def _send(self, status, body, path, headers=None):
+                stub.requests.append((path, status))
+                try:
+                    self.send_response(status)
+                    for name, value in (headers or {}).items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # タイムアウトした側が先に接続を切った
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,411 @@
+# calendar_app/services/ics.py
+#
+# iCalendar（.ics）形式の取り込みと書き出し。
+# 取り込みはファイルを 1 行ずつ読んで VEVENT 単位に切り出し、一定件数ごとのかたまりで解析します。
+# 大きなファイルではかたまりをプロセスプールに分配し、結果を順番どおりに集めます。
+# 既存の予定と内容が同じもの（内容ハッシュが一致するもの）は取り込まず、
+# 取り込んだ予定は最後に 1 回の save_events でまとめて保存します。
+# 書き出しは event_manager.iter_events で予定を順に読み、ジェネレータで 1 行ずつ作って書くため、
+# 件数が多くてもメモリ使用量は増えません。
+
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from itertools import islice
+
+from services import event_manager
+from services.event_records import make_event, day_order
+from services.recurrence import nth_of_month, nth_occurrence
+from utils.calendar_utils import time_to_minutes
+
+# このサイズ（バイト）以上のファイルはプロセスプールで解析する
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# 1 つのかたまりに含める VEVENT の数
+CHUNK_EVENTS = 2000
+
+# RRULE の曜日表記と recurrence の byweekday（月=0 … 日=6）の対応
+_WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+_FREQS = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly", "YEARLY": "yearly"}
+# 取り込める RRULE の要素（FREQ 以外。BYSETPOS・BYHOUR などを含む規則は単発の予定として取り込む）
+_RRULE_PARTS = {"INTERVAL", "UNTIL", "COUNT", "BYDAY", "BYMONTHDAY", "BYMONTH", "WKST"}
+
+# 毎月の「第 n ○曜日」の BYDAY（例: 2TU、最終金曜は -1FR）
+_NTH_BYDAY_RE = re.compile(r"^\+?([1-5]|-1)(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+def _content_key(date_str: str, ev: dict) -> tuple:
+    """重複判定用のキー（日付と予定の内容。set に入れて内容のハッシュで引く）"""
+    return (date_str, ev.get("title", ""), ev.get("start_time", ""), ev.get("end_time", ""),
+            ev.get("memo", ""),
+            json.dumps(ev["recurrence"], sort_keys=True) if ev.get("recurrence") else "")
+
+
+def event_hash(date_str: str, ev: dict) -> str:
+    """日付と予定の内容から作る安定したハッシュ（書き出し時の UID に使う）"""
+    payload = json.dumps([date_str, ev.get("title", ""), ev.get("start_time", ""),
+                          ev.get("end_time", ""), ev.get("memo", ""), ev.get("recurrence")],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------
+# 取り込み
+# ---------------------------------------------------------------
+
+def _unescape(text: str) -> str:
+    """TEXT 値のエスケープ（\\n \\, \\; \\\\）を戻す"""
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            out.append("\n" if nxt in "nN" else nxt)
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _iter_unfolded_lines(f):
+    """折り返し（行頭が空白・タブの継続行）を元の 1 行に戻しながら返す"""
+    current = None
+    for raw in f:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def iter_vevents(path: str):
+    """ファイルを先頭から読み、VEVENT ごとに行のリストを返すジェネレータ"""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        block = None
+        for line in _iter_unfolded_lines(f):
+            upper = line.upper()
+            if upper == "BEGIN:VEVENT":
+                block = []
+            elif upper == "END:VEVENT":
+                if block is not None:
+                    yield block
+                block = None
+            elif block is not None:
+                block.append(line)
+
+
+def _split_property(line: str) -> tuple[str, dict, str]:
+    """"NAME;PARAM=V:value" を (NAME, {PARAM: V}, value) に分ける"""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(p.split("=", 1) for p in params if "=" in p), value
+
+
+def _parse_datetime(value: str, params: dict) -> tuple[date, str] | None:
+    """DTSTART / DTEND の値を (日付, "HH:MM" または終日なら "") にする"""
+    # strptime は件数が多いと重いので、固定桁を切り出して数値にする
+    value = value.strip()
+    try:
+        day = date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return day, ""
+        if value[8] != "T":
+            return None
+        hour, minute = int(value[9:11]), int(value[11:13])
+    except (ValueError, IndexError):
+        return None
+    if value.endswith("Z"):
+        # UTC 指定はこの PC のローカル時刻に直す
+        dt = datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc).astimezone()
+        day, hour, minute = dt.date(), dt.hour, dt.minute
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return day, f"{hour:02d}:{minute:02d}"
+
+
+def _parse_rrule(value: str, exdates: list[str], start: date) -> dict | None:
+    """
+    RRULE を recurrence の規則に変換する（start は DTSTART の日付）。
+    規則で表せない部分が 1 つでもあれば、違う繰り返しを取り込まないよう None を返す。
+    """
+    parts = dict(p.split("=", 1) for p in value.upper().split(";") if "=" in p)
+    freq = _FREQS.get(parts.pop("FREQ", ""))
+    if freq is None or set(parts) - _RRULE_PARTS:
+        return None
+    interval = parts.get("INTERVAL", "1")
+    if not interval.isdigit() or int(interval) < 1:
+        return None
+    rule = {"freq": freq}
+    if interval != "1":
+        rule["interval"] = int(interval)
+
+    # BYMONTH / BYMONTHDAY は DTSTART と同じ月・日を指すもの（毎年・毎月の既定どおり）だけ表せる
+    if "BYMONTH" in parts and (freq != "yearly" or parts["BYMONTH"] != str(start.month)):
+        return None
+    if "BYMONTHDAY" in parts and (freq not in ("monthly", "yearly")
+                                  or parts["BYMONTHDAY"] != str(start.day)):
+        return None
+
+    byday = parts["BYDAY"].split(",") if "BYDAY" in parts else []
+    if byday and freq in ("daily", "weekly"):
+        # 曜日だけの指定。毎日 + 曜日（平日だけ など）は毎週 + 曜日と同じ
+        if any(d not in _WEEKDAYS for d in byday):
+            return None
+        if freq == "daily":
+            if interval != "1":
+                return None
+            rule["freq"] = "weekly"
+        rule["byweekday"] = sorted({_WEEKDAYS.index(d) for d in byday})
+    elif byday and freq == "monthly":
+        # 「第 n ○曜日」1 つだけに対応する（BYDAY=TU のような毎週の指定は表せない）
+        m = _NTH_BYDAY_RE.match(parts["BYDAY"])
+        if m is None or "BYMONTHDAY" in parts or _WEEKDAYS.index(m.group(2)) != start.weekday():
+            return None
+        rule["monthly"] = "nth_weekday"
+        nth = -1 if m.group(1) == "5" else int(m.group(1))
+        if nth != nth_of_month(start):
+            rule["nth"] = nth
+    elif byday:
+        return None
+
+    # 週の始まりは月曜日として展開するので、それ以外で結果が変わる指定は表せない
+    if (parts.get("WKST", "MO") != "MO" and rule["freq"] == "weekly"
+            and rule.get("interval", 1) > 1 and len(rule.get("byweekday", [])) > 1):
+        return None
+
+    until = None
+    if "UNTIL" in parts:
+        parsed = _parse_datetime(parts["UNTIL"], {})
+        if parsed is None:
+            return None
+        until = parsed[0]
+    if "COUNT" in parts:
+        # 回数指定は、その回数目の日付を終了日にする
+        if not parts["COUNT"].isdigit():
+            return None
+        last = nth_occurrence(start.isoformat(), rule, int(parts["COUNT"]))
+        if last is not None and (until is None or last < until):
+            until = last
+    if until is not None:
+        rule["until"] = until.isoformat()
+    if exdates:
+        rule["exdates"] = sorted(exdates)
+    return rule
+
+
+def parse_vevent(lines: list[str]) -> tuple[str, dict] | None:
+    """VEVENT 1 件分の行から (日付, 予定) を作る。開始日時がなければ None"""
+    props = {}
+    exdates = []
+    for line in lines:
+        name, params, value = _split_property(line)
+        if name == "EXDATE":
+            for v in value.split(","):
+                parsed = _parse_datetime(v, params)
+                if parsed is not None:
+                    exdates.append(parsed[0].isoformat())
+        elif name not in props:
+            props[name] = (params, value)
+
+    if "DTSTART" not in props:
+        return None
+    start = _parse_datetime(props["DTSTART"][1], props["DTSTART"][0])
+    if start is None:
+        return None
+    start_date, start_time = start
+    end_time = ""
+    if "DTEND" in props:
+        end = _parse_datetime(props["DTEND"][1], props["DTEND"][0])
+        # 日をまたぐ予定は開始日に置き、終了時刻は同じ日の場合だけ残す
+        if end is not None and end[0] == start_date:
+            end_time = end[1]
+    recurrence = _parse_rrule(props["RRULE"][1], exdates, start_date) if "RRULE" in props else None
+
+    return start_date.isoformat(), make_event(
+        _unescape(props.get("SUMMARY", ({}, ""))[1]),
+        start_time,
+        end_time,
+        _unescape(props.get("DESCRIPTION", ({}, ""))[1]),
+        recurrence,
+    )
+
+
+def _parse_chunk(blocks: list[list[str]]) -> list[tuple[str, dict]]:
+    """VEVENT のかたまりをまとめて解析する（プロセスプールの各プロセスで実行される）"""
+    return [parsed for parsed in map(parse_vevent, blocks) if parsed is not None]
+
+
+def _iter_chunks(path: str):
+    blocks = iter_vevents(path)
+    while True:
+        chunk = list(islice(blocks, CHUNK_EVENTS))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_parsed(path: str, workers: int | None = None):
+    """
+    ファイル中の予定を (日付, 予定) で順に返すジェネレータ。
+    PARALLEL_MIN_BYTES 以上のファイルはかたまりごとにプロセスプールで解析します
+    （workers=1 なら常にこのプロセスで解析します）。
+    """
+    if workers == 1 or os.path.getsize(path) < PARALLEL_MIN_BYTES:
+        for chunk in _iter_chunks(path):
+            yield from _parse_chunk(chunk)
+        return
+    # 投入済みのかたまりを一定数までに抑え、ファイル全体を先読みしないようにする
+    max_pending = (workers or os.cpu_count() or 1) * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _iter_chunks(path):
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= max_pending:
+                # 投入順に結果を取り出すので、ファイル中の順番が保たれる
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def import_ics(path: str, workers: int | None = None) -> dict:
+    """
+    .ics ファイルの予定を取り込み、1 回の save_events でまとめて保存します。
+    既存の予定やファイル内の他の予定と内容が同じものは取り込みません。
+    戻り値は {"imported": 件数, "duplicates": 件数}。
+    """
+    events = event_manager.load_events()
+    seen = {_content_key(d, ev) for d, day in events.items() for ev in day}
+    imported = duplicates = 0
+    touched = set()
+    for date_str, ev in iter_parsed(path, workers):
+        key = _content_key(date_str, ev)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        events.setdefault(date_str, []).append(ev)
+        touched.add(date_str)
+        imported += 1
+    if imported:
+        # 取り込んだ日だけ開始時刻順に並べ直す（時刻を分で比べる。同じ時刻なら元の順のまま）
+        for date_str in touched:
+            events[date_str].sort(key=day_order)
+        event_manager.save_events(events)
+    return {"imported": imported, "duplicates": duplicates}
+
+
+# ---------------------------------------------------------------
+# 書き出し
+# ---------------------------------------------------------------
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """75 オクテットを超える行を RFC 5545 の折り返しで分ける（CRLF 付きで返す）"""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while data:
+        cut = min(limit, len(data))
+        # マルチバイト文字の途中で切らない
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74   # 継続行は先頭の空白 1 文字分を除く
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _format_datetime(date_str: str, minutes: int) -> str:
+    """日付と 0 時からの分を DTSTART / DTEND の値（ローカル時刻の "YYYYMMDDTHHMM00"）にする"""
+    return date_str.replace("-", "") + "T%02d%02d00" % divmod(minutes, 60)
+
+
+def _rrule(rule: dict, date_str: str, timed: bool) -> list[str]:
+    """
+    recurrence の規則を RRULE / EXDATE 行にする。
+    date_str は元の予定の日付（「第 n ○曜日」の BYDAY を作る）、timed は DTSTART が日時か。
+    """
+    parts = [f"FREQ={rule['freq'].upper()}"]
+    if rule.get("interval", 1) != 1:
+        parts.append(f"INTERVAL={rule['interval']}")
+    if rule.get("byweekday"):
+        parts.append("BYDAY=" + ",".join(_WEEKDAYS[d] for d in rule["byweekday"]))
+    if rule["freq"] == "monthly" and rule.get("monthly") == "nth_weekday":
+        start = date.fromisoformat(date_str)
+        parts.append(f"BYDAY={int(rule.get('nth') or nth_of_month(start))}{_WEEKDAYS[start.weekday()]}")
+    if rule.get("until"):
+        # UNTIL は DTSTART と同じ型にする（日時ならその日の終わりまで）
+        parts.append("UNTIL=" + rule["until"].replace("-", "") + ("T235959" if timed else ""))
+    lines = ["RRULE:" + ";".join(parts)]
+    if rule.get("exdates"):
+        lines.append("EXDATE;VALUE=DATE:" + ",".join(d.replace("-", "") for d in rule["exdates"]))
+    return lines
+
+
+def iter_ics_lines(items):
+    """(日付, 予定) の並びを .ics の行として順に返すジェネレータ"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield _fold("BEGIN:VCALENDAR")
+    yield _fold("VERSION:2.0")
+    yield _fold("PRODID:-//Desktop Calendar//JA")
+    for date_str, ev in items:
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{event_hash(date_str, ev)}@calendar_app",
+            f"DTSTAMP:{stamp}",
+        ]
+        # "9:00" のような書き方も分に直して 2 桁にそろえる。読めない開始時刻は終日として書き出し、
+        # 読めない終了時刻や開始より前の終了時刻は DTEND を省く
+        start = time_to_minutes(ev.get("start_time", ""))
+        if start is not None:
+            lines.append(f"DTSTART:{_format_datetime(date_str, start)}")
+            end = time_to_minutes(ev.get("end_time", ""))
+            if end is not None and end > start:
+                lines.append(f"DTEND:{_format_datetime(date_str, end)}")
+        else:
+            lines.append(f"DTSTART;VALUE=DATE:{date_str.replace('-', '')}")
+        lines.append(f"SUMMARY:{_escape(ev.get('title', ''))}")
+        if ev.get("memo"):
+            lines.append(f"DESCRIPTION:{_escape(ev['memo'])}")
+        if ev.get("recurrence"):
+            lines.extend(_rrule(ev["recurrence"], date_str, start is not None))
+        lines.append("END:VEVENT")
+        for line in lines:
+            yield _fold(line)
+    yield _fold("END:VCALENDAR")
+
+
+def export_ics(path: str, events=None) -> int:
+    """
+    予定を .ics ファイルに書き出し、書き出した予定の件数を返します。
+    events を省略すると保存されているすべての予定を書き出します。
+    """
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.writelines(iter_ics_lines(counted(event_manager.iter_events(events=events))))
+    return count
@@ -0,0 +1,190 @@
+# calendar_app/services/month_model.py
+#
+# 1 か月分の描画内容を前もって計算した MonthModel と、その LRU キャッシュ。
+# CalendarView は MonthModel の 42 セル（日曜始まり × 6 週）とフッターの文字列を
+# そのまま描くだけで、日付キーの生成・背景色の優先順位・今日の判定・ツールチップの整形は
+# 組み立て時に一度だけ行います。
+#
+# 色はテーマから解決した値を持つので、テーマを切り替えたらキャッシュを捨てます。
+# 予定・祝日・予報・今日の日付が変わったときは、影響する月だけを捨てます。
+
+from collections import OrderedDict
+from datetime import date
+from typing import NamedTuple
+
+from services.theme_manager import ThemeManager
+from utils.calendar_utils import generate_calendar_matrix
+
+# 1 か月のセル数（7 日 × 6 週）
+CELLS_PER_MONTH = 42
+
+
+class DayCell(NamedTuple):
+    """日付セル 1 つ分の描画内容（空セルは day = 0, key = None）"""
+    day: int
+    key: str | None          # "YYYY-MM-DD"
+    bg: str                  # 背景色（予定 → 祝日 → 今日 → 週末 → 通常の優先順で解決済み）
+    fg: str                  # 文字色（今日だけ強調）
+    holiday: bool            # ㊗ バッジを重ねるか
+    badge_bg: str            # ㊗ バッジの背景色
+    glyph: str               # 天気の記号（予報がなければ ""）
+    tooltip: str | None      # 予定と予報のツールチップ（なければ None）
+
+
+class MonthModel(NamedTuple):
+    """1 か月分の描画内容（組み立て後は変更しない）"""
+    year: int
+    month: int
+    weeks: int                    # 実際に描く週の数（4〜6）
+    cells: tuple[DayCell, ...]    # CELLS_PER_MONTH 個。weeks 週より後ろは空セル
+    footer: str                   # フッターの祝日一覧
+    today: int                    # この月に今日があればその日、なければ 0
+    badge_fg: str                 # ㊗ バッジの文字色
+    glyph_fg: str                 # 天気の記号の文字色
+    sig: tuple | None = None      # 組み立てたときの保存ファイルの署名（外部の変更の検知用）
+
+
+def event_summary(events_list) -> str:
+    """
+    ツールチップ用に、複数イベントを「時刻〜タイトル（メモ）」形式で整形
+    改行区切りで返す
+    """
+    lines = []
+    for ev in events_list:
+        # 時刻は Event 側で分の整数として保持しているので再解析しない
+        line = f"{ev.time_range_text()} {ev.title}"
+        if ev.memo:
+            line += f" - {ev.memo}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def build_month_model(year: int, month: int, month_holidays, events, forecast: dict,
+                      today: date, sig: tuple | None = None) -> MonthModel:
+    """
+    year 年 month 月の MonthModel を組み立てます。
+
+    - month_holidays: その月の祝日 [(日, 名前)]（HolidayIndex.holidays_in_month）
+    - events: "YYYY-MM-DD" → Event のリスト（EventTable）
+    - forecast: "YYYY-MM-DD" → DayForecast
+    - today: 今日の日付（セルごとに datetime.today() を呼ばない）
+    """
+    holiday_days = {day for day, _ in month_holidays}
+    today_day = today.day if (today.year, today.month) == (year, month) else 0
+    color = ThemeManager.get
+    plain_bg = color('bg')
+    text_fg = color('text')
+    badge_bg = color('badge_bg')
+
+    matrix = generate_calendar_matrix(year, month)
+    cells = []
+    for week in matrix:
+        for col, day in enumerate(week):
+            if not day:
+                cells.append(DayCell(0, None, plain_bg, text_fg, False, badge_bg or plain_bg, "", None))
+                continue
+            key = f"{year}-{month:02d}-{day:02d}"
+            day_events = events[key] if key in events else None
+            holiday = day in holiday_days
+            is_today = day == today_day
+            # 背景色：予定 → 祝日 → 今日 → 週末（col=0:日, 6:土） → 通常
+            if day_events is not None:
+                bg = color('highlight')
+            elif holiday:
+                bg = color('accent')
+            elif is_today:
+                bg = color('today')
+            elif col in (0, 6):
+                bg = color('weekend')
+            else:
+                bg = plain_bg
+            day_forecast = forecast.get(key)
+            tips = []
+            if day_events is not None:
+                tips.append(event_summary(day_events))
+            if day_forecast is not None:
+                tips.append(day_forecast.summary())
+            cells.append(DayCell(
+                day, key, bg,
+                color('today_fg') if is_today else text_fg,
+                holiday,
+                badge_bg or bg,
+                day_forecast.glyph if day_forecast is not None else "",
+                '\n'.join(tips) if tips else None,
+            ))
+    blank = DayCell(0, None, plain_bg, text_fg, False, badge_bg or plain_bg, "", None)
+    cells.extend([blank] * (CELLS_PER_MONTH - len(cells)))
+
+    if month_holidays:
+        footer = " | ".join(f"{day}日 {name}" for day, name in month_holidays)
+    else:
+        footer = "今月は祝日ありません"
+
+    return MonthModel(
+        year, month, len(matrix), tuple(cells), footer, today_day,
+        color('badge_fg', plain_bg), color('forecast_fg', text_fg), sig,
+    )
+
+
+class MonthModelCache:
+    """(年, 月) → MonthModel の LRU キャッシュ"""
+
+    def __init__(self, maxsize: int = 12):
+        self.maxsize = maxsize
+        self._models: OrderedDict[tuple[int, int], MonthModel] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, year: int, month: int, sig: tuple | None = None) -> MonthModel | None:
+        """
+        (year, month) の MonthModel を返します。sig を渡すと、組み立てたときの署名が
+        一致しないもの（外部で保存ファイルが変わったもの）は捨てて外れとして数えます。
+        """
+        model = self._models.get((year, month))
+        if model is not None and sig is not None and model.sig != sig:
+            del self._models[(year, month)]
+            model = None
+        if model is None:
+            self.misses += 1
+            return None
+        self._models.move_to_end((year, month))
+        self.hits += 1
+        return model
+
+    def __contains__(self, key) -> bool:
+        return key in self._models
+
+    def put(self, model: MonthModel) -> None:
+        key = (model.year, model.month)
+        self._models[key] = model
+        self._models.move_to_end(key)
+        while len(self._models) > self.maxsize:
+            self._models.popitem(last=False)
+
+    def resign(self, old_sig: tuple, new_sig: tuple, months=None) -> None:
+        """
+        署名が old_sig の MonthModel を new_sig に付け替えます。
+        自分の保存で保存ファイルの署名が変わっただけのとき（内容は通知で反映済み）に使います。
+        months に (年, 月) の集まりを渡すとその月だけを付け替え、残りは次の get で捨てられます。
+        """
+        for key, model in self._models.items():
+            if model.sig == old_sig and (months is None or key in months):
+                self._models[key] = model._replace(sig=new_sig)
+
+    def invalidate(self, year: int, month: int) -> None:
+        self._models.pop((year, month), None)
+
+    def invalidate_year(self, year: int) -> None:
+        for month in range(1, 13):
+            self._models.pop((year, month), None)
+
+    def invalidate_dates(self, date_keys) -> None:
+        """"YYYY-MM-DD" の日付を含む月を捨てます。"""
+        for key in {(int(k[:4]), int(k[5:7])) for k in date_keys}:
+            self._models.pop(key, None)
+
+    def clear(self) -> None:
+        self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
@@ -0,0 +1,241 @@
+# calendar_app/services/recurrence.py
+#
+# 繰り返し予定（毎日・毎週・毎月・毎年）の展開。
+# 予定 dict に "recurrence" キーとして規則を持たせ、最初の日付のキーにだけ保存します。
+# 表示中の期間だけを遅延展開するので、終了日のない規則でも全件を作ることはありません。
+#
+# 規則の形式:
+#   {
+#     "freq":      "daily" | "weekly" | "monthly" | "yearly",
+#     "interval":  1,                      # 何日/週/か月/年ごとか
+#     "byweekday": [0, 2],                 # weekly のみ。月=0 … 日=6（省略時は最初の日の曜日）
+#     "monthly":   "day" | "nth_weekday",  # monthly のみ。日付指定か「第 n ○曜日」か
+#     "nth":       2,                      # nth_weekday のみ。第何週か（-1 は最終。省略時は最初の日から求める）
+#     "until":     "YYYY-MM-DD",           # 終了日（空なら無期限）
+#     "exdates":   ["YYYY-MM-DD", ...]     # この日だけ除外
+#   }
+
+import calendar
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from services.event_records import day_order
+
+FREQ_LABELS = {
+    "daily":   "毎日",
+    "weekly":  "毎週",
+    "monthly": "毎月",
+    "yearly":  "毎年",
+}
+
+# 月ごとの展開結果を覚えておく月数（古く使われていない月から捨てる）
+MONTH_CACHE_SIZE = 24
+
+
+def _add_months(year: int, month: int, n: int) -> tuple[int, int]:
+    """(year, month) に n か月足した年月"""
+    total = year * 12 + (month - 1) + n
+    return total // 12, total % 12 + 1
+
+
+def _nth_weekday(year: int, month: int, weekday: int, nth: int) -> date | None:
+    """その月の第 nth weekday（nth=-1 は最終）。存在しなければ None"""
+    days_in_month = calendar.monthrange(year, month)[1]
+    if nth > 0:
+        first = date(year, month, 1)
+        day = 1 + (weekday - first.weekday()) % 7 + (nth - 1) * 7
+    else:
+        last = date(year, month, days_in_month)
+        day = days_in_month - (last.weekday() - weekday) % 7
+    return date(year, month, day) if 1 <= day <= days_in_month else None
+
+
+def nth_of_month(d: date) -> int:
+    """d がその月の第何 ○曜日か（第 5 週は「最終」として -1）"""
+    nth = (d.day - 1) // 7 + 1
+    return -1 if nth == 5 else nth
+
+
+def _candidates(start: date, rule: dict, window_start: date, window_end: date):
+    """規則どおりの日付を window_start 付近から昇順に生成します（終了日・除外日は未適用）。"""
+    freq = rule.get("freq")
+    interval = max(1, int(rule.get("interval", 1)))
+
+    if freq == "daily":
+        # 最初に窓に入る回まで一気に進める
+        skip = max(0, (window_start - start).days) // interval
+        d = start + timedelta(days=skip * interval)
+        while d <= window_end:
+            yield d
+            d += timedelta(days=interval)
+
+    elif freq == "weekly":
+        weekdays = sorted(set(rule.get("byweekday") or [start.weekday()]))
+        week0 = start - timedelta(days=start.weekday())   # 最初の週の月曜日
+        weeks = max(0, (window_start - week0).days // 7)
+        week = week0 + timedelta(weeks=weeks - weeks % interval)
+        while week <= window_end:
+            for wd in weekdays:
+                yield week + timedelta(days=wd)
+            week += timedelta(weeks=interval)
+
+    elif freq == "monthly":
+        by_nth = rule.get("monthly") == "nth_weekday"
+        # 第 5 週は「最終 ○曜日」として扱う
+        nth = int(rule.get("nth") or nth_of_month(start))
+        months = max(0, (window_start.year - start.year) * 12 + window_start.month - start.month)
+        n = months - months % interval
+        while True:
+            y, m = _add_months(start.year, start.month, n)
+            if date(y, m, 1) > window_end:
+                break
+            if by_nth:
+                d = _nth_weekday(y, m, start.weekday(), nth)
+            elif start.day <= calendar.monthrange(y, m)[1]:
+                d = date(y, m, start.day)
+            else:
+                d = None   # 31 日のない月などは飛ばす
+            if d is not None:
+                yield d
+            n += interval
+
+    elif freq == "yearly":
+        years = max(0, window_start.year - start.year)
+        y = start.year + years - years % interval
+        while y <= window_end.year:
+            if start.month != 2 or start.day != 29 or calendar.isleap(y):
+                yield date(y, start.month, start.day)
+            y += interval
+
+
+def occurrences(start_str: str, rule: dict, window_start: date, window_end: date) -> list[date]:
+    """
+    start_str を初回とする規則の、[window_start, window_end] に入る日付を返します。
+    初回の日付そのもの（元の予定が保存されている日）は含みません。
+    """
+    try:
+        start = date.fromisoformat(start_str)
+        until = date.fromisoformat(rule["until"]) if rule.get("until") else None
+    except ValueError:
+        return []
+    if until is not None:
+        window_end = min(window_end, until)
+    if window_end < window_start or window_end < start:
+        return []
+    exdates = set(rule.get("exdates") or [])
+    return [
+        d for d in _candidates(start, rule, window_start, window_end)
+        if start < d and window_start <= d <= window_end and d.isoformat() not in exdates
+    ]
+
+
+def nth_occurrence(start_str: str, rule: dict, count: int) -> date | None:
+    """
+    start_str を 1 回目として、規則どおりに数えた count 回目の日付を返します
+    （iCalendar の COUNT と同じく、除外日も 1 回に数えます）。そこまで続かなければ None。
+    """
+    start = date.fromisoformat(start_str)
+    if count <= 1:
+        return start
+    n = 1
+    try:
+        for d in _candidates(start, rule, start, date.max):
+            if d > start:
+                n += 1
+                if n == count:
+                    return d
+    except (ValueError, OverflowError):
+        # 9999 年を超えた
+        pass
+    return None
+
+
+def describe(rule: dict | None) -> str:
+    """頻度と終了日だけの表示用の短い説明（「毎週」「毎月（〜2025-12-31）」など）"""
+    if not rule:
+        return ""
+    text = FREQ_LABELS.get(rule.get("freq"), "")
+    if rule.get("until"):
+        text += f"（〜{rule['until']}）"
+    return text
+
+
+def _master_key(date_str: str, ev: dict) -> tuple:
+    """元の予定を内容で識別するキー（読み直しで dict が別物になっても一致させるため）"""
+    return (date_str, ev.get("title", ""), ev.get("start_time", ""),
+            ev.get("end_time", ""), ev.get("memo", ""), repr(ev.get("recurrence")))
+
+
+class OccurrenceCache:
+    """
+    繰り返し予定（元の予定）を保持し、月ごとに展開した結果をキャッシュします。
+    規則が追加・変更・削除されたときだけキャッシュを捨てます。
+    月ごとの展開結果は新しく使った MONTH_CACHE_SIZE か月分だけを持ちます。
+    """
+
+    def __init__(self, events: dict | None = None, max_months: int = MONTH_CACHE_SIZE):
+        # 内容のキー → [日付, 予定, 件数]（同じ日に同じ内容の予定が複数あっても数で持つ）
+        self._masters: dict[tuple, list] = {}
+        self._months: OrderedDict[tuple[int, int], dict] = OrderedDict()
+        self.max_months = max_months
+        if events:
+            self.rebuild(events)
+
+    def _add_master(self, date_str: str, ev: dict) -> None:
+        slot = self._masters.get(_master_key(date_str, ev))
+        if slot is None:
+            self._masters[_master_key(date_str, ev)] = [date_str, ev, 1]
+        else:
+            slot[2] += 1
+
+    def _remove_master(self, date_str: str, ev: dict) -> None:
+        key = _master_key(date_str, ev)
+        slot = self._masters.get(key)
+        if slot is None:
+            return
+        slot[2] -= 1
+        if slot[2] <= 0:
+            del self._masters[key]
+
+    def rebuild(self, events: dict) -> None:
+        """events 全体から繰り返し予定を拾い直します。"""
+        self._masters = {}
+        for date_str, day in events.items():
+            for ev in day:
+                if ev.get("recurrence"):
+                    self._add_master(date_str, ev)
+        self._months.clear()
+
+    def on_change(self, events: dict, record: dict, old: dict | None) -> None:
+        """event_manager の変更通知。繰り返し予定が関わるときだけ反映して無効化します。"""
+        new = record.get("event")
+        changed = False
+        if old is not None and old.get("recurrence"):
+            self._remove_master(record["date"], old)
+            changed = True
+        if record["op"] in ("add", "update") and new.get("recurrence"):
+            self._add_master(record["date"], new)
+            changed = True
+        if changed:
+            self._months.clear()
+
+    def month(self, year: int, month: int) -> dict:
+        """その月に現れる繰り返し予定の発生分を {日付: [予定, ...]} で返します。"""
+        key = (year, month)
+        cached = self._months.get(key)
+        if cached is not None:
+            self._months.move_to_end(key)
+            return cached
+        first = date(year, month, 1)
+        last = date(year, month, calendar.monthrange(year, month)[1])
+        result = {}
+        for master_date, ev, count in self._masters.values():
+            for d in occurrences(master_date, ev["recurrence"], first, last):
+                result.setdefault(d.isoformat(), []).extend(
+                    dict(ev, occurrence_of=master_date) for _ in range(count))
+        for day in result.values():
+            day.sort(key=day_order)
+        self._months[key] = result
+        while len(self._months) > self.max_months:
+            self._months.popitem(last=False)
+        return result
@@ -0,0 +1,166 @@
+# calendar_app/services/search_index.py
+#
+# 予定のタイトル・メモに対する転置インデックス。
+# 日本語は単語の区切りがないため、文字 bigram（2 文字ずつ）で分割して索引します。
+# 1 文字の検索にも応えられるよう、1 文字（unigram）の索引も併せて持ちます。
+# 予定の追加・更新・削除ごとに差分で更新し、作り直しは初回だけです。
+#
+# posting は「日付順の並びキー」を上位ビット、doc_id を下位 32 ビットに詰めた整数の
+# ソート済みリストです。日付順に辿って上位 limit 件が揃った時点で打ち切れるため、
+# ヒット件数の多い語でも検索時間が件数に比例しません。
+
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import date
+
+from utils.calendar_utils import time_to_minutes
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+def normalize(text: str) -> str:
+    """全角英数などを揃え（NFKC）、小文字化した検索用の文字列を返します。"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _tokens(text: str) -> set[str]:
+    """文字 unigram と bigram の集合（空白をまたぐ bigram は作らない）"""
+    tokens = set()
+    for part in text.split():
+        tokens.update(part)
+        tokens.update(part[i:i + 2] for i in range(len(part) - 1))
+    return tokens
+
+
+def _order(date_str: str, ev: dict) -> int:
+    """日付・開始時刻順の並びキー（時刻のない予定はその日の最後）"""
+    try:
+        ordinal = date.fromisoformat(date_str).toordinal()
+    except ValueError:
+        ordinal = 0
+    minutes = time_to_minutes(ev.get("start_time", ""))
+    return ordinal * 1441 + (1440 if minutes is None else minutes)
+
+
+def _doc_key(date_str: str, ev: dict) -> tuple:
+    """予定の内容から作るキー（読み直しで dict が別物になっても同じ予定を指せるように）"""
+    return (date_str, ev.get("title", ""), ev.get("start_time", ""),
+            ev.get("end_time", ""), ev.get("memo", ""))
+
+
+class SearchIndex:
+    """タイトル・メモの部分一致検索を行う転置インデックス"""
+
+    def __init__(self, events: dict | None = None):
+        self._postings: dict[str, list[int]] = {}  # token → ソート済みの (並びキー << 32 | doc_id)
+        self._docs: dict[int, tuple] = {}          # doc_id → (posting 上の値, 日付, 予定, 検索用テキスト)
+        self._by_key: dict[tuple, list[int]] = {}  # 内容キー → doc_id（同じ内容の予定は複数あり得る）
+        self._next_id = 0
+        if events:
+            self.rebuild(events)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def rebuild(self, events: dict) -> None:
+        """events 全体から作り直します。"""
+        self._postings.clear()
+        self._docs.clear()
+        self._by_key.clear()
+        # 1 件ずつ insort せず、末尾に積んでから posting ごとに 1 回だけ並べ替える
+        for date_str, day in events.items():
+            for ev in day:
+                self.add(date_str, ev, _sorted=False)
+        for posting in self._postings.values():
+            posting.sort()
+
+    def add(self, date_str: str, ev: dict, _sorted: bool = True) -> None:
+        """予定を 1 件索引に加えます。"""
+        doc_id = self._next_id
+        self._next_id += 1
+        text = normalize(f"{ev.get('title', '')}\n{ev.get('memo', '')}")
+        entry = (_order(date_str, ev) << _ID_BITS) | doc_id
+        self._docs[doc_id] = (entry, date_str, ev, text)
+        self._by_key.setdefault(_doc_key(date_str, ev), []).append(doc_id)
+        for token in _tokens(text):
+            posting = self._postings.get(token)
+            if posting is None:
+                self._postings[token] = [entry]
+            elif _sorted:
+                insort(posting, entry)
+            else:
+                posting.append(entry)
+
+    def remove(self, date_str: str, ev: dict) -> None:
+        """同じ内容の予定を 1 件索引から外します。"""
+        ids = self._by_key.get(_doc_key(date_str, ev))
+        if not ids:
+            return
+        doc_id = ids.pop()
+        if not ids:
+            del self._by_key[_doc_key(date_str, ev)]
+        entry, _, _, text = self._docs.pop(doc_id)
+        for token in _tokens(text):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            i = bisect_left(posting, entry)
+            if i < len(posting) and posting[i] == entry:
+                del posting[i]
+            if not posting:
+                del self._postings[token]
+
+    def on_change(self, events: dict, record: dict, old: dict | None) -> None:
+        """event_manager の変更通知を受けて差分更新します。"""
+        if old is not None:
+            self.remove(record["date"], old)
+        if record["op"] in ("add", "update"):
+            self.add(record["date"], record["event"])
+
+    def search(self, query: str, limit: int = 50) -> list[tuple[str, dict]]:
+        """
+        query を含む予定を (日付, 予定) の日付順で最大 limit 件返します。
+        空白区切りの複数語はすべてを含むもの（AND）を返します。
+        """
+        words = normalize(query).split()
+        if not words:
+            return []
+        tokens = set()
+        for word in words:
+            tokens.update(word if len(word) == 1 else
+                          (word[i:i + 2] for i in range(len(word) - 1)))
+
+        # 件数の少ない posting を軸にし、残りの posting には二分探索で含まれるか確かめる
+        postings = []
+        for token in tokens:
+            posting = self._postings.get(token)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        base, others = postings[0], postings[1:]
+
+        # 3 文字以上の語は bigram の一致だけでは確定しないので本文で確認する
+        long_words = [w for w in words if len(w) > 2]
+        docs = self._docs
+
+        def matches(entry: int) -> bool:
+            for posting in others:
+                i = bisect_left(posting, entry)
+                if i == len(posting) or posting[i] != entry:
+                    return False
+            if long_words:
+                text = docs[entry & _ID_MASK][3]
+                return all(w in text for w in long_words)
+            return True
+
+        # base は並びキー順なので、先頭から limit 件見つかった時点で打ち切れる
+        results = []
+        for entry in base:
+            if matches(entry):
+                _, date_str, ev, _ = docs[entry & _ID_MASK]
+                results.append((date_str, ev))
+                if len(results) >= limit:
+                    break
+        return results
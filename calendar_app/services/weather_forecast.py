@@ -0,0 +1,187 @@
+# calendar_app/services/weather_forecast.py
+#
+# 気象庁の予報 JSON（forecast/<地域コード>.json）から、日ごとの天気の表を作る。
+# 予報概況の文章から「晴れ」「雨」を拾うのではなく、天気コード・降水確率・気温を読み、
+# {"YYYY-MM-DD": DayForecast} の小さな表に一度だけまとめて保存します（TTL 付き）。
+# カレンダーの日付セルは、この表を日付キーで 1 回引くだけで天気の記号を描けます。
+#
+# 予報 JSON は 2 つの発表からなる配列です。
+#   [0] 3 日分の予報 : timeSeries[0] 天気コード / [1] 6 時間ごとの降水確率 / [2] 気温
+#   [1] 週間予報     : timeSeries[0] 天気コード・降水確率 / [1] 最低・最高気温
+# 両方にある日は、より新しく細かい 3 日分の予報を優先し、欠けている項目を週間予報で補います。
+
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import requests
+
+from services import http_client
+from services.weather_service import AREA_CODE, WEATHER_TTL_SEC, load_entry, save_entry
+
+# 気象庁の予報JSONデータのURL（地域コードを埋め込む）。動作確認用にローカルのスタブサーバーへ向けられる
+FORECAST_URL = os.environ.get(
+    "CALENDAR_APP_FORECAST_API", "https://www.jma.go.jp/bosai/forecast/data/forecast/{area}.json")
+
+# 天気コードの百の位 → (セルに描く記号, 天気の名前)
+_WEATHER_KINDS = {
+    1: ("☀", "晴れ"),
+    2: ("☁", "くもり"),
+    3: ("☂", "雨"),
+    4: ("☃", "雪"),
+}
+
+
+class DayForecast(NamedTuple):
+    """1 日分の予報（値のない項目は None）"""
+    code: int               # 気象庁の天気コード（例: 101 = 晴れ時々くもり）
+    pop: int | None         # 降水確率（％。3 日分の予報では 6 時間ごとの最大）
+    temp_min: int | None    # 最低気温（℃）
+    temp_max: int | None    # 最高気温（℃）
+
+    @property
+    def glyph(self) -> str:
+        return weather_glyph(self.code)
+
+    def summary(self) -> str:
+        """ツールチップ用の 1 行（例: "☂ 雨 降水確率 80% 最高 25℃ / 最低 18℃"）"""
+        parts = [f"{self.glyph} {weather_name(self.code)}"]
+        if self.pop is not None:
+            parts.append(f"降水確率 {self.pop}%")
+        temps = []
+        if self.temp_max is not None:
+            temps.append(f"最高 {self.temp_max}℃")
+        if self.temp_min is not None:
+            temps.append(f"最低 {self.temp_min}℃")
+        if temps:
+            parts.append(" / ".join(temps))
+        return " ".join(parts)
+
+
+def weather_glyph(code: int) -> str:
+    """天気コードをセルに描く記号にする（分からないコードは空文字）"""
+    return _WEATHER_KINDS.get(code // 100, ("", ""))[0]
+
+
+def weather_name(code: int) -> str:
+    return _WEATHER_KINDS.get(code // 100, ("", "不明"))[1]
+
+
+def _int_or_none(value) -> int | None:
+    """予報 JSON の数値文字列を int に（空文字・欠損は None）"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _first_area(series: dict) -> dict:
+    """時系列の先頭の地域（県の代表地域・代表地点）"""
+    areas = series.get("areas") or [{}]
+    return areas[0]
+
+
+def _by_date(series: dict, key: str):
+    """時系列の先頭の地域の key の値を ("YYYY-MM-DD", "HH", 値) で順に返す（空の値は飛ばす）"""
+    values = _first_area(series).get(key) or []
+    for time_define, value in zip(series.get("timeDefines", []), values):
+        if value not in ("", None):
+            yield time_define[:10], time_define[11:13], value
+
+
+def parse_forecast(data) -> dict[str, DayForecast]:
+    """
+    予報 JSON を {"YYYY-MM-DD": DayForecast} の日付順の表にします。
+    形が想定と違うときは ValueError を送出します。
+    """
+    if not isinstance(data, list) or not data:
+        raise ValueError("予報データが配列ではありません")
+    codes, pops, mins, maxs = {}, {}, {}, {}
+    try:
+        # 3 日分の予報
+        short = data[0]["timeSeries"]
+        report_date = data[0].get("reportDatetime", "")[:10]
+        for day, _, code in _by_date(short[0], "weatherCodes"):
+            codes.setdefault(day, int(code))
+        if len(short) > 1:
+            for day, _, pop in _by_date(short[1], "pops"):
+                pops[day] = max(pops.get(day, 0), int(pop))
+        if len(short) > 2:
+            for day, hour, temp in _by_date(short[2], "temps"):
+                # 09 時は日中の最高、00 時は朝の最低。発表日の 00 時は日中の最高の繰り返しなので使わない
+                if hour == "09":
+                    maxs.setdefault(day, int(temp))
+                elif day != report_date:
+                    mins.setdefault(day, int(temp))
+
+        # 週間予報（3 日分の予報にない日と項目を補う）
+        if len(data) > 1:
+            weekly = data[1]["timeSeries"]
+            for day, _, code in _by_date(weekly[0], "weatherCodes"):
+                codes.setdefault(day, int(code))
+            for day, _, pop in _by_date(weekly[0], "pops"):
+                pops.setdefault(day, int(pop))
+            if len(weekly) > 1:
+                for day, _, temp in _by_date(weekly[1], "tempsMin"):
+                    mins.setdefault(day, int(temp))
+                for day, _, temp in _by_date(weekly[1], "tempsMax"):
+                    maxs.setdefault(day, int(temp))
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        raise ValueError(f"予報データの形が想定と違います: {e!r}") from e
+
+    return {day: DayForecast(codes[day], pops.get(day), mins.get(day), maxs.get(day))
+            for day in sorted(codes)}
+
+
+def _entry_name(area_code: str) -> str:
+    return f"forecast_{area_code}"
+
+
+def _to_table(stored: dict) -> dict[str, DayForecast]:
+    """保存形式（{"YYYY-MM-DD": [コード, 降水確率, 最低, 最高]}）から表に戻す"""
+    return {day: DayForecast(*values) for day, values in stored.items()}
+
+
+def is_forecast_fresh(area_code: str = AREA_CODE) -> bool:
+    """その地域の予報を WEATHER_TTL_SEC 以内に取得済みか"""
+    entry = load_entry(_entry_name(area_code))
+    return entry is not None and time.time() - entry.get("fetched_at", 0) < WEATHER_TTL_SEC
+
+
+def get_cached_forecast(area_code: str = AREA_CODE) -> dict[str, DayForecast]:
+    """保存済みの予報の表を返す（ネットワークには触れない。なければ空の dict）"""
+    entry = load_entry(_entry_name(area_code))
+    if entry is None:
+        return {}
+    try:
+        return _to_table(entry["data"])
+    except TypeError:
+        return {}
+
+
+def get_forecast(area_code: str = AREA_CODE) -> dict[str, DayForecast] | None:
+    """
+    その地域の日ごとの予報の表を返します。
+    WEATHER_TTL_SEC 以内に取得済みなら、ネットワークに触れず保存済みの表を返します。
+    取得・解析に失敗したときは None を返します。
+    """
+    if is_forecast_fresh(area_code):
+        return get_cached_forecast(area_code)
+    try:
+        res = http_client.get(FORECAST_URL.format(area=area_code), name="forecast")
+        res.raise_for_status()
+        table = parse_forecast(res.json())
+    except requests.exceptions.RequestException as e:
+        print(f"[ERROR] 週間予報の取得に失敗しました: {e}", file=sys.stderr)
+        return None
+    except ValueError as e:
+        # JSON として読めない・形が違う（JSONDecodeError も ValueError）
+        print(f"[ERROR] 週間予報を読めませんでした: {e}", file=sys.stderr)
+        return None
+    # 解析済みの表だけを保存する（次回の起動でも解析し直さない）
+    save_entry(_entry_name(area_code), {
+        "fetched_at": time.time(),
+        "data": {day: list(fc) for day, fc in table.items()},
+    })
+    return table
@@ -1,87 +1,211 @@
-# services/weather_service.py
-import requests
-import sys
-import json
-from datetime import datetime
-
-# 気象庁の予報概況JSONデータのURL
-# 140000 は神奈川県の地域コード
-JSON_URL = "https://www.jma.go.jp/bosai/forecast/data/overview_forecast/140000.json"
-
-def get_weather_for_today() -> dict | None:
-    """
-    気象庁APIから横浜市の今日の天気概況を取得
-    :return: 天気情報（辞書）。取得失敗時は None を返す
-    """
-    try:
-        # print(f"URLにアクセス中: {JSON_URL}")
-        res = requests.get(JSON_URL)
-        res.raise_for_status() # HTTPエラーチェック
-        
-        data = res.json()
-        
-        weather_text = data.get("text", "")
-        
-        kanagawa_weather = _extract_kanagawa_weather(weather_text)
-        
-        if not kanagawa_weather:
-             return None
-        
-        icons = _get_weather_icon_from_text(kanagawa_weather)
-        
-        # 修正: publishing_officeを返さない
-        return {
-            "icon": icons,
-            "description": kanagawa_weather
-        }
-
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] HTTPリクエストエラー: {e}", file=sys.stderr)
-        return None
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] JSONデコードエラー: {e}", file=sys.stderr)
-        return None
-    except Exception as e:
-        print(f"[ERROR] 天気情報取得で不明なエラー: {e}", file=sys.stderr)
-        return None
-
-def _get_weather_icon_from_text(text: str) -> list[str]:
-    """
-    天気概況のテキストから対応するアイコンのファイル名を返す
-    """
-    icons = []
-    if "晴れ" in text:
-        icons.append("sun_icon.png")
-    if "曇り" in text:
-        icons.append("cloudy_icon.png")
-    if "雨" in text:
-        icons.append("rain_icon.png")
-    if "雪" in text:
-        icons.append("snow_icon.png")
-    if "雷" in text or "稲妻" in text:
-        icons.append("thunder_icon.png")
-    if "風" in text:
-        icons.append("wind_icon.png")
-    
-    if not icons:
-        # どの条件にも当てはまらない場合、デフォルトアイコンを設定
-        icons.append("sun_icon.png")
-        
-    return icons
-
-def _extract_kanagawa_weather(text: str) -> str | None:
-    """
-    概況文から「神奈川県は、...」の行か、今日の日付の予報を抽出する
-    """
-    today_num_str = str(datetime.now().day)
-    search_str = f"{today_num_str}日は"
-
-    lines = text.split("。")
-    
-    # 複数行に分かれている場合があるので、行ごとに検索
-    for line in lines:
-        if "神奈川県は、" in line:
-            return line.strip()
-        if search_str in line:
-            return line.strip()
-    return None
\ No newline at end of file
+# services/weather_service.py
+import requests
+import sys
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from services import http_client
+from utils.resource import user_data_dir
+
+# 気象庁の予報概況JSONデータのURL（地域コードを埋め込む）。動作確認用にローカルのスタブサーバーへ向けられる
+OVERVIEW_URL = os.environ.get(
+    "CALENDAR_APP_WEATHER_API", "https://www.jma.go.jp/bosai/forecast/data/overview_forecast/{area}.json")
+
+# 140000 は神奈川県の地域コード
+AREA_CODE = "140000"
+JSON_URL = OVERVIEW_URL.format(area=AREA_CODE)
+
+# 表示する地域コードの一覧。環境変数 CALENDAR_APP_WEATHER_AREAS にカンマ区切りで指定できる
+# （例: "140000,130000,270000" で神奈川・東京・大阪）
+AREA_CODES = [code.strip() for code in
+              os.environ.get("CALENDAR_APP_WEATHER_AREAS", AREA_CODE).split(",") if code.strip()] or [AREA_CODE]
+
+# 複数地域を同時に取得するスレッド数の上限（共有 Session の接続プールの大きさに合わせる）
+MAX_WORKERS = http_client.POOL_SIZE
+
+# 概況文の中の「〇〇県は、」「東京都は、」「〇〇地方は、」の行（対象地域の名前が分からないときに使う）
+_AREA_LINE_RE = re.compile(r"(北海道|東京都|京都府|大阪府|\w{2,3}県|\w+地方)は、")
+
+# 取得した概況を新しいとみなす期間（秒）。環境変数 CALENDAR_APP_WEATHER_TTL で変えられる
+WEATHER_TTL_SEC = int(os.environ.get("CALENDAR_APP_WEATHER_TTL", 30 * 60))
+
+# 取得した概況の保存先（~/.calendar_app/weather/<地域コード>.json）
+WEATHER_DIR = user_data_dir("weather")
+
+# 保存名 → {"fetched_at": 取得時刻, "data": 内容}（ファイルを毎回読まないためのメモ）
+# 保存名は概況なら地域コード、週間予報なら "forecast_<地域コード>"
+_memo = {}
+_memo_lock = threading.Lock()
+
+def _cache_file(name: str) -> str:
+    return os.path.join(WEATHER_DIR, f"{name}.json")
+
+def load_entry(name: str) -> dict | None:
+    """メモか保存ファイルから、最後に取得して保存した内容を返す（なければ None）"""
+    with _memo_lock:
+        entry = _memo.get(name)
+        if entry is not None:
+            return entry
+        try:
+            with open(_cache_file(name), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("data"), dict):
+            return None
+        _memo[name] = entry
+        return entry
+
+def save_entry(name: str, entry: dict) -> None:
+    """メモに入れ、一時ファイルに書いてから置き換える"""
+    with _memo_lock:
+        _memo[name] = entry
+        path = _cache_file(name)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[warning] 天気の保存に失敗しました: {e}", file=sys.stderr)
+
+def is_weather_fresh(area_code: str = AREA_CODE) -> bool:
+    """その地域の概況を WEATHER_TTL_SEC 以内に取得済みか"""
+    entry = load_entry(area_code)
+    return entry is not None and time.time() - entry.get("fetched_at", 0) < WEATHER_TTL_SEC
+
+def _to_weather_info(data: dict) -> dict | None:
+    """概況JSONから表示用の天気情報を作る（該当する行がなければ None）"""
+    weather_text = data.get("text", "")
+    area_name = data.get("targetArea") or None
+
+    area_weather = _extract_area_weather(weather_text, area_name)
+
+    if not area_weather:
+         return None
+
+    icons = _get_weather_icon_from_text(area_weather)
+
+    # 日付の行を拾ったときは、どの地域の天気か分かるよう地域名を付ける
+    if area_name and area_name not in area_weather:
+        area_weather = f"{area_name}：{area_weather}"
+
+    # 修正: publishing_officeを返さない
+    return {
+        "icon": icons,
+        "description": area_weather,
+        "area": area_name
+    }
+
+def get_cached_weather(area_code: str = AREA_CODE) -> dict | None:
+    """
+    保存済みの概況から天気情報を返す（ネットワークには触れない）。
+    古くなっていてもそのまま返すので、取り直しは refresh 側で行う。
+    """
+    entry = load_entry(area_code)
+    if entry is None:
+        return None
+    return _to_weather_info(entry["data"])
+
+def get_weather_for_today(area_code: str = AREA_CODE) -> dict | None:
+    """
+    気象庁APIから地域（既定は神奈川県）の今日の天気概況を取得
+    WEATHER_TTL_SEC 以内に取得済みなら、ネットワークに触れず保存済みの概況から返す
+    :return: 天気情報（辞書）。取得失敗時は None を返す
+    """
+    if is_weather_fresh(area_code):
+        return get_cached_weather(area_code)
+    try:
+        # print(f"URLにアクセス中: {JSON_URL}")
+        # 共有の Session（接続の使い回し・タイムアウト・再試行つき）で取得
+        res = http_client.get(OVERVIEW_URL.format(area=area_code), name="weather")
+        res.raise_for_status() # HTTPエラーチェック
+        
+        data = res.json()
+        if not isinstance(data, dict):
+            raise ValueError(f"概況データの形が想定と違います: {type(data).__name__}")
+        save_entry(area_code, {"fetched_at": time.time(), "data": data})
+        
+        return _to_weather_info(data)
+
+    except requests.exceptions.RequestException as e:
+        print(f"[ERROR] HTTPリクエストエラー: {e}", file=sys.stderr)
+        return None
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSONデコードエラー: {e}", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"[ERROR] 天気情報取得で不明なエラー: {e}", file=sys.stderr)
+        return None
+
+def _get_weather_icon_from_text(text: str) -> list[str]:
+    """
+    天気概況のテキストから対応するアイコンのファイル名を返す
+    """
+    icons = []
+    if "晴れ" in text:
+        icons.append("sun_icon.png")
+    if "曇り" in text:
+        icons.append("cloudy_icon.png")
+    if "雨" in text:
+        icons.append("rain_icon.png")
+    if "雪" in text:
+        icons.append("snow_icon.png")
+    if "雷" in text or "稲妻" in text:
+        icons.append("thunder_icon.png")
+    if "風" in text:
+        icons.append("wind_icon.png")
+    
+    if not icons:
+        # どの条件にも当てはまらない場合、デフォルトアイコンを設定
+        icons.append("sun_icon.png")
+        
+    return icons
+
+def _extract_area_weather(text: str, area_name: str | None = None) -> str | None:
+    """
+    概況文から「<地域名>は、...」の行か、今日の日付の予報を抽出する
+    area_name（概況JSONの targetArea）の行がなければ、どの都道府県・地方の行でも拾う
+    """
+    today_num_str = str(datetime.now().day)
+    search_str = f"{today_num_str}日は"
+    area_str = f"{area_name}は、" if area_name else None
+
+    lines = text.split("。")
+    
+    # 複数行に分かれている場合があるので、行ごとに検索（対象地域の行を最優先）
+    if area_str is not None:
+        for line in lines:
+            if area_str in line:
+                return line.strip()
+    # 東京都の概況が「東京地方は、」で始まるように、targetArea と書き方が違うこともある
+    for line in lines:
+        if _AREA_LINE_RE.search(line) or search_str in line:
+            return line.strip()
+    return None
+
+def get_cached_weather_for_areas(area_codes=None) -> list[dict]:
+    """保存済みの概況から、地域ごとの天気情報を地域コードの順に返す（ネットワークには触れない）"""
+    infos = (get_cached_weather(code) for code in (area_codes or AREA_CODES))
+    return [info for info in infos if info is not None]
+
+def is_weather_fresh_for_areas(area_codes=None) -> bool:
+    """すべての地域の概況が WEATHER_TTL_SEC 以内に取得済みか"""
+    return all(is_weather_fresh(code) for code in (area_codes or AREA_CODES))
+
+def get_weather_for_areas(area_codes=None) -> list[dict]:
+    """
+    複数地域の天気を同時に取得し、地域コードの順に返します（全体の待ち時間はほぼ 1 往復分）。
+    取得に失敗した地域は、保存済みの古い概況があればそれを使います。
+    """
+    area_codes = area_codes or AREA_CODES
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(area_codes))) as pool:
+        fetched = list(pool.map(get_weather_for_today, area_codes))
+    infos = [info if info is not None else get_cached_weather(code)
+             for code, info in zip(area_codes, fetched)]
+    return [info for info in infos if info is not None]
\ No newline at end of file
@@ -1,331 +1,272 @@
-# =============================================================
-# ui/calendar_view.py 
-# 目的:
-#   - 月間カレンダーの描画と操作（前月/次月、日付クリック、ツールチップ表示）
-#   - 祝日/イベント/今日の強調表示、フッターに祝日一覧を表示
-# ポイント:
-#   - ThemeManager から色を都度取得し、update_theme() で再描画
-#   - generate_calendar_matrix() で「日曜〜土曜×最大6週」の行列を生成
-#   - place(in_=...) を使って日付セル右上に「㊗」バッジを重ねて表示
-#   - after() は使わず、再描画主体（時計は別ウィジェットが担当）
-# =============================================================
-
-import tkinter as tk
-from datetime import datetime
-from utils.calendar_utils import generate_calendar_matrix
-from ui.theme import COLORS, FONTS
-from services.theme_manager import ThemeManager
-from ui.tooltip import ToolTip
-
-class CalendarView:
-    """カレンダー表示用の UI コンポーネント"""
-
-    def __init__(
-        self,
-        parent,
-        year: int,
-        month: int,
-        holidays: dict,
-        events: dict,
-        on_date_click,  # 日付クリック時コールバック
-        on_prev,        # 前月ボタンコールバック
-        on_next         # 次月ボタンコールバック
-    ):
-        # 親ウィジェットと、描画対象の年月/祝日/イベント/コールバック群を保持
-        self.parent = parent
-        self.year = year
-        self.month = month
-        self.holidays = holidays
-        self.events = events
-        self.on_date_click = on_date_click
-        self.on_prev = on_prev
-        self.on_next = on_next
-        self.footer_frame = None
-        self.holiday_label = None
-
-        # カレンダー全体を入れるフレームを作成（背景色はテーマ依存）
-        self.frame = tk.Frame(self.parent, bg=ThemeManager.get('bg'))
-        self.frame.pack(padx=15, pady=15)
-
-        # 初回描画。以降の再描画は render() を都度呼ぶ
-        self.render()
-
-    def update(self, year, month, holidays, events):
-        """
-        外部から年月・祝日・イベントを更新したいときに呼ぶ。
-        再描画を行う。
-        """
-        # 受け取ったデータで内部状態を上書きし、描画をやり直す
-        self.year = year
-        self.month = month
-        self.holidays = holidays
-        self.events = events
-        self.render()
-    
-    def _draw_footer(self):
-        """
-        カレンダーの最下部にフッターを描画する関数。
-        左端にその月の祝日名、右端に時計を表示します。
-        """
-        # 前回のフッターがあれば破棄（再描画に備える）
-        if self.footer_frame:
-            self.footer_frame.destroy()
-
-        # footer はグリッド8行目（0始まり: ヘッダ1 + 曜日1 + 週最大6 = 8）に配置
-        self.footer_frame = tk.Frame(self.frame, bg=ThemeManager.get('header_bg'))
-        self.footer_frame.grid(row=8, column=0, columnspan=7, sticky="we", pady=(8, 0))
-
-        # 当月の祝日のみ抽出（YYYY-MM-DD から MM を取り出して比較）
-        holidays_this_month = [
-            (d, name)
-            for d, name in self.holidays.items()
-            if int(d[5:7]) == self.month
-        ]
-
-        # 表示用の祝日文字列を生成（なければ既定文言）
-        if holidays_this_month:
-            holiday_strs = [f"{int(d[8:]):d}日 {name}" for d, name in holidays_this_month]
-            text = " | ".join(holiday_strs)
-        else:
-            text = "今月は祝日ありません"
-
-        # 左寄せのラベルとして祝日一覧を表示（wraplengthで長文を折り返し）
-        self.holiday_label = tk.Label(
-            self.footer_frame,
-            text=text,
-            font=FONTS['small_holiday'],
-            bg=ThemeManager.get('header_bg'),
-            fg=ThemeManager.get('holiday_label_fg'),
-            anchor="w",
-            justify="left",
-            wraplength=280      
-        )
-        self.holiday_label.pack(side="left", padx=(5, 0)) 
-
-    def render(self):
-        """ヘッダー／曜日ラベル／日付セルを再構築"""
-        # 一旦クリアしてから、ヘッダ→曜日→日付→フッターの順で再構成
-        self._clear()
-        self._draw_header()
-        self._draw_weekday_labels()
-        self._draw_days()
-        self._draw_footer()
-
-    def _clear(self):
-        """前回描画したウィジェットをすべて破棄"""
-        # pack/grid/place で配置した子ウィジェットを総ざらいで削除
-        for widget in self.frame.winfo_children():
-            widget.destroy()
-
-    def _draw_header(self):
-        """年・月と前後移動ボタンを表示するヘッダーを作成"""
-        header = tk.Frame(self.frame, bg=ThemeManager.get('header_bg'))
-        header.grid(row=0, column=0, columnspan=7, sticky='nsew')
-
-        # 両ボタンと中央ラベルのバランスを保つため、空き列の weight を設定
-        header.grid_columnconfigure(1, weight=1)
-        header.grid_columnconfigure(3, weight=1)
-
-        # 前月ボタン（ホバー色は _add_button_hover で設定）
-        prev_btn = tk.Button(
-            header,
-            text='＜',
-            command=self.on_prev,
-            bg=ThemeManager.get('header_bg'),
-            fg=ThemeManager.get('text'),
-            relief='flat',
-            font=FONTS['header'],
-            width=3,
-            cursor='hand2'
-        )
-        prev_btn.grid(row=0, column=0, padx=6, pady=6)
-        self._add_button_hover(prev_btn, ThemeManager.get('header_bg'))
-
-        # 年月ラベル（ダブルクリックで今月へ戻るショートカットを提供）
-        self.month_label = tk.Label(
-            header,
-            text=f"{self.year}年 {self.month}月",
-            font=FONTS['header'],
-            bg=ThemeManager.get('header_bg'),
-            fg=ThemeManager.get('text'),
-            padx=12,
-            pady=6
-        )
-        self.month_label.grid(row=0, column=2, padx=6, pady=6)
-        
-        # ダブルクリックイベントをバインド
-        self.month_label.bind("<Double-1>", self._go_to_today)
-
-        # 次月ボタン
-        next_btn = tk.Button(
-            header,
-            text='＞',
-            command=self.on_next,
-            bg=ThemeManager.get('header_bg'),
-            fg=ThemeManager.get('text'),
-            relief='flat',
-            font=FONTS['header'],
-            width=3,
-            cursor='hand2'
-        )
-        next_btn.grid(row=0, column=4, padx=6, pady=6)
-        self._add_button_hover(next_btn, ThemeManager.get('header_bg'))
-
-    def _draw_weekday_labels(self):
-        """日～土の曜日ラベルを表示"""
-        days = ['日', '月', '火', '水', '木', '金', '土']
-        for idx, wd in enumerate(days):
-            # 週末（日/土）は少し色を変えて視認性を上げる
-            fg = ThemeManager.get('text')
-            if wd in ('日', '土'):
-                fg = '#9D5C64'  
-
-            tk.Label(
-                self.frame,
-                text=wd,
-                font=FONTS['base'],
-                bg=ThemeManager.get('header_bg'),
-                fg=fg,
-                width=6,
-                pady=4
-            ).grid(row=1, column=idx, padx=1, pady=4)
-
-    def _draw_days(self):
-        """各日付セルを生成し、イベントや祝日を反映"""
-        matrix = generate_calendar_matrix(self.year, self.month)
-
-        for row_index, week in enumerate(matrix, start=2):
-                for col_index, day in enumerate(week):
-                    if not day:
-                        # 月初の前詰め/末尾の後詰めにあたる空セル
-                        text, key = '', None
-                        fg_color = ThemeManager.get('text') 
-                    else:
-                        # 実日付セルはキー（YYYY-MM-DD）を作ってイベント/祝日照合に使う
-                        key = f"{self.year}-{self.month:02d}-{day:02d}"
-                        text = str(day)
-                        # 今日だけ文字色を変える（視認性を上げる演出）
-                        fg_color = ThemeManager.get('today_fg') if self._is_today(day) else ThemeManager.get('text')
-                    
-                    # 背景色はイベント/祝日/今日/週末/通常の優先順で決定
-                    bg = self._get_day_bg(day, col_index, key)
-
-                    lbl = tk.Label(
-                        self.frame,
-                        text=text,
-                        font=FONTS['base'],
-                        bg=bg,
-                        fg=fg_color,
-                        width=6,
-                        height=2,
-                        bd=1,
-                        padx=2,  # 左右の余白を増やす
-                        pady=2,  # 上下の余白を減らす
-                        relief='ridge'
-                    )
-                    lbl.grid(row=row_index, column=col_index, padx=1, pady=1)
-
-                    # 祝日セルに㊗マークの小バッジを右上に重ねて表示（place + in_）
-                    badge = None
-                    if key in self.holidays:
-                        badge = tk.Label(
-                            self.frame,
-                            text="㊗",
-                            font=("Meiryo", 12, "bold"),
-                            fg=ThemeManager.get('badge_fg', ThemeManager.get('bg')),
-                            bg=ThemeManager.get('badge_bg', bg),
-                            bd=0
-                        )
-                        # セル右上付近に微調整して配置（x/y で微オフセット）
-                        badge.place(in_=lbl, relx=1.0, rely=0.0, anchor="ne", x=-2, y=2)
-                    
-                    # --- ホバー効果（祝日バッジがあれば連動） ---
-                    self._add_hover_effect(lbl, bg, badge=badge)
-                    
-                    if day:
-                        # クリックで親側の on_date_click を呼ぶ（引数はキー文字列）
-                        lbl.bind('<Button-1>', lambda e, d=key: self.on_date_click(d))
-                        # イベントがある日は内容をツールチップで簡易表示
-                        if key in self.events:
-                            tip_text = self._make_event_summary(self.events[key])
-                            ToolTip(lbl, tip_text)
-
-    def _get_day_bg(self, day, col, key) -> str:
-        """
-        日付セルの背景色を決定。
-        優先度：空セル → イベント → 祝日 → 今日 → 日曜 → 土曜 → 通常
-        """
-        # day が 0/None のときは空セル（他月のパディング）
-        if not day:
-            return ThemeManager.get('bg')
-        # イベント日は最優先でハイライト（業務的な重要度が高いため）
-        if key in self.events:
-            return ThemeManager.get('highlight')
-        # 祝日はアクセント色で判別しやすく
-        if key in self.holidays:
-            return ThemeManager.get('accent')
-        # 今日のセルは専用色
-        if self._is_today(day):
-            return ThemeManager.get('today')
-        # 週末（col=0:日, 6:土）は背景を変える
-        if col in (0, 6):  # 土日どちらも
-            return ThemeManager.get('weekend')
-        # それ以外は通常背景
-        return ThemeManager.get('bg')
-
-    def _is_today(self, day) -> bool:
-        """指定した日付が「今日」であるかを判定"""
-        now = datetime.today()
-        return (
-            now.year == self.year and
-            now.month == self.month and
-            now.day == day
-        )
-
-    def _add_hover_effect(self, widget, orig_bg, badge=None):
-        """日付セルと㊗バッジのホバー効果"""
-        hover_bg = ThemeManager.get("hover", "#D0EBFF")
-
-        def on_enter(e):
-            widget.config(bg=hover_bg)
-            if badge:
-                badge.config(bg=hover_bg)
-
-        def on_leave(e):
-            widget.config(bg=orig_bg)
-            if badge:
-                badge.config(bg=orig_bg)
-
-        widget.bind('<Enter>', on_enter)
-        widget.bind('<Leave>', on_leave)
-
-    def _add_button_hover(self, button, orig_bg, hover_bg='#F0F0F0'):
-        """ナビゲーションボタンにホバー効果を追加"""
-        # ボタンだけは簡易的に色を切り替え（操作可能性の明示）
-        button.bind('<Enter>', lambda e: button.config(bg=hover_bg))
-        button.bind('<Leave>', lambda e: button.config(bg=orig_bg))
-        
-    def _go_to_today(self, event):
-        """年月ラベルをダブルクリック → 今月に戻る"""
-        # 呼び出し側（メイン）に移動要求を伝える特別キー
-        self.on_date_click("go_to_today")
-
-    def _make_event_summary(self, events_list) -> str:
-        """
-        ツールチップ用に、複数イベントを「時刻〜タイトル（メモ）」形式で整形
-        改行区切りで返す
-        """
-        lines = []
-        for ev in events_list:
-            times = f"{ev['start_time']}〜{ev['end_time']}"
-            line = f"{times} {ev['title']}"
-            if ev.get('memo'):
-                line += f" - {ev['memo']}"
-            lines.append(line)
-        return '\n'.join(lines)
-    
-    def update_theme(self):
-        """テーマ切り替え時に呼び出され、カレンダー全体を再描画する"""
-        # 背景色を最新テーマに合わせた上で、render() で全面再構成
-        self.frame.config(bg=ThemeManager.get('bg'))
-        self.render()  # テーマに基づき再描画（色もすべて更新される）
+# =============================================================
+# ui/calendar_view.py 
+# 目的:
+#   - 月間カレンダーの描画と操作（前月/次月、日付クリック、ツールチップ表示）
+#   - 祝日/イベント/今日の強調表示、フッターに祝日一覧を表示
+# ポイント:
+#   - 描く内容はコントローラが組み立てた MonthModel（42 セル + フッター）で受け取り、
+#     色の優先順位・今日の判定・ツールチップの整形はここでは行わない
+#   - ヘッダー等の色は ThemeManager から取得し、update_theme() で再描画
+#   - place(in_=...) を使って日付セル右上に「㊗」バッジ、左下に天気の記号を重ねて表示
+#   - after() は使わず、再描画主体（時計は別ウィジェットが担当）
+# =============================================================
+
+import tkinter as tk
+from ui.theme import COLORS, FONTS
+from services.theme_manager import ThemeManager
+from ui.tooltip import ToolTip
+
+class CalendarView:
+    """カレンダー表示用の UI コンポーネント"""
+
+    def __init__(
+        self,
+        parent,
+        model,          # MonthModel（描画する月の 42 セルとフッター）
+        on_date_click,  # 日付クリック時コールバック
+        on_prev,        # 前月ボタンコールバック
+        on_next         # 次月ボタンコールバック
+    ):
+        # 親ウィジェットと、描画対象の月の内容/コールバック群を保持
+        self.parent = parent
+        self.model = model
+        self.on_date_click = on_date_click
+        self.on_prev = on_prev
+        self.on_next = on_next
+        self.footer_frame = None
+        self.holiday_label = None
+
+        # カレンダー全体を入れるフレームを作成（背景色はテーマ依存）
+        self.frame = tk.Frame(self.parent, bg=ThemeManager.get('bg'))
+        self.frame.pack(padx=15, pady=15)
+
+        # 初回描画。以降の再描画は render() を都度呼ぶ
+        self.render()
+
+    def update(self, model):
+        """
+        外部から描画する月の内容（MonthModel）を差し替えたいときに呼ぶ。
+        再描画を行う。
+        """
+        # 受け取った内容で上書きし、描画をやり直す
+        self.model = model
+        self.render()
+    
+    def _draw_footer(self):
+        """
+        カレンダーの最下部にフッターを描画する関数。
+        左端にその月の祝日名、右端に時計を表示します。
+        """
+        # 前回のフッターがあれば破棄（再描画に備える）
+        if self.footer_frame:
+            self.footer_frame.destroy()
+
+        # footer はグリッド8行目（0始まり: ヘッダ1 + 曜日1 + 週最大6 = 8）に配置
+        self.footer_frame = tk.Frame(self.frame, bg=ThemeManager.get('header_bg'))
+        self.footer_frame.grid(row=8, column=0, columnspan=7, sticky="we", pady=(8, 0))
+
+        # 当月の祝日一覧（なければ既定文言）は MonthModel で整形済み
+        text = self.model.footer
+
+        # 左寄せのラベルとして祝日一覧を表示（wraplengthで長文を折り返し）
+        self.holiday_label = tk.Label(
+            self.footer_frame,
+            text=text,
+            font=FONTS['small_holiday'],
+            bg=ThemeManager.get('header_bg'),
+            fg=ThemeManager.get('holiday_label_fg'),
+            anchor="w",
+            justify="left",
+            wraplength=280      
+        )
+        self.holiday_label.pack(side="left", padx=(5, 0)) 
+
+    def render(self):
+        """ヘッダー／曜日ラベル／日付セルを再構築"""
+        # 一旦クリアしてから、ヘッダ→曜日→日付→フッターの順で再構成
+        self._clear()
+        self._draw_header()
+        self._draw_weekday_labels()
+        self._draw_days()
+        self._draw_footer()
+
+    def _clear(self):
+        """前回描画したウィジェットをすべて破棄"""
+        # pack/grid/place で配置した子ウィジェットを総ざらいで削除
+        for widget in self.frame.winfo_children():
+            widget.destroy()
+
+    def _draw_header(self):
+        """年・月と前後移動ボタンを表示するヘッダーを作成"""
+        header = tk.Frame(self.frame, bg=ThemeManager.get('header_bg'))
+        header.grid(row=0, column=0, columnspan=7, sticky='nsew')
+
+        # 両ボタンと中央ラベルのバランスを保つため、空き列の weight を設定
+        header.grid_columnconfigure(1, weight=1)
+        header.grid_columnconfigure(3, weight=1)
+
+        # 前月ボタン（ホバー色は _add_button_hover で設定）
+        prev_btn = tk.Button(
+            header,
+            text='＜',
+            command=self.on_prev,
+            bg=ThemeManager.get('header_bg'),
+            fg=ThemeManager.get('text'),
+            relief='flat',
+            font=FONTS['header'],
+            width=3,
+            cursor='hand2'
+        )
+        prev_btn.grid(row=0, column=0, padx=6, pady=6)
+        self._add_button_hover(prev_btn, ThemeManager.get('header_bg'))
+
+        # 年月ラベル（ダブルクリックで今月へ戻るショートカットを提供）
+        self.month_label = tk.Label(
+            header,
+            text=f"{self.model.year}年 {self.model.month}月",
+            font=FONTS['header'],
+            bg=ThemeManager.get('header_bg'),
+            fg=ThemeManager.get('text'),
+            padx=12,
+            pady=6
+        )
+        self.month_label.grid(row=0, column=2, padx=6, pady=6)
+        
+        # ダブルクリックイベントをバインド
+        self.month_label.bind("<Double-1>", self._go_to_today)
+
+        # 次月ボタン
+        next_btn = tk.Button(
+            header,
+            text='＞',
+            command=self.on_next,
+            bg=ThemeManager.get('header_bg'),
+            fg=ThemeManager.get('text'),
+            relief='flat',
+            font=FONTS['header'],
+            width=3,
+            cursor='hand2'
+        )
+        next_btn.grid(row=0, column=4, padx=6, pady=6)
+        self._add_button_hover(next_btn, ThemeManager.get('header_bg'))
+
+    def _draw_weekday_labels(self):
+        """日～土の曜日ラベルを表示"""
+        days = ['日', '月', '火', '水', '木', '金', '土']
+        for idx, wd in enumerate(days):
+            # 週末（日/土）は少し色を変えて視認性を上げる
+            fg = ThemeManager.get('text')
+            if wd in ('日', '土'):
+                fg = '#9D5C64'  
+
+            tk.Label(
+                self.frame,
+                text=wd,
+                font=FONTS['base'],
+                bg=ThemeManager.get('header_bg'),
+                fg=fg,
+                width=6,
+                pady=4
+            ).grid(row=1, column=idx, padx=1, pady=4)
+
+    def _draw_days(self):
+        """各日付セルを MonthModel のとおりに描く（色・バッジ・記号・ツールチップは解決済み）"""
+        model = self.model
+        for index, cell in enumerate(model.cells[:model.weeks * 7]):
+            row_index, col_index = divmod(index, 7)
+            row_index += 2
+            lbl = tk.Label(
+                self.frame,
+                text=str(cell.day) if cell.day else '',
+                font=FONTS['base'],
+                bg=cell.bg,
+                fg=cell.fg,
+                width=6,
+                height=2,
+                bd=1,
+                padx=2,  # 左右の余白を増やす
+                pady=2,  # 上下の余白を減らす
+                relief='ridge'
+            )
+            lbl.grid(row=row_index, column=col_index, padx=1, pady=1)
+
+            # 祝日セルに㊗マークの小バッジを右上に重ねて表示（place + in_）
+            badge = None
+            if cell.holiday:
+                badge = tk.Label(
+                    self.frame,
+                    text="㊗",
+                    font=("Meiryo", 12, "bold"),
+                    fg=model.badge_fg,
+                    bg=cell.badge_bg,
+                    bd=0
+                )
+                # セル右上付近に微調整して配置（x/y で微オフセット）
+                badge.place(in_=lbl, relx=1.0, rely=0.0, anchor="ne", x=-2, y=2)
+
+            # 予報のある日はセル左下に天気の記号を重ねる
+            glyph = None
+            if cell.glyph:
+                glyph = tk.Label(
+                    self.frame,
+                    text=cell.glyph,
+                    font=FONTS['forecast_glyph'],
+                    fg=model.glyph_fg,
+                    bg=cell.bg,
+                    bd=0
+                )
+                glyph.place(in_=lbl, relx=0.0, rely=1.0, anchor="sw", x=2, y=-2)
+
+            # --- ホバー効果（祝日バッジ・天気の記号があれば連動） ---
+            self._add_hover_effect(lbl, cell.bg, badge=badge, glyph=glyph)
+
+            if cell.day:
+                # クリックで親側の on_date_click を呼ぶ（引数はキー文字列）
+                lbl.bind('<Button-1>', lambda e, d=cell.key: self.on_date_click(d))
+                if glyph:
+                    glyph.bind('<Button-1>', lambda e, d=cell.key: self.on_date_click(d))
+                # イベントがある日は内容を、予報のある日は天気をツールチップで簡易表示
+                if cell.tooltip:
+                    ToolTip(lbl, cell.tooltip)
+
+    def _add_hover_effect(self, widget, orig_bg, badge=None, glyph=None):
+        """日付セルと㊗バッジ・天気の記号のホバー効果"""
+        hover_bg = ThemeManager.get("hover", "#D0EBFF")
+
+        def on_enter(e):
+            widget.config(bg=hover_bg)
+            if badge:
+                badge.config(bg=hover_bg)
+            if glyph:
+                glyph.config(bg=hover_bg)
+
+        def on_leave(e):
+            widget.config(bg=orig_bg)
+            if badge:
+                badge.config(bg=orig_bg)
+            if glyph:
+                glyph.config(bg=orig_bg)
+
+        widget.bind('<Enter>', on_enter)
+        widget.bind('<Leave>', on_leave)
+
+    def _add_button_hover(self, button, orig_bg, hover_bg='#F0F0F0'):
+        """ナビゲーションボタンにホバー効果を追加"""
+        # ボタンだけは簡易的に色を切り替え（操作可能性の明示）
+        button.bind('<Enter>', lambda e: button.config(bg=hover_bg))
+        button.bind('<Leave>', lambda e: button.config(bg=orig_bg))
+        
+    def _go_to_today(self, event):
+        """年月ラベルをダブルクリック → 今月に戻る"""
+        # 呼び出し側（メイン）に移動要求を伝える特別キー
+        self.on_date_click("go_to_today")
+
+    def update_theme(self, model):
+        """
+        テーマ切り替え時に呼び出され、カレンダー全体を再描画する。
+        日付セルの色は MonthModel で解決済みなので、新しいテーマで組み立て直した model を受け取る。
+        """
+        # 背景色を最新テーマに合わせた上で、render() で全面再構成
+        self.frame.config(bg=ThemeManager.get('bg'))
+        self.model = model
+        self.render()  # テーマに基づき再描画（色もすべて更新される）
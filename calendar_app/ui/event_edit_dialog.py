@@ -1,246 +1,353 @@
-# ui/event_edit_dialog.py
-
-import tkinter as tk
-import sys
-import os
-from tkinter import ttk, messagebox
-from ui.theme import COLORS, FONTS, TITLE_CHOICES, TIME_CHOICES
-from services.theme_manager import ThemeManager
-from utils.resource import resource_path
-
-class EditDialog(tk.Toplevel):
-    """予定の追加・編集用ダイアログウィンドウ"""
-
-    def __init__(
-        self, parent, title,
-        default_title="", default_start_time="",
-        default_end_time="", default_content=""
-    ):
-        super().__init__(parent)
-        # ダイアログから返す結果（OK 押下時にタプルで設定）
-        self.result = None
-        self.parent = parent
-        self.withdraw()
-        self.title(title)
-        # アイコンを resource_path 経由で読み込み
-        self.iconbitmap(resource_path("ui/icons/event_icon.ico"))
-        self.configure(bg=COLORS["dialog_bg"])
-        self.resizable(False, False)
-
-        # 初期値を StringVar にセット
-        self.title_var   = tk.StringVar(value=default_title)
-        self.start_var   = tk.StringVar(value=default_start_time)
-        self.end_var     = tk.StringVar(value=default_end_time)
-        self.content_var = tk.StringVar(value=default_content)
-        
-        self._place_relative_to_parent(width=300, height=270)
-        
-        # UI 構築
-        self._build_ui()
-
-        # モーダル設定：親の上に表示 & 他操作をブロック
-        self.transient(parent)
-        self.grab_set()
-
-        # 初期フォーカス
-        self.ent_title.focus_set()
-        # UI 完成後に表示
-        self.deiconify()
-        
-        # ★ EnterキーでOKボタンが押せるように
-        self.bind('<Return>', lambda e: self.on_ok())
-        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
-
-    def _place_relative_to_parent(self, width, height):
-        self.update_idletasks()
-        self.parent.update_idletasks()
-
-        px = self.parent.winfo_rootx()
-        py = self.parent.winfo_rooty()
-        pw = self.parent.winfo_width()
-        ph = self.parent.winfo_height()
-
-        x = px + (pw - width) // 2
-        y = py + (ph - height) // 3
-
-        self.geometry(f"{width}x{height}+{x}+{y}")
-
-    def _build_ui(self):
-        """ダイアログ内のフレームと各入力セクションを配置"""
-        pad = 8
-        frame = tk.Frame(self, bg=COLORS["dialog_bg"])
-        frame.pack(fill="both", expand=True, padx=pad, pady=pad)
-
-        # 各セクション
-        self._create_title_section(frame)
-        self._create_time_section(frame)
-        self._create_content_section(frame)
-        self._create_button_section()
-
-        # Esc キーで閉じる
-        self.bind("<Escape>", lambda e: self.destroy())
-        
-
-    def _create_title_section(self, parent):
-        """タイトル入力用のラベル+Combobox"""
-        tk.Label(
-            parent,
-            text="予定のタイトル（必須）：",
-            font=FONTS["small"],
-            bg=COLORS["dialog_bg"],
-            fg=ThemeManager.get("text")
-        ).pack(anchor="w", pady=(0, 2))
-
-        self.ent_title = ttk.Combobox(
-            parent,
-            textvariable=self.title_var,
-            values=TITLE_CHOICES,
-            font=FONTS["small"],
-            state="normal",   # 自由入力＋候補あり
-            takefocus=True
-        )
-        self.ent_title.pack(fill="x", pady=(0, 8))
-
-    def _create_time_section(self, parent):
-        """開始・終了時間入力用のラベル＋Combobox（2つ並べる）"""
-        for label_text, var in [("開始時間：", self.start_var), ("終了時間：", self.end_var)]:
-            tk.Label(
-                parent,
-                text=label_text,
-                font=FONTS["small"],
-                bg=COLORS["dialog_bg"],
-                fg=ThemeManager.get("text")
-            ).pack(anchor="w", pady=(0, 2))
-
-            ttk.Combobox(
-                parent,
-                textvariable=var,
-                values=TIME_CHOICES,
-                font=FONTS["small"],
-                state="normal",
-                takefocus=True
-            ).pack(fill="x", pady=(0, 8))
-
-    def _create_content_section(self, parent):
-        """メモ用の Entry とプレースホルダー機能"""
-        tk.Label(
-            parent,
-            text="内容：",
-            font=FONTS["small"],
-            bg=COLORS["dialog_bg"],
-            fg=ThemeManager.get("text")
-        ).pack(anchor="w", pady=(0, 2))
-
-        self.ent_content = tk.Entry(
-            parent,
-            textvariable=self.content_var,
-            font=FONTS["small"],
-            relief="groove",
-            takefocus=True,
-            bg="#FAFAFA",  # 薄い背景
-            fg="#888888"   # 初期文字色グレー
-        )
-        self.ent_content.pack(fill="x", pady=(0, 8))
-
-        # プレースホルダー挿入
-        self._add_placeholder(self.ent_content, "メモを入力")
-
-    def _create_button_section(self, parent=None):
-        """OK / キャンセル ボタン配置"""
-        pad = 8
-        btn_frame = tk.Frame(self, bg=COLORS["dialog_bg"])
-        btn_frame.pack(fill="x", padx=pad, pady=(0, pad))
-
-        # OK ボタン（アクセントカラー：today）
-        ok_btn = tk.Button(
-            btn_frame,
-            text="    OK    ",
-            command=self.on_ok,
-            font=FONTS["base_minus"],
-            bg=COLORS["today"],
-            fg=ThemeManager.get("text"),
-            activebackground=COLORS["today"],
-            relief="flat",
-            padx=14, pady=4,
-            cursor="hand2"
-        )
-        ok_btn.pack(side="left", anchor="w")
-        self.add_button_hover(ok_btn, original_bg=COLORS["today"])
-
-        # キャンセル ボタン（目立つ赤系）
-        cancel_btn = tk.Button(
-            btn_frame,
-            text="キャンセル",
-            command=self.on_cancel,
-            font=FONTS["base_minus"],
-            bg="#F7C6C7",
-            fg=ThemeManager.get("text"),
-            activebackground="#F4B6B7",
-            relief="flat",
-            padx=11, pady=4,
-            cursor="hand2"
-        )
-        cancel_btn.pack(side="right", anchor="e")
-        self.add_button_hover(cancel_btn, original_bg="#F7C6C7")
-
-    def _add_placeholder(self, widget, placeholder):
-        """Entry に簡易プレースホルダー機能を追加"""
-        def on_focus_in(event):
-            if widget.get() == placeholder:
-                widget.delete(0, tk.END)
-                widget.config(fg=ThemeManager.get("text"))
-        def on_focus_out(event):
-            if not widget.get():
-                widget.insert(0, placeholder)
-                widget.config(fg="#888888")
-
-        # 初期状態で placeholder を挿入
-        if not widget.get():
-            widget.insert(0, placeholder)
-
-        widget.bind("<FocusIn>", on_focus_in)
-        widget.bind("<FocusOut>", on_focus_out)
-
-    def on_ok(self):
-        """OK 押下で StringVar から値を回収し、result に格納 → ウィンドウを閉じる"""
-        title = self.title_var.get().strip()
-        start = self.start_var.get().strip()
-        end   = self.end_var.get().strip()
-        
-        # ★ 1. タイトル必須チェック
-        if not title:
-            messagebox.showwarning("タイトル未入力", "予定タイトルを選択または入力してください。")
-            self.ent_title.focus_set()
-            return
-
-        # 2. 開始・終了時刻が両方入っているときだけ前後チェック
-        if start and end:
-            if start > end:
-                messagebox.showwarning(
-                    "時間設定エラー",
-                    "終了時刻は開始時刻より後に設定してください。"
-                )
-                return
-
-        # 必須なのはタイトルだけ
-        self.result = (
-            title,
-            start,   # 空文字可
-            end,     # 空文字可
-            self.content_var.get()
-        )
-        self.destroy()
-        
-    def on_cancel(self):
-        """キャンセル押下で result を None に設定 → ウィンドウを閉じる"""
-        self.result = None
-        self.destroy()
-
-    def add_button_hover(self, button, original_bg, hover_bg=None):
-        """ボタンにホバー時の背景色変化を追加"""
-        if hover_bg is None:
-            hover_bg = COLORS["button_hover"]
-
-        button.bind("<Enter>", lambda e: button.config(bg=hover_bg))
-        button.bind("<Leave>", lambda e: button.config(bg=original_bg))
-
+# ui/event_edit_dialog.py
+
+import tkinter as tk
+import sys
+import os
+from tkinter import ttk, messagebox
+from ui.theme import COLORS, FONTS, TITLE_CHOICES, TIME_CHOICES
+from services.theme_manager import ThemeManager
+from utils.resource import resource_path
+from utils.calendar_utils import time_to_minutes
+from datetime import date
+
+# 繰り返しの選択肢（表示名 → (freq, monthly)）
+REPEAT_CHOICES = {
+    "なし":             (None, None),
+    "毎日":             ("daily", None),
+    "毎週":             ("weekly", None),
+    "毎月（同じ日付）":   ("monthly", "day"),
+    "毎月（第n ○曜日）": ("monthly", "nth_weekday"),
+    "毎年":             ("yearly", None),
+}
+
+class EditDialog(tk.Toplevel):
+    """予定の追加・編集用ダイアログウィンドウ"""
+
+    def __init__(
+        self, parent, title,
+        default_title="", default_start_time="",
+        default_end_time="", default_content="",
+        conflict_checker=None, default_recurrence=None
+    ):
+        super().__init__(parent)
+        # ダイアログから返す結果（OK 押下時にタプルで設定）
+        self.result = None
+        self.parent = parent
+        # 時間帯が重なる予定を返す関数 (start, end) -> list[dict]（任意）
+        self.conflict_checker = conflict_checker
+        self.withdraw()
+        self.title(title)
+        # アイコンを resource_path 経由で読み込み
+        self.iconbitmap(resource_path("ui/icons/event_icon.ico"))
+        self.configure(bg=COLORS["dialog_bg"])
+        self.resizable(False, False)
+
+        # 初期値を StringVar にセット
+        self.title_var   = tk.StringVar(value=default_title)
+        self.start_var   = tk.StringVar(value=default_start_time)
+        self.end_var     = tk.StringVar(value=default_end_time)
+        self.content_var = tk.StringVar(value=default_content)
+        # 繰り返し規則（編集時は除外日などを引き継ぐため元の規則を保持）
+        self.default_recurrence = default_recurrence or {}
+        self.repeat_var = tk.StringVar(value=self._repeat_label(self.default_recurrence))
+        self.until_var = tk.StringVar(value=self.default_recurrence.get("until", ""))
+        
+        self._place_relative_to_parent(width=300, height=370)
+        
+        # UI 構築
+        self._build_ui()
+
+        # モーダル設定：親の上に表示 & 他操作をブロック
+        self.transient(parent)
+        self.grab_set()
+
+        # 初期フォーカス
+        self.ent_title.focus_set()
+        # UI 完成後に表示
+        self.deiconify()
+        
+        # ★ EnterキーでOKボタンが押せるように
+        self.bind('<Return>', lambda e: self.on_ok())
+        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
+
+    def _place_relative_to_parent(self, width, height):
+        self.update_idletasks()
+        self.parent.update_idletasks()
+
+        px = self.parent.winfo_rootx()
+        py = self.parent.winfo_rooty()
+        pw = self.parent.winfo_width()
+        ph = self.parent.winfo_height()
+
+        x = px + (pw - width) // 2
+        y = py + (ph - height) // 3
+
+        self.geometry(f"{width}x{height}+{x}+{y}")
+
+    def _build_ui(self):
+        """ダイアログ内のフレームと各入力セクションを配置"""
+        pad = 8
+        frame = tk.Frame(self, bg=COLORS["dialog_bg"])
+        frame.pack(fill="both", expand=True, padx=pad, pady=pad)
+
+        # 各セクション
+        self._create_title_section(frame)
+        self._create_time_section(frame)
+        self._create_content_section(frame)
+        self._create_repeat_section(frame)
+        self._create_button_section()
+
+        # Esc キーで閉じる
+        self.bind("<Escape>", lambda e: self.destroy())
+        
+
+    def _create_title_section(self, parent):
+        """タイトル入力用のラベル+Combobox"""
+        tk.Label(
+            parent,
+            text="予定のタイトル（必須）：",
+            font=FONTS["small"],
+            bg=COLORS["dialog_bg"],
+            fg=ThemeManager.get("text")
+        ).pack(anchor="w", pady=(0, 2))
+
+        self.ent_title = ttk.Combobox(
+            parent,
+            textvariable=self.title_var,
+            values=TITLE_CHOICES,
+            font=FONTS["small"],
+            state="normal",   # 自由入力＋候補あり
+            takefocus=True
+        )
+        self.ent_title.pack(fill="x", pady=(0, 8))
+
+    def _create_time_section(self, parent):
+        """開始・終了時間入力用のラベル＋Combobox（2つ並べる）"""
+        for label_text, var in [("開始時間：", self.start_var), ("終了時間：", self.end_var)]:
+            tk.Label(
+                parent,
+                text=label_text,
+                font=FONTS["small"],
+                bg=COLORS["dialog_bg"],
+                fg=ThemeManager.get("text")
+            ).pack(anchor="w", pady=(0, 2))
+
+            ttk.Combobox(
+                parent,
+                textvariable=var,
+                values=TIME_CHOICES,
+                font=FONTS["small"],
+                state="normal",
+                takefocus=True
+            ).pack(fill="x", pady=(0, 8))
+
+    def _create_content_section(self, parent):
+        """メモ用の Entry とプレースホルダー機能"""
+        tk.Label(
+            parent,
+            text="内容：",
+            font=FONTS["small"],
+            bg=COLORS["dialog_bg"],
+            fg=ThemeManager.get("text")
+        ).pack(anchor="w", pady=(0, 2))
+
+        self.ent_content = tk.Entry(
+            parent,
+            textvariable=self.content_var,
+            font=FONTS["small"],
+            relief="groove",
+            takefocus=True,
+            bg="#FAFAFA",  # 薄い背景
+            fg="#888888"   # 初期文字色グレー
+        )
+        self.ent_content.pack(fill="x", pady=(0, 8))
+
+        # プレースホルダー挿入
+        self._add_placeholder(self.ent_content, "メモを入力")
+
+    def _create_repeat_section(self, parent):
+        """繰り返し（なし/毎日/毎週/毎月/毎年）と終了日の入力欄"""
+        tk.Label(
+            parent,
+            text="繰り返し：",
+            font=FONTS["small"],
+            bg=COLORS["dialog_bg"],
+            fg=ThemeManager.get("text")
+        ).pack(anchor="w", pady=(0, 2))
+
+        row = tk.Frame(parent, bg=COLORS["dialog_bg"])
+        row.pack(fill="x", pady=(0, 8))
+        ttk.Combobox(
+            row,
+            textvariable=self.repeat_var,
+            values=list(REPEAT_CHOICES),
+            font=FONTS["small"],
+            state="readonly",
+            width=16
+        ).pack(side="left")
+        tk.Label(
+            row,
+            text=" 終了日：",
+            font=FONTS["small"],
+            bg=COLORS["dialog_bg"],
+            fg=ThemeManager.get("text")
+        ).pack(side="left")
+        tk.Entry(
+            row,
+            textvariable=self.until_var,
+            font=FONTS["small"],
+            relief="groove",
+            width=11
+        ).pack(side="left", fill="x", expand=True)
+
+    @staticmethod
+    def _repeat_label(rule: dict) -> str:
+        """繰り返し規則に対応する選択肢の表示名"""
+        for label, (freq, monthly) in REPEAT_CHOICES.items():
+            if rule.get("freq") == freq and (freq != "monthly" or rule.get("monthly", "day") == monthly):
+                return label
+        return "なし"
+
+    def _build_recurrence(self) -> dict | None:
+        """入力内容から繰り返し規則を作る（同じ種類のままなら除外日などを引き継ぐ）"""
+        freq, monthly = REPEAT_CHOICES.get(self.repeat_var.get(), (None, None))
+        if freq is None:
+            return None
+        rule = {"freq": freq}
+        if self._repeat_label(self.default_recurrence) == self.repeat_var.get():
+            rule = dict(self.default_recurrence)
+        if monthly:
+            rule["monthly"] = monthly
+        rule["until"] = self.until_var.get().strip()
+        return rule
+
+    def _create_button_section(self, parent=None):
+        """OK / キャンセル ボタン配置"""
+        pad = 8
+        btn_frame = tk.Frame(self, bg=COLORS["dialog_bg"])
+        btn_frame.pack(fill="x", padx=pad, pady=(0, pad))
+
+        # OK ボタン（アクセントカラー：today）
+        ok_btn = tk.Button(
+            btn_frame,
+            text="    OK    ",
+            command=self.on_ok,
+            font=FONTS["base_minus"],
+            bg=COLORS["today"],
+            fg=ThemeManager.get("text"),
+            activebackground=COLORS["today"],
+            relief="flat",
+            padx=14, pady=4,
+            cursor="hand2"
+        )
+        ok_btn.pack(side="left", anchor="w")
+        self.add_button_hover(ok_btn, original_bg=COLORS["today"])
+
+        # キャンセル ボタン（目立つ赤系）
+        cancel_btn = tk.Button(
+            btn_frame,
+            text="キャンセル",
+            command=self.on_cancel,
+            font=FONTS["base_minus"],
+            bg="#F7C6C7",
+            fg=ThemeManager.get("text"),
+            activebackground="#F4B6B7",
+            relief="flat",
+            padx=11, pady=4,
+            cursor="hand2"
+        )
+        cancel_btn.pack(side="right", anchor="e")
+        self.add_button_hover(cancel_btn, original_bg="#F7C6C7")
+
+    def _add_placeholder(self, widget, placeholder):
+        """Entry に簡易プレースホルダー機能を追加"""
+        def on_focus_in(event):
+            if widget.get() == placeholder:
+                widget.delete(0, tk.END)
+                widget.config(fg=ThemeManager.get("text"))
+        def on_focus_out(event):
+            if not widget.get():
+                widget.insert(0, placeholder)
+                widget.config(fg="#888888")
+
+        # 初期状態で placeholder を挿入
+        if not widget.get():
+            widget.insert(0, placeholder)
+
+        widget.bind("<FocusIn>", on_focus_in)
+        widget.bind("<FocusOut>", on_focus_out)
+
+    def on_ok(self):
+        """OK 押下で StringVar から値を回収し、result に格納 → ウィンドウを閉じる"""
+        title = self.title_var.get().strip()
+        start = self.start_var.get().strip()
+        end   = self.end_var.get().strip()
+        
+        # ★ 1. タイトル必須チェック
+        if not title:
+            messagebox.showwarning("タイトル未入力", "予定タイトルを選択または入力してください。")
+            self.ent_title.focus_set()
+            return
+
+        # 2. 開始・終了時刻が両方入っているときだけ前後チェック
+        #    （"9:00" と "10:00" のような桁違いも正しく比べるため分に直して比較）
+        start_min = time_to_minutes(start)
+        end_min = time_to_minutes(end)
+        if (start and start_min is None) or (end and end_min is None):
+            # "9:75" や "25:00" のような範囲外の時刻は保存しない
+            messagebox.showwarning("時間設定エラー", "時刻は 0:00〜23:59 の「時:分」で入力してください。")
+            return
+        if start_min is not None and end_min is not None:
+            if start_min > end_min:
+                messagebox.showwarning(
+                    "時間設定エラー",
+                    "終了時刻は開始時刻より後に設定してください。"
+                )
+                return
+
+        # 3. 繰り返しの終了日は YYYY-MM-DD 形式のみ
+        until = self.until_var.get().strip()
+        if until:
+            try:
+                date.fromisoformat(until)
+            except ValueError:
+                messagebox.showwarning("終了日エラー", "終了日は YYYY-MM-DD 形式で入力してください。")
+                return
+
+        # 4. 同じ日の他の予定と時間帯が重なっていれば確認する
+        if self.conflict_checker and start_min is not None:
+            conflicts = self.conflict_checker(start, end)
+            if conflicts:
+                lines = "\n".join(
+                    f"・{ev['start_time']}〜{ev['end_time']} {ev['title']}" for ev in conflicts[:5]
+                )
+                if not messagebox.askyesno(
+                    "予定の重複",
+                    f"次の予定と時間帯が重なっています。\n{lines}\n\nこのまま保存しますか？",
+                    parent=self
+                ):
+                    return
+
+        # 必須なのはタイトルだけ
+        self.result = (
+            title,
+            start,   # 空文字可
+            end,     # 空文字可
+            self.content_var.get(),
+            self._build_recurrence()  # 繰り返しなしなら None
+        )
+        self.destroy()
+        
+    def on_cancel(self):
+        """キャンセル押下で result を None に設定 → ウィンドウを閉じる"""
+        self.result = None
+        self.destroy()
+
+    def add_button_hover(self, button, original_bg, hover_bg=None):
+        """ボタンにホバー時の背景色変化を追加"""
+        if hover_bg is None:
+            hover_bg = COLORS["button_hover"]
+
+        button.bind("<Enter>", lambda e: button.config(bg=hover_bg))
+        button.bind("<Leave>", lambda e: button.config(bg=original_bg))
+
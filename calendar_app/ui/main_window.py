@@ -1,137 +1,280 @@
-# =============================================================
-# ui/main_window.py 
-# 目的:
-#   - アプリケーションのエントリとなるメインウィンドウを構築
-#   - カレンダー本体（CalendarView）とステータスバー（StatusBarWidget）を配置
-#   - コントローラ（CalendarController）と連携して月移動・イベント編集・テーマ切替
-# ポイント:
-#   - Tkの起動時は一旦 withdraw() → UI準備 → after(0, deiconify) でチラつき低減
-#   - resource_path() で実行形態（PyInstaller等）に依存しないアイコン解決
-#   - ThemeManager から背景色を取得し、テーマ切替時は update_theme() を呼び出し
-# =============================================================
-
-import tkinter as tk
-from datetime import datetime
-import os
-
-from controllers.calendar_controller import CalendarController
-from ui.calendar_view import CalendarView
-from ui.status_bar_widget import StatusBarWidget
-from ui.theme import COLORS
-from ui.event_dialog import EventDialog
-from services.theme_manager import ThemeManager
-from utils.resource import resource_path
-from PIL import Image, ImageTk
-
-
-class MainWindow:
-    """アプリケーションのメインウィンドウを構成するクラス"""
-
-    def __init__(self):
-        # Tkインスタンス生成。初期表示は隠しておき、レイアウト完了後に表示する
-        self.root = tk.Tk()
-        self.root.withdraw()
-        self.root.title("Desktop Calendar")
-
-        # タスクバーやウィンドウ左上に表示するアプリアイコンを設定
-        ico_path = resource_path("ui/icons/event_icon.ico")
-        if os.path.exists(ico_path):
-            self.root.iconbitmap(ico_path)
-
-        # 初期テーマの背景色を反映
-        self.root.configure(bg=ThemeManager.get("header_bg"))
-        self.root.resizable(True, True)          # ウィンドウのリサイズを許可
-        self.root.attributes("-topmost", False) # 常に最前面にはしない
-
-        # 画面中央付近（やや右上）に配置
-        self._configure_window_position()
-
-        # コントローラ（年月・祝日・イベント・天気の取得/更新を担う）
-        self.controller = CalendarController()
-
-        # 画面部品の構築（カレンダー本体とステータスバー）
-        self._setup_ui()
-
-        # レイアウト完了後にウィンドウを表示（チラつき抑制）
-        self.root.after(0, self.root.deiconify)
-
-    def _configure_window_position(self):
-        # スクリーンサイズを取得し、ウィンドウの初期配置を計算
-        sw = self.root.winfo_screenwidth()
-        sh = self.root.winfo_screenheight()
-        ww, wh = 560, 500
-        # 画面中央からオフセット（+100, -80）した位置に出す
-        x = (sw - ww)//2 + 100
-        y = (sh - wh)//2 - 80
-        self.root.geometry(f"{ww}x{wh}+{x}+{y}")
-
-    def _setup_ui(self):
-        # カレンダー本体を生成（クリック/前月/次月のコールバックはこのMainWindowのメソッド）
-        self.calendar_view = CalendarView(
-            self.root,
-            self.controller.current_year,
-            self.controller.current_month,
-            self.controller.holidays,
-            self.controller.events,
-            on_date_click=self.open_event_dialog,
-            on_prev=self.on_prev_month,
-            on_next=self.on_next_month
-        )
-
-        # 画面下部にステータスバー（時計・天気・フラッシュメッセージ）をまとめる枠
-        bottom_frame = tk.Frame(self.root, bg=ThemeManager.get('header_bg'))
-        bottom_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
-
-        # 統合ウィジェット（テーマ切替は時計ボタン経由 → toggle_theme を呼ぶ）
-        self.status_bar = StatusBarWidget(bottom_frame, on_theme_toggle=self.toggle_theme)
-
-        # 初期の天気を表示（都度 controller から取得）
-        self.status_bar.update_weather(self.controller.get_weather_info())
-
-    def on_prev_month(self):
-        # コントローラ側で年月を前月へ更新し、画面に反映
-        self.controller.prev_month()
-        self._refresh_calendar()
-
-    def on_next_month(self):
-        # コントローラ側で年月を次月へ更新し、画面に反映
-        self.controller.next_month()
-        self._refresh_calendar()
-
-    def _refresh_calendar(self):
-        # カレンダーへ最新の年月/祝日/イベントを流し込み、再描画
-        self.calendar_view.update(
-            self.controller.current_year,
-            self.controller.current_month,
-            self.controller.holidays,
-            self.controller.events
-        )
-        # 天気も最新情報に更新
-        self.status_bar.update_weather(self.controller.get_weather_info())
-
-    def open_event_dialog(self, date_key):
-        # 年月ラベルのダブルクリックによる特殊操作（"go_to_today"）に対応
-        if date_key == "go_to_today":
-            self.controller.go_to_today()
-            self._refresh_calendar()
-            return
-
-        # それ以外はイベント編集ダイアログを開く
-        try:
-            from ui.event_dialog import EventDialog
-            EventDialog(self.root, date_key, self.controller.events, self._refresh_calendar)
-        except Exception as e:
-            print(f"[ERROR] イベントダイアログでエラー発生: {e}")
-
-    def toggle_theme(self):
-        # テーマをトグル（ダーク↔ライト等）し、各UIに反映
-        ThemeManager.toggle_theme()
-        self.root.configure(bg=ThemeManager.get("header_bg"))
-        # カレンダーUIのテーマ更新のみ（データ更新は行わない）
-        self.calendar_view.update_theme()
-        # ステータスバー（時計・天気）のテーマ更新
-        self.status_bar.update_theme()
-
-    def run(self):
-        # Tk のメインループに入る
-        self.root.mainloop()
+# =============================================================
+# ui/main_window.py 
+# 目的:
+#   - アプリケーションのエントリとなるメインウィンドウを構築
+#   - カレンダー本体（CalendarView）とステータスバー（StatusBarWidget）を配置
+#   - コントローラ（CalendarController）と連携して月移動・イベント編集・テーマ切替
+# ポイント:
+#   - Tkの起動時は一旦 withdraw() → UI準備 → after(0, deiconify) でチラつき低減
+#   - resource_path() で実行形態（PyInstaller等）に依存しないアイコン解決
+#   - ThemeManager から背景色を取得し、テーマ切替時は update_theme() を呼び出し
+# =============================================================
+
+import tkinter as tk
+from tkinter import filedialog
+from datetime import datetime
+import os
+import sys
+
+from controllers.calendar_controller import CalendarController
+from ui.calendar_view import CalendarView
+from ui.status_bar_widget import StatusBarWidget
+from ui.theme import COLORS
+from ui.event_dialog import EventDialog
+from ui.search_box import SearchBox
+from services.theme_manager import ThemeManager
+from services.event_manager import flush as flush_events, writer_stats
+from services import http_client
+from utils.resource import resource_path
+from PIL import Image, ImageTk
+
+# 保存ファイルの外部変更を確認する間隔（ミリ秒）。0 で監視しない
+WATCH_INTERVAL_MS = int(os.environ.get("CALENDAR_APP_WATCH_MS", "2000"))
+
+# 裏で取得した祝日を受け取りに行く間隔（ミリ秒）
+HOLIDAY_POLL_MS = 250
+# 裏で取り直した天気の受け取りと、古くなった天気の取り直しを確かめる間隔（ミリ秒）
+WEATHER_POLL_MS = 1000
+# 複数の地域の天気を順に切り替えて表示する間隔（ミリ秒）
+WEATHER_ROTATE_MS = 8000
+
+
+class MainWindow:
+    """アプリケーションのメインウィンドウを構成するクラス"""
+
+    def __init__(self):
+        # Tkインスタンス生成。初期表示は隠しておき、レイアウト完了後に表示する
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.root.title("Desktop Calendar")
+        # 閉じる前に保存待ちの予定を書き出す
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # タスクバーやウィンドウ左上に表示するアプリアイコンを設定
+        ico_path = resource_path("ui/icons/event_icon.ico")
+        if os.path.exists(ico_path):
+            self.root.iconbitmap(ico_path)
+
+        # 初期テーマの背景色を反映
+        self.root.configure(bg=ThemeManager.get("header_bg"))
+        self.root.resizable(True, True)          # ウィンドウのリサイズを許可
+        self.root.attributes("-topmost", False) # 常に最前面にはしない
+
+        # 画面中央付近（やや右上）に配置
+        self._configure_window_position()
+
+        # コントローラ（年月・祝日・イベント・天気の取得/更新を担う）
+        self.controller = CalendarController()
+
+        # 画面部品の構築（カレンダー本体とステータスバー）
+        self._setup_ui()
+
+        # レイアウト完了後にウィンドウを表示（チラつき抑制）
+        self.root.after(0, self.root.deiconify)
+        # 表示し終えて手が空いたら、前後の月の描画内容を組み立てておく
+        self.root.after_idle(self.controller.prefetch_adjacent_months)
+
+        # Ctrl+I / Ctrl+E で .ics ファイルの取り込み・書き出し
+        self.root.bind("<Control-i>", lambda e: self.import_ics())
+        self.root.bind("<Control-e>", lambda e: self.export_ics())
+
+        # 他のプロセスや同期ツールによる予定ファイルの変更を定期的に確認
+        if WATCH_INTERVAL_MS > 0:
+            self.root.after(WATCH_INTERVAL_MS, self._watch_events)
+
+        # 祝日の取得はネットワークを待たずに裏で行い、届いたら㊗を描き直す
+        self.root.after(HOLIDAY_POLL_MS, self._poll_holidays)
+
+        # 天気も裏で取り直し、届いたらステータスバーだけを更新
+        self.root.after(WEATHER_POLL_MS, self._poll_weather)
+        self.root.after(WEATHER_ROTATE_MS, self._rotate_weather)
+
+    def _configure_window_position(self):
+        # スクリーンサイズを取得し、ウィンドウの初期配置を計算
+        sw = self.root.winfo_screenwidth()
+        sh = self.root.winfo_screenheight()
+        ww, wh = 560, 530
+        # 画面中央からオフセット（+100, -80）した位置に出す
+        x = (sw - ww)//2 + 100
+        y = (sh - wh)//2 - 80
+        self.root.geometry(f"{ww}x{wh}+{x}+{y}")
+
+    def _setup_ui(self):
+        # 画面上部に予定の検索ボックス（入力のたびに検索し、選ぶとその日へ移動）
+        self.search_box = SearchBox(
+            self.root,
+            on_search=self.controller.search_events,
+            on_select=self.on_search_select
+        )
+
+        # カレンダー本体を生成（クリック/前月/次月のコールバックはこのMainWindowのメソッド）
+        self.calendar_view = CalendarView(
+            self.root,
+            self.controller.get_month_model(),
+            on_date_click=self.open_event_dialog,
+            on_prev=self.on_prev_month,
+            on_next=self.on_next_month
+        )
+
+        # 画面下部にステータスバー（時計・天気・フラッシュメッセージ）をまとめる枠
+        bottom_frame = tk.Frame(self.root, bg=ThemeManager.get('header_bg'))
+        bottom_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+
+        # 統合ウィジェット（テーマ切替は時計ボタン経由 → toggle_theme を呼ぶ）
+        self.status_bar = StatusBarWidget(bottom_frame, on_theme_toggle=self.toggle_theme)
+
+        # 初期の天気を表示（都度 controller から取得）
+        self.status_bar.update_weather(self.controller.get_weather_info())
+
+    def on_prev_month(self):
+        # コントローラ側で年月を前月へ更新し、画面に反映
+        self.controller.prev_month()
+        self._refresh_calendar()
+
+    def on_next_month(self):
+        # コントローラ側で年月を次月へ更新し、画面に反映
+        self.controller.next_month()
+        self._refresh_calendar()
+
+    def on_search_select(self, date_key):
+        # 検索結果の日付を含む月へ移動し、その日の予定一覧を開く
+        self.controller.go_to_date(date_key)
+        self._refresh_calendar()
+        self.open_event_dialog(date_key)
+
+    def _refresh_calendar(self):
+        # カレンダーへ最新の年月/祝日/イベントを流し込み、再描画
+        self.calendar_view.update(self.controller.get_month_model())
+        # 天気も最新情報に更新
+        self.status_bar.update_weather(self.controller.get_weather_info())
+        # 手が空いたら前後の月の描画内容を組み立てておく（＜ / ＞ はキャッシュを引いて描くだけになる）
+        self.root.after_idle(self.controller.prefetch_adjacent_months)
+
+    def _watch_events(self):
+        # 予定ファイルが外部で変更されていれば、変わった日付だけ取り込んで再描画
+        try:
+            changed = self.controller.reload_if_changed()
+        except Exception as e:
+            changed = []
+            print(f"[warning] 予定ファイルの再読み込みに失敗しました: {e}", file=sys.stderr)
+        if changed:
+            self._refresh_calendar()
+            self.status_bar.flash_message_for_seconds(f"予定を再読み込みしました（{len(changed)}日分）")
+        self.root.after(WATCH_INTERVAL_MS, self._watch_events)
+
+    def _poll_holidays(self):
+        # 表示中の年の祝日が届いて内容が変わっていれば再描画
+        if self.controller.poll_holidays():
+            self._refresh_calendar()
+        self.root.after(HOLIDAY_POLL_MS, self._poll_holidays)
+
+    def _poll_weather(self):
+        # 取り直した天気が届いていれば表示を更新し、古くなっていれば次の取り直しを頼む
+        changed = self.controller.poll_weather()
+        if "weather" in changed:
+            self.status_bar.update_weather(self.controller.get_weather_info())
+        if "forecast" in changed:
+            self._refresh_calendar()
+        self.controller.refresh_weather()
+        self.root.after(WEATHER_POLL_MS, self._poll_weather)
+
+    def _rotate_weather(self):
+        # 地域が複数あれば、ステータスバーの天気を次の地域に切り替える
+        if self.controller.rotate_weather():
+            self.status_bar.update_weather(self.controller.get_weather_info())
+        self.root.after(WEATHER_ROTATE_MS, self._rotate_weather)
+
+    def import_ics(self):
+        # .ics ファイルを選んで取り込み、結果をステータスバーに表示
+        path = filedialog.askopenfilename(
+            parent=self.root, title="予定の取り込み",
+            filetypes=[("iCalendar", "*.ics"), ("すべてのファイル", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            result = self.controller.import_ics(path)
+        except (OSError, UnicodeError) as e:
+            print(f"[ERROR] 予定の取り込みに失敗しました: {e}", file=sys.stderr)
+            self.status_bar.flash_message_for_seconds("取り込みに失敗しました")
+            return
+        self._refresh_calendar()
+        self.status_bar.flash_message_for_seconds(
+            f"{result['imported']}件取り込みました（重複 {result['duplicates']}件）")
+
+    def export_ics(self):
+        # すべての予定を .ics ファイルに書き出す
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title="予定の書き出し", defaultextension=".ics",
+            filetypes=[("iCalendar", "*.ics")]
+        )
+        if not path:
+            return
+        try:
+            count = self.controller.export_ics(path)
+        except OSError as e:
+            print(f"[ERROR] 予定の書き出しに失敗しました: {e}", file=sys.stderr)
+            self.status_bar.flash_message_for_seconds("書き出しに失敗しました")
+            return
+        self.status_bar.flash_message_for_seconds(f"{count}件書き出しました")
+
+    def open_event_dialog(self, date_key):
+        # 年月ラベルのダブルクリックによる特殊操作（"go_to_today"）に対応
+        if date_key == "go_to_today":
+            self.controller.go_to_today()
+            self._refresh_calendar()
+            return
+
+        # それ以外はイベント編集ダイアログを開く
+        try:
+            from ui.event_dialog import EventDialog
+            EventDialog(
+                self.root, date_key, self.controller.events, self._refresh_calendar,
+                conflict_checker=self.controller.find_conflicts,
+                get_occurrences=self.controller.get_occurrences_for_date,
+                skip_occurrence=self.controller.skip_occurrence
+            )
+        except Exception as e:
+            print(f"[ERROR] イベントダイアログでエラー発生: {e}")
+
+    def toggle_theme(self):
+        # テーマをトグル（ダーク↔ライト等）し、各UIに反映
+        ThemeManager.toggle_theme()
+        self.root.configure(bg=ThemeManager.get("header_bg"))
+        # 色を解決済みの月の描画内容を捨て、新しいテーマで組み立て直したものを渡す
+        self.controller.on_theme_changed()
+        self.calendar_view.update_theme(self.controller.get_month_model())
+        self.root.after_idle(self.controller.prefetch_adjacent_months)
+        self.search_box.update_theme()
+        # ステータスバー（時計・天気）のテーマ更新
+        self.status_bar.update_theme()
+
+    def on_close(self):
+        # 書き込み待ちの予定をディスクに反映してからウィンドウを閉じる
+        try:
+            flush_events()
+        except Exception as e:
+            # 保存に失敗しても（内容は標準エラーに報告済み）ウィンドウは閉じる
+            print(f"[ERROR] 予定の保存に失敗しました: {e!r}", file=sys.stderr)
+        stats = writer_stats()
+        if stats:
+            print(
+                f"[info] 予定の保存: 要求 {stats['submitted']} 回 / 書き込み {stats['written']} 回"
+                f"（合流 {stats['coalesced']} 回）, 平均 {stats['avg_latency_ms']:.1f} ms,"
+                f" 最大 {stats['max_latency_ms']:.1f} ms",
+                file=sys.stderr
+            )
+        for name, st in http_client.stats().items():
+            print(
+                f"[info] 通信 {name}: {st['requests']} 回（失敗 {st['errors']} 回・再試行 {st['retries']} 回）,"
+                f" 平均 {st['avg_ms']:.0f} ms, p95 {st['p95_ms']:.0f} ms, 最大 {st['max_ms']:.0f} ms",
+                file=sys.stderr
+            )
+        http_client.close()
+        self.root.destroy()
+
+    def run(self):
+        # Tk のメインループに入る
+        self.root.mainloop()
+        # 例外などでループを抜けた場合も保存待ちを取りこぼさない
+        flush_events()
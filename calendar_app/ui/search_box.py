@@ -0,0 +1,146 @@
+# =============================================================
+# ui/search_box.py
+# 目的:
+#   - 予定のタイトル・メモを入力のたびに検索する検索ボックス
+#   - 結果は入力欄の直下にドロップダウン（枠なし Toplevel）で表示
+# ポイント:
+#   - 検索は on_search(query) に任せる（コントローラの転置インデックスを利用）
+#   - 結果の選択（クリック / Enter）で on_select(date_key) を呼ぶ
+#   - ↓キーで結果リストへ移動、Esc で閉じる
+# =============================================================
+
+import tkinter as tk
+
+from ui.theme import FONTS
+from services.theme_manager import ThemeManager
+
+PLACEHOLDER = "🔍 予定を検索"
+MAX_RESULTS = 30
+
+
+class SearchBox:
+    """検索入力欄と結果ドロップダウンをまとめたウィジェット"""
+
+    def __init__(self, parent, on_search, on_select):
+        self.parent = parent
+        self.on_search = on_search    # query -> [(date_key, event), ...]
+        self.on_select = on_select    # date_key -> None
+        self.results = []
+        self.dropdown = None
+        self.listbox = None
+
+        self.frame = tk.Frame(parent, bg=ThemeManager.get('header_bg'))
+        self.frame.pack(side="top", fill="x", padx=15, pady=(10, 0))
+
+        self.query_var = tk.StringVar()
+        self.entry = tk.Entry(
+            self.frame,
+            textvariable=self.query_var,
+            font=FONTS["small"],
+            relief="groove",
+            bg=ThemeManager.get('bg'),
+            fg="#888888"
+        )
+        self.entry.pack(fill="x")
+        self.entry.insert(0, PLACEHOLDER)
+
+        self.entry.bind("<FocusIn>", self._on_focus_in)
+        self.entry.bind("<FocusOut>", self._on_focus_out)
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", self._focus_results)
+        self.entry.bind("<Return>", lambda e: self._select(0))
+        self.entry.bind("<Escape>", lambda e: self._close_dropdown())
+
+    def _on_focus_in(self, event=None):
+        # プレースホルダーを消して入力できる状態にする
+        if self.query_var.get() == PLACEHOLDER:
+            self.entry.delete(0, tk.END)
+            self.entry.config(fg=ThemeManager.get('text'))
+
+    def _on_focus_out(self, event=None):
+        # 空のままフォーカスが外れたらプレースホルダーに戻す
+        if not self.query_var.get():
+            self.entry.insert(0, PLACEHOLDER)
+            self.entry.config(fg="#888888")
+
+    def _on_key(self, event=None):
+        """1 文字入力するたびに検索し、ドロップダウンを更新する"""
+        if event is not None and event.keysym in ("Down", "Up", "Return", "Escape"):
+            return
+        query = self.query_var.get().strip()
+        if not query or query == PLACEHOLDER:
+            self._close_dropdown()
+            return
+        self.results = self.on_search(query)[:MAX_RESULTS]
+        if not self.results:
+            self._close_dropdown()
+            return
+        self._show_dropdown()
+
+    def _show_dropdown(self):
+        """入力欄の直下に結果リストを表示（既にあれば中身だけ差し替え）"""
+        if self.dropdown is None:
+            self.dropdown = tk.Toplevel(self.entry)
+            self.dropdown.wm_overrideredirect(True)
+            self.listbox = tk.Listbox(
+                self.dropdown,
+                font=FONTS["small"],
+                bg=ThemeManager.get('dialog_bg'),
+                fg=ThemeManager.get('text'),
+                selectbackground="#CCE8FF",
+                selectforeground="#000000",
+                activestyle="none",
+                relief="solid",
+                bd=1
+            )
+            self.listbox.pack(fill="both", expand=True)
+            self.listbox.bind("<ButtonRelease-1>", lambda e: self._select(self._current_index()))
+            self.listbox.bind("<Return>", lambda e: self._select(self._current_index()))
+            self.listbox.bind("<Escape>", lambda e: self._close_dropdown())
+
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        width = self.entry.winfo_width()
+        rows = min(len(self.results), 8)
+        self.listbox.config(height=rows)
+        self.dropdown.wm_geometry(f"{width}x{rows * 20 + 4}+{x}+{y}")
+
+        self.listbox.delete(0, tk.END)
+        for date_key, ev in self.results:
+            text = f"{date_key}  {ev.get('start_time', '')}  {ev.get('title', '')}"
+            if ev.get("memo"):
+                text += f" - {ev['memo']}"
+            self.listbox.insert(tk.END, text)
+
+    def _current_index(self) -> int:
+        sel = self.listbox.curselection() if self.listbox else ()
+        return sel[0] if sel else 0
+
+    def _focus_results(self, event=None):
+        # ↓キーで結果リストの先頭を選択状態にしてフォーカスを移す
+        if self.listbox is not None and self.results:
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+
+    def _select(self, index: int):
+        """結果を選んだら、その日付を呼び出し側に通知してドロップダウンを閉じる"""
+        if not self.results or not 0 <= index < len(self.results):
+            return
+        date_key = self.results[index][0]
+        self._close_dropdown()
+        self.on_select(date_key)
+
+    def _close_dropdown(self):
+        if self.dropdown is not None:
+            self.dropdown.destroy()
+            self.dropdown = None
+            self.listbox = None
+
+    def update_theme(self):
+        """テーマ切り替え時に配色を更新する"""
+        self.frame.config(bg=ThemeManager.get('header_bg'))
+        self.entry.config(bg=ThemeManager.get('bg'))
+        if self.query_var.get() != PLACEHOLDER:
+            self.entry.config(fg=ThemeManager.get('text'))
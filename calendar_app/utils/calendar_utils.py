@@ -1,10 +1,25 @@
-import calendar
-
-def generate_calendar_matrix(year, month):
-    """
-    その月のカレンダーを2次元リストで返す
-    例: [[0,0,1,2,3,4,5], [6,7,8,...], ...]
-    """
-    cal = calendar.Calendar(firstweekday=6)  # 日曜始まり
-    month_days = cal.monthdayscalendar(year, month)
-    return month_days
+import calendar
+
+def generate_calendar_matrix(year, month):
+    """
+    その月のカレンダーを2次元リストで返す
+    例: [[0,0,1,2,3,4,5], [6,7,8,...], ...]
+    """
+    cal = calendar.Calendar(firstweekday=6)  # 日曜始まり
+    month_days = cal.monthdayscalendar(year, month)
+    return month_days
+
+
+def time_to_minutes(hhmm: str) -> int | None:
+    """
+    "HH:MM" 形式の時刻を 0 時からの分数に変換する
+    空文字や形式不正、範囲外（時が 0〜23、分が 0〜59 でない。"9:75" や "25:00" など）の場合は None を返す
+    """
+    try:
+        h, m = hhmm.strip().split(":")
+        h, m = int(h), int(m)
+    except (AttributeError, ValueError):
+        return None
+    if not (0 <= h < 24 and 0 <= m < 60):
+        return None
+    return h * 60 + m
@@ -1,38 +1,60 @@
-# utils/resource.py
-import os
-import sys
-import shutil
-
-def resource_path(relative_path: str, writable: bool = False) -> str:
-    """
-    リソースファイルのパスを解決する。
-    
-    Args:
-        relative_path (str): プロジェクトのルートディレクトリからの相対パス。
-    """
-    if hasattr(sys, '_MEIPASS'):
-        # PyInstallerでパッケージ化されている場合
-        base_path = sys._MEIPASS
-    else:
-        # 開発環境の場合
-        # os.path.dirname(os.path.abspath(sys.argv[0])) は
-        # 実行ファイル(main.py)のディレクトリを返す
-        base_path = os.path.dirname(os.path.abspath(sys.argv[0]))
-
-    full_path = os.path.join(base_path, relative_path)
-    
-    # 書き込み可能ファイルは、ユーザーのホームディレクトリにコピーしてパスを返す
-    if writable:
-        user_dir = os.path.join(os.path.expanduser("~"), ".calendar_app")
-        os.makedirs(user_dir, exist_ok=True)
-        dest_path = os.path.join(user_dir, os.path.basename(relative_path))
-        
-        if not os.path.exists(dest_path):
-            try:
-                shutil.copy(full_path, dest_path)
-            except FileNotFoundError:
-                with open(dest_path, "w", encoding="utf-8") as f:
-                    f.write("[]")
-        return dest_path
-    
-    return full_path
\ No newline at end of file
+# utils/resource.py
+import os
+import sys
+import shutil
+
+def resource_path(relative_path: str, writable: bool = False) -> str:
+    """
+    リソースファイルのパスを解決する。
+    
+    Args:
+        relative_path (str): プロジェクトのルートディレクトリからの相対パス。
+    """
+    if hasattr(sys, '_MEIPASS'):
+        # PyInstallerでパッケージ化されている場合
+        base_path = sys._MEIPASS
+    else:
+        # 開発環境の場合
+        # os.path.dirname(os.path.abspath(sys.argv[0])) は
+        # 実行ファイル(main.py)のディレクトリを返す
+        base_path = os.path.dirname(os.path.abspath(sys.argv[0]))
+
+    full_path = os.path.join(base_path, relative_path)
+    
+    # 書き込み可能ファイルは、ユーザーのホームディレクトリにコピーしてパスを返す
+    if writable:
+        user_dir = user_data_dir()
+        dest_path = os.path.join(user_dir, os.path.basename(relative_path))
+        
+        if not os.path.exists(dest_path):
+            try:
+                shutil.copy(full_path, dest_path)
+            except FileNotFoundError:
+                with open(dest_path, "w", encoding="utf-8") as f:
+                    f.write("[]")
+        return dest_path
+    
+    return full_path
+
+
+def user_data_dir(*parts: str) -> str:
+    """
+    書き込み可能なユーザーデータの置き場所（~/.calendar_app 配下）のパスを返す。
+    parts を渡すとその下のディレクトリを指し、なければ作成する。
+    """
+    path = os.path.join(os.path.expanduser("~"), ".calendar_app", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_signature(path: str) -> tuple | None:
+    """
+    ファイルの変更検知用の署名（更新日時・サイズ・inode）を返す。存在しなければ None。
+    置き換え保存（os.replace）では inode が、追記ではサイズが変わるので、
+    更新日時の分解能が粗いファイルシステムでも取りこぼしにくい。
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)